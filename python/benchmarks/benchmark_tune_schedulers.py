@@ -0,0 +1,138 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import random
+
+from ray.tune.schedulers import MedianStoppingRule, PopulationBasedTraining
+from ray.tune.trial import Trial, Resources
+
+NUM_TRIALS = 10000
+NUM_RESULTS = 1000
+
+
+class _MockTrial(object):
+    def __init__(self, i):
+        self.trial_id = str(i)
+        self.status = Trial.PAUSED
+        self.resources = Resources(cpu=1, gpu=0)
+        self.config = {"lr": random.uniform(0.001, 0.1)}
+        self.experiment_tag = str(i)
+
+    def is_finished(self):
+        return self.status in [Trial.TERMINATED, Trial.ERROR]
+
+
+class _MockTrialExecutor(object):
+    def save(self, trial, storage=None, blocking=True):
+        return trial.trial_id
+
+    def reset_trial(self, trial, new_config, new_experiment_tag):
+        trial.config = new_config
+        trial.experiment_tag = new_experiment_tag
+        return True
+
+
+class _MockTrialRunner(object):
+    def __init__(self, trials):
+        self.trials = trials
+        self.trial_executor = _MockTrialExecutor()
+
+    def get_trials(self):
+        return self.trials
+
+    def get_trials_with_status(self, status):
+        return []
+
+    def has_resources(self, resources):
+        return True
+
+
+def _result(t, reward, time_total_s=None):
+    return {
+        "training_iteration": t,
+        "time_total_s": t if time_total_s is None else time_total_s,
+        "episode_reward_mean": reward
+    }
+
+
+def _float_time(t):
+    # Wall clock times differ between trials and results
+    return t + random.random()
+
+
+class MedianStoppingRuleSuite(object):
+    timeout = 60
+
+    def setup(self):
+        random.seed(0)
+        self.trials = [_MockTrial(i) for i in range(NUM_TRIALS)]
+        self.runner = _MockTrialRunner(self.trials)
+        self.scheduler = MedianStoppingRule(grace_period=0)
+        # Rewards increase with time so that no trial is stopped
+        for trial in self.trials:
+            for t in range(1, 11):
+                self.scheduler.on_trial_result(self.runner, trial,
+                                               _result(t, t))
+            self.scheduler.on_trial_complete(self.runner, trial,
+                                             _result(10, 10))
+        self.trial = _MockTrial(NUM_TRIALS)
+
+        self.float_scheduler = MedianStoppingRule(grace_period=0)
+        for trial in self.trials:
+            for t in range(1, 11):
+                self.float_scheduler.on_trial_result(
+                    self.runner, trial, _result(t, t, _float_time(t)))
+            self.float_scheduler.on_trial_complete(
+                self.runner, trial, _result(10, 10, _float_time(10)))
+
+    def time_on_trial_result(self):
+        for i in range(NUM_RESULTS):
+            self.scheduler.on_trial_result(self.runner, self.trial,
+                                           _result(i % 10 + 1, 10))
+
+    def time_on_trial_result_float_times(self):
+        for i in range(NUM_RESULTS):
+            t = i % 10 + 1
+            self.float_scheduler.on_trial_result(
+                self.runner, self.trial, _result(t, 10, _float_time(t)))
+
+    def time_on_trial_complete(self):
+        for i in range(10):
+            trial = _MockTrial(NUM_TRIALS + i)
+            self.scheduler.on_trial_complete(self.runner, trial,
+                                             _result(10, 10))
+            self.scheduler.on_trial_result(self.runner, self.trial,
+                                           _result(10, 10))
+
+
+class PopulationBasedTrainingSuite(object):
+    timeout = 60
+
+    def setup(self):
+        random.seed(0)
+        self.trials = [_MockTrial(i) for i in range(NUM_TRIALS)]
+        self.runner = _MockTrialRunner(self.trials)
+        self.scheduler = PopulationBasedTraining(
+            time_attr="training_iteration",
+            perturbation_interval=1,
+            hyperparam_mutations={"lr": lambda: random.uniform(0.001, 0.1)})
+        for trial in self.trials:
+            self.scheduler.on_trial_add(self.runner, trial)
+        for trial in self.trials:
+            self.scheduler.on_trial_result(self.runner, trial,
+                                           _result(1, random.random()))
+        self.time = 2
+
+    def time_on_trial_result(self):
+        for trial in random.sample(self.trials, NUM_RESULTS):
+            self.scheduler.on_trial_result(
+                self.runner, trial, _result(self.time, random.random()))
+        self.time += 1
+
+    def time_choose_trial_to_run(self):
+        for _ in range(NUM_RESULTS):
+            trial = self.scheduler.choose_trial_to_run(self.runner)
+            self.scheduler.on_trial_result(
+                self.runner, trial, _result(self.time, random.random()))
+            self.time += 1
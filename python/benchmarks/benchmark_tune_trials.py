@@ -0,0 +1,48 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import time
+
+import ray
+from ray.tune import Trainable, run_experiments
+
+NUM_TRIALS = 20
+
+
+def setup(*args):
+    if not hasattr(setup, "is_initialized"):
+        ray.init(num_cpus=4)
+        setup.is_initialized = True
+
+
+class _SlowStartTrainable(Trainable):
+    """Trainable whose setup is slow compared to its training."""
+
+    def _setup(self, config):
+        time.sleep(0.5)
+
+    def _train(self):
+        return {"done": True}
+
+    def reset_config(self, new_config):
+        return True
+
+
+class TrialStartupSuite(object):
+    timeout = 120
+    timer = time.time
+
+    def time_short_trials(self, reuse_actors):
+        run_experiments(
+            {
+                "short_trials": {
+                    "run": _SlowStartTrainable,
+                    "num_samples": NUM_TRIALS,
+                }
+            },
+            verbose=False,
+            reuse_actors=reuse_actors)
+
+    time_short_trials.params = [False, True]
+    time_short_trials.param_names = ["reuse_actors"]
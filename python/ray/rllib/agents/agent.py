@@ -83,6 +83,18 @@ COMMON_CONFIG = {
     # === Execution ===
     # Number of environments to evaluate vectorwise per worker.
     "num_envs_per_worker": 1,
+    # Whether to step each of the worker's envs in a separate subprocess. This
+    # parallelizes env simulation for CPU-heavy envs when num_envs_per_worker
+    # is greater than one.
+    "subprocess_envs": False,
+    # Whether to step envs in the background and evaluate policies as soon as
+    # some of the worker's envs are ready. This improves throughput when env
+    # step times vary a lot, at the cost of smaller inference batches.
+    "async_env_stepping": False,
+    # With async_env_stepping, the min number of ready envs to wait for
+    # before evaluating policies, and the max seconds to wait for them.
+    "async_env_min_ready": 1,
+    "async_env_timeout": 0.01,
     # Default sample batch size
     "sample_batch_size": 200,
     # Training batch size, if applicable. Should be >= sample_batch_size.
@@ -122,6 +134,17 @@ COMMON_CONFIG = {
     # Drop metric batches from unresponsive workers after this many seconds
     "collect_metrics_timeout": 180,
 
+    # === Offline Datasets ===
+    # Where evaluators get experiences from: "sampler" to sample the env, or
+    # a directory, glob or list of sample batch files written via "output"
+    "input": "sampler",
+    # Directory that evaluators log their sampled experiences to, if any
+    "output": None,
+    # Size in bytes after which evaluators rotate their output files
+    "output_max_file_size": 64 * 1024 * 1024,
+    # Whether to compress the numeric columns of output files
+    "output_compress_columns": True,
+
     # === Multiagent ===
     "multiagent": {
         # Map from policy ids to tuples of (policy_graph_cls, obs_space,
@@ -224,6 +247,10 @@ class Agent(Trainable):
             sample_async=config["sample_async"],
             compress_observations=config["compress_observations"],
             num_envs=config["num_envs_per_worker"],
+            subprocess_envs=config["subprocess_envs"],
+            async_env_stepping=config["async_env_stepping"],
+            async_env_min_ready=config["async_env_min_ready"],
+            async_env_timeout=config["async_env_timeout"],
             observation_filter=config["observation_filter"],
             clip_rewards=config["clip_rewards"],
             env_config=config["env_config"],
@@ -232,7 +259,12 @@ class Agent(Trainable):
             worker_index=worker_index,
             monitor_path=self.logdir if config["monitor"] else None,
             log_level=config["log_level"],
-            callbacks=config["callbacks"])
+            callbacks=config["callbacks"],
+            input_path=(None
+                        if config["input"] == "sampler" else config["input"]),
+            output_path=config["output"],
+            output_max_file_size=config["output_max_file_size"],
+            output_compress_columns=config["output_compress_columns"])
 
     @classmethod
     def resource_help(cls, config):
@@ -411,9 +443,12 @@ class Agent(Trainable):
         self.local_evaluator.set_weights(weights)
 
     def _stop(self):
+        if hasattr(self, "local_evaluator"):
+            self.local_evaluator.stop()
         # workaround for https://github.com/ray-project/ray/issues/1516
         if hasattr(self, "remote_evaluators"):
             for ev in self.remote_evaluators:
+                ev.stop.remote()
                 ev.__ray_terminate__.remote()
         if hasattr(self, "optimizer"):
             self.optimizer.stop()
@@ -445,6 +480,19 @@ class Agent(Trainable):
         extra_data = pickle.load(open(checkpoint_path, "rb"))
         self.__setstate__(extra_data)
 
+    def _save_state(self):
+        # Agents that customize _save() or _restore() are checkpointed
+        # through them instead
+        for name in ["_save", "_restore"]:
+            owner = next(
+                cls for cls in type(self).__mro__ if name in cls.__dict__)
+            if owner is not Agent:
+                return None
+        return self.__getstate__()
+
+    def _restore_state(self, state):
+        self.__setstate__(state)
+
 
 def get_agent_class(alg):
     """Returns the class of a known agent given its name."""
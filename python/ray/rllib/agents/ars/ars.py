@@ -17,7 +17,12 @@ from ray.rllib.agents import Agent, with_common_config
 from ray.rllib.agents.ars import optimizers
 from ray.rllib.agents.ars import policies
 from ray.rllib.agents.ars import utils
+from ray.rllib.env.vector_env import VectorEnv
 from ray.rllib.utils import FilterManager
+from ray.rllib.utils.batched_policy import (BatchedGenericPolicy,
+                                            batched_rollout)
+from ray.rllib.utils.broadcast import relay_broadcast
+from ray.rllib.utils.shared_noise import create_shared_noise
 
 logger = logging.getLogger(__name__)
 
@@ -39,19 +44,15 @@ DEFAULT_CONFIG = with_common_config({
     "eval_prob": 0.03,  # probability of evaluating the parameter rewards
     "report_length": 10,  # how many of the last rewards we average over
     "offset": 0,
+    # Number of parameter perturbations each worker rolls out at once. Above
+    # one, the antithetic pairs of these perturbations are stepped in
+    # lockstep, with a single batched policy evaluation per step
+    "perturbations_per_batch": 1,
 })
 # __sphinx_doc_end__
 # yapf: enable
 
 
-@ray.remote
-def create_shared_noise(count):
-    """Create a large array of noise to be shared by all workers."""
-    seed = 123
-    noise = np.random.RandomState(seed).randn(count).astype(np.float32)
-    return noise
-
-
 class SharedNoiseTable(object):
     def __init__(self, noise):
         self.noise = noise
@@ -70,10 +71,10 @@ class SharedNoiseTable(object):
 
 @ray.remote
 class Worker(object):
-    def __init__(self, config, env_creator, noise, min_task_runtime=0.2):
+    def __init__(self, config, env_creator, noise_size, min_task_runtime=0.2):
         self.min_task_runtime = min_task_runtime
         self.config = config
-        self.noise = SharedNoiseTable(noise)
+        self.noise = SharedNoiseTable(create_shared_noise(noise_size))
 
         self.env = env_creator(config["env_config"])
         from ray.rllib import models
@@ -84,6 +85,17 @@ class Worker(object):
             self.sess, self.env.action_space, self.env.observation_space,
             self.preprocessor, config["observation_filter"], config["model"])
 
+        num_perturbations = config["perturbations_per_batch"]
+        if num_perturbations > 1:
+            self.vector_env = VectorEnv.wrap(
+                make_env=lambda _: env_creator(config["env_config"]),
+                existing_envs=[self.env],
+                num_envs=2 * num_perturbations)
+            self.batched_policy = BatchedGenericPolicy(
+                self.sess, self.env.action_space, self.env.observation_space,
+                self.preprocessor, self.policy.get_filter(), config["model"],
+                num_copies=2 * num_perturbations)
+
     @property
     def filters(self):
         return {"default": self.policy.get_filter()}
@@ -92,6 +104,10 @@ class Worker(object):
         for k in self.filters:
             self.filters[k].sync(new_filters[k])
 
+    def broadcast_relay(self, method_name, value_ids, children, fanout):
+        return relay_broadcast(self, method_name, value_ids, children,
+                               fanout)
+
     def get_filters(self, flush_after=False):
         return_filters = {}
         for k, f in self.filters.items():
@@ -109,6 +125,28 @@ class Worker(object):
             offset=self.config['offset'])
         return rollout_rewards, rollout_length
 
+    def batched_rollout(self, params, noise_indices, timestep_limit,
+                        add_noise=False):
+        """Rolls out the antithetic pairs of several perturbations at once.
+
+        Returns the rewards and lengths of the positive and of the negative
+        rollout of each perturbation.
+        """
+        weights = []
+        for noise_index in noise_indices:
+            perturbation = self.config["noise_stdev"] * self.noise.get(
+                noise_index, self.policy.num_params)
+            weights.extend([params + perturbation, params - perturbation])
+        self.batched_policy.set_weights(weights)
+        rewards, lengths = batched_rollout(
+            self.batched_policy,
+            self.vector_env,
+            timestep_limit=timestep_limit,
+            add_noise=add_noise,
+            offset=self.config["offset"])
+        return (list(zip(rewards[0::2], rewards[1::2])),
+                list(zip(lengths[0::2], lengths[1::2])))
+
     def do_rollouts(self, params, timestep_limit=None):
         # Set the network weights.
         self.policy.set_weights(params)
@@ -124,6 +162,22 @@ class Worker(object):
                 rewards, length = self.rollout(timestep_limit, add_noise=False)
                 eval_returns.append(rewards.sum())
                 eval_lengths.append(length)
+            elif self.config["perturbations_per_batch"] > 1:
+                # Do runs with several parameter perturbations at once.
+                batch_indices = [
+                    self.noise.sample_index(self.policy.num_params)
+                    for _ in range(self.config["perturbations_per_batch"])
+                ]
+                batch_rewards, batch_lengths = self.batched_rollout(
+                    params, batch_indices, timestep_limit)
+                for noise_index, (rewards_pos, rewards_neg), pair_lengths in \
+                        zip(batch_indices, batch_rewards, batch_lengths):
+                    noise_indices.append(noise_index)
+                    returns.append([rewards_pos.sum(), rewards_neg.sum()])
+                    sign_returns.append(
+                        [np.sign(rewards_pos).sum(),
+                         np.sign(rewards_neg).sum()])
+                    lengths.append(list(pair_lengths))
             else:
                 # Do a regular run with parameter perturbations.
                 noise_index = self.noise.sample_index(self.policy.num_params)
@@ -179,13 +233,14 @@ class ARSAgent(Agent):
 
         # Create the shared noise table.
         logger.info("Creating shared noise table.")
-        noise_id = create_shared_noise.remote(self.config["noise_size"])
-        self.noise = SharedNoiseTable(ray.get(noise_id))
+        self.noise = SharedNoiseTable(
+            create_shared_noise(self.config["noise_size"]))
 
         # Create the actors.
         logger.info("Creating actors.")
         self.workers = [
-            Worker.remote(self.config, self.env_creator, noise_id)
+            Worker.remote(self.config, self.env_creator,
+                          self.config["noise_size"])
             for _ in range(self.config["num_workers"])
         ]
 
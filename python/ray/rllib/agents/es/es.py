@@ -16,7 +16,12 @@ from ray.rllib.agents import Agent, with_common_config
 from ray.rllib.agents.es import optimizers
 from ray.rllib.agents.es import policies
 from ray.rllib.agents.es import utils
+from ray.rllib.env.vector_env import VectorEnv
 from ray.rllib.utils import FilterManager
+from ray.rllib.utils.batched_policy import (BatchedGenericPolicy,
+                                            batched_rollout)
+from ray.rllib.utils.broadcast import relay_broadcast
+from ray.rllib.utils.shared_noise import create_shared_noise
 
 logger = logging.getLogger(__name__)
 
@@ -39,19 +44,15 @@ DEFAULT_CONFIG = with_common_config({
     "observation_filter": "MeanStdFilter",
     "noise_size": 250000000,
     "report_length": 10,
+    # Number of parameter perturbations each worker rolls out at once. Above
+    # one, the antithetic pairs of these perturbations are stepped in
+    # lockstep, with a single batched policy evaluation per step
+    "perturbations_per_batch": 1,
 })
 # __sphinx_doc_end__
 # yapf: enable
 
 
-@ray.remote
-def create_shared_noise(count):
-    """Create a large array of noise to be shared by all workers."""
-    seed = 123
-    noise = np.random.RandomState(seed).randn(count).astype(np.float32)
-    return noise
-
-
 class SharedNoiseTable(object):
     def __init__(self, noise):
         self.noise = noise
@@ -64,18 +65,47 @@ class SharedNoiseTable(object):
         return np.random.randint(0, len(self.noise) - dim + 1)
 
 
+class _RolloutBuffer(object):
+    """Growable, preallocated arrays of the noisy rollouts of an iteration."""
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.noise_indices = np.empty(capacity, dtype=np.int64)
+        self.returns = np.empty((capacity, 2), dtype=np.float32)
+        self.lengths = np.empty((capacity, 2), dtype=np.int64)
+
+    def extend(self, result):
+        count = len(result.noise_indices)
+        if self.size + count > len(self.noise_indices):
+            self._grow(max(2 * len(self.noise_indices), self.size + count))
+        end = self.size + count
+        self.noise_indices[self.size:end] = result.noise_indices
+        self.returns[self.size:end] = np.reshape(result.noisy_returns,
+                                                 (count, 2))
+        self.lengths[self.size:end] = np.reshape(result.noisy_lengths,
+                                                 (count, 2))
+        self.size = end
+
+    def _grow(self, capacity):
+        for name in ["noise_indices", "returns", "lengths"]:
+            old = getattr(self, name)
+            new = np.empty((capacity, ) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+
 @ray.remote
 class Worker(object):
     def __init__(self,
                  config,
                  policy_params,
                  env_creator,
-                 noise,
+                 noise_size,
                  min_task_runtime=0.2):
         self.min_task_runtime = min_task_runtime
         self.config = config
         self.policy_params = policy_params
-        self.noise = SharedNoiseTable(noise)
+        self.noise = SharedNoiseTable(create_shared_noise(noise_size))
 
         self.env = env_creator(config["env_config"])
         from ray.rllib import models
@@ -88,6 +118,17 @@ class Worker(object):
             self.preprocessor, config["observation_filter"], config["model"],
             **policy_params)
 
+        num_perturbations = config["perturbations_per_batch"]
+        if num_perturbations > 1:
+            self.vector_env = VectorEnv.wrap(
+                make_env=lambda _: env_creator(config["env_config"]),
+                existing_envs=[self.env],
+                num_envs=2 * num_perturbations)
+            self.batched_policy = BatchedGenericPolicy(
+                self.sess, self.env.action_space, self.env.observation_space,
+                self.preprocessor, self.policy.get_filter(), config["model"],
+                num_copies=2 * num_perturbations, **policy_params)
+
     @property
     def filters(self):
         return {"default": self.policy.get_filter()}
@@ -96,6 +137,10 @@ class Worker(object):
         for k in self.filters:
             self.filters[k].sync(new_filters[k])
 
+    def broadcast_relay(self, method_name, value_ids, children, fanout):
+        return relay_broadcast(self, method_name, value_ids, children,
+                               fanout)
+
     def get_filters(self, flush_after=False):
         return_filters = {}
         for k, f in self.filters.items():
@@ -112,6 +157,27 @@ class Worker(object):
             add_noise=add_noise)
         return rollout_rewards, rollout_length
 
+    def batched_rollout(self, params, noise_indices, timestep_limit,
+                        add_noise=True):
+        """Rolls out the antithetic pairs of several perturbations at once.
+
+        Returns the rewards and lengths of the positive and of the negative
+        rollout of each perturbation.
+        """
+        weights = []
+        for noise_index in noise_indices:
+            perturbation = self.config["noise_stdev"] * self.noise.get(
+                noise_index, self.policy.num_params)
+            weights.extend([params + perturbation, params - perturbation])
+        self.batched_policy.set_weights(weights)
+        rewards, lengths = batched_rollout(
+            self.batched_policy,
+            self.vector_env,
+            timestep_limit=timestep_limit,
+            add_noise=add_noise)
+        return (list(zip(rewards[0::2], rewards[1::2])),
+                list(zip(lengths[0::2], lengths[1::2])))
+
     def do_rollouts(self, params, timestep_limit=None):
         # Set the network weights.
         self.policy.set_weights(params)
@@ -130,6 +196,22 @@ class Worker(object):
                 rewards, length = self.rollout(timestep_limit, add_noise=False)
                 eval_returns.append(rewards.sum())
                 eval_lengths.append(length)
+            elif self.config["perturbations_per_batch"] > 1:
+                # Do runs with several parameter perturbations at once.
+                batch_indices = [
+                    self.noise.sample_index(self.policy.num_params)
+                    for _ in range(self.config["perturbations_per_batch"])
+                ]
+                batch_rewards, batch_lengths = self.batched_rollout(
+                    params, batch_indices, timestep_limit)
+                for noise_index, (rewards_pos, rewards_neg), pair_lengths in \
+                        zip(batch_indices, batch_rewards, batch_lengths):
+                    noise_indices.append(noise_index)
+                    returns.append([rewards_pos.sum(), rewards_neg.sum()])
+                    sign_returns.append(
+                        [np.sign(rewards_pos).sum(),
+                         np.sign(rewards_neg).sum()])
+                    lengths.append(list(pair_lengths))
             else:
                 # Do a regular run with parameter perturbations.
                 noise_index = self.noise.sample_index(self.policy.num_params)
@@ -184,41 +266,98 @@ class ESAgent(Agent):
 
         # Create the shared noise table.
         logger.info("Creating shared noise table.")
-        noise_id = create_shared_noise.remote(self.config["noise_size"])
-        self.noise = SharedNoiseTable(ray.get(noise_id))
+        self.noise = SharedNoiseTable(
+            create_shared_noise(self.config["noise_size"]))
 
         # Create the actors.
         logger.info("Creating actors.")
         self.workers = [
             Worker.remote(self.config, policy_params, self.env_creator,
-                          noise_id) for _ in range(self.config["num_workers"])
+                          self.config["noise_size"])
+            for _ in range(self.config["num_workers"])
         ]
 
+        # Maps in-flight rollout tasks to their worker and iteration
+        self._pending = {}
+        # Filter updates requested from busy workers
+        self._pending_filters = []
+        self._iteration = 0
+
         self.episodes_so_far = 0
         self.reward_list = []
         self.tstart = time.time()
 
     def _collect_results(self, theta_id, min_episodes, min_timesteps):
+        """Streams rollout results until the episode and timestep quotas.
+
+        Results are processed as soon as they arrive, and each worker is
+        relaunched right away, so slow workers do not stall the others.
+        Rollouts still in flight when the quotas are met use weights that are
+        outdated by the next iteration, so their results are discarded then.
+        """
+        self._iteration += 1
+        busy = {worker for worker, _ in self._pending.values()}
+        for worker in self.workers:
+            if worker not in busy:
+                self._launch_rollouts(worker, theta_id)
+
+        rollouts = _RolloutBuffer()
+        eval_returns, eval_lengths = [], []
         num_episodes, num_timesteps = 0, 0
-        results = []
         while num_episodes < min_episodes or num_timesteps < min_timesteps:
-            logger.info(
-                "Collected {} episodes {} timesteps so far this iter".format(
-                    num_episodes, num_timesteps))
-            rollout_ids = [
-                worker.do_rollouts.remote(theta_id) for worker in self.workers
-            ]
-            # Get the results of the rollouts.
-            for result in ray.get(rollout_ids):
-                results.append(result)
-                # Update the number of episodes and the number of timesteps
-                # keeping in mind that result.noisy_lengths is a list of lists,
+            [obj_id], _ = ray.wait(list(self._pending), num_returns=1)
+            worker, iteration = self._pending.pop(obj_id)
+            if iteration == self._iteration:
+                result = ray.get(obj_id)
+                rollouts.extend(result)
+                eval_returns += result.eval_returns
+                eval_lengths += result.eval_lengths
+                # Keep in mind that result.noisy_lengths is a list of lists,
                 # where the inner lists have length 2.
                 num_episodes += sum(len(pair) for pair in result.noisy_lengths)
                 num_timesteps += sum(
                     sum(pair) for pair in result.noisy_lengths)
-
-        return results, num_episodes, num_timesteps
+                logger.debug(
+                    "Collected {} episodes {} timesteps so far this iter".
+                    format(num_episodes, num_timesteps))
+            if num_episodes < min_episodes or num_timesteps < min_timesteps:
+                self._launch_rollouts(worker, theta_id)
+
+        return (rollouts, eval_returns, eval_lengths, num_episodes,
+                num_timesteps)
+
+    def _sync_filters(self):
+        """Synchronizes the filters of the workers with the local filter.
+
+        Busy workers are not waited for. The updates of their filters are
+        requested after their current rollouts, and applied at a later sync.
+        """
+        local_filters = {"default": self.policy.get_filter()}
+        if self._pending_filters:
+            ready, self._pending_filters = ray.wait(
+                self._pending_filters,
+                num_returns=len(self._pending_filters),
+                timeout=0)
+            for remote_filters in ray.get(ready):
+                for k in local_filters:
+                    local_filters[k].apply_changes(
+                        remote_filters[k], with_buffer=False)
+
+        busy = {worker for worker, _ in self._pending.values()}
+        FilterManager.synchronize(
+            local_filters,
+            [worker for worker in self.workers if worker not in busy])
+        filters_id = ray.put(
+            {k: v.as_serializable()
+             for k, v in local_filters.items()})
+        for worker in busy:
+            self._pending_filters.append(
+                worker.get_filters.remote(flush_after=True))
+            worker.sync_filters.remote(filters_id)
+
+    def _launch_rollouts(self, worker, theta_id):
+        self._pending[worker.do_rollouts.remote(theta_id)] = (worker,
+                                                              self._iteration)
 
     def _train(self):
         config = self.config
@@ -230,36 +369,21 @@ class ESAgent(Agent):
         theta_id = ray.put(theta)
         # Use the actors to do rollouts, note that we pass in the ID of the
         # policy weights.
-        results, num_episodes, num_timesteps = self._collect_results(
-            theta_id, config["episodes_per_batch"], config["train_batch_size"])
-
-        all_noise_indices = []
-        all_training_returns = []
-        all_training_lengths = []
-        all_eval_returns = []
-        all_eval_lengths = []
-
-        # Loop over the results.
-        for result in results:
-            all_eval_returns += result.eval_returns
-            all_eval_lengths += result.eval_lengths
-
-            all_noise_indices += result.noise_indices
-            all_training_returns += result.noisy_returns
-            all_training_lengths += result.noisy_lengths
+        (rollouts, all_eval_returns, all_eval_lengths, num_episodes,
+         num_timesteps) = self._collect_results(
+             theta_id, config["episodes_per_batch"],
+             config["train_batch_size"])
 
         assert len(all_eval_returns) == len(all_eval_lengths)
-        assert (len(all_noise_indices) == len(all_training_returns) ==
-                len(all_training_lengths))
 
         self.episodes_so_far += num_episodes
 
         # Assemble the results.
         eval_returns = np.array(all_eval_returns)
         eval_lengths = np.array(all_eval_lengths)
-        noise_indices = np.array(all_noise_indices)
-        noisy_returns = np.array(all_training_returns)
-        noisy_lengths = np.array(all_training_lengths)
+        noise_indices = rollouts.noise_indices[:rollouts.size]
+        noisy_returns = rollouts.returns[:rollouts.size]
+        noisy_lengths = rollouts.lengths[:rollouts.size]
 
         # Process the returns.
         if config["return_proc_mode"] == "centered_rank":
@@ -286,9 +410,7 @@ class ESAgent(Agent):
             self.reward_list.append(np.mean(eval_returns))
 
         # Now sync the filters
-        FilterManager.synchronize({
-            "default": self.policy.get_filter()
-        }, self.workers)
+        self._sync_filters()
 
         info = {
             "weights_norm": np.square(theta).sum(),
@@ -51,11 +51,18 @@ def itergroups(items, group_size):
 def batched_weighted_sum(weights, vecs, batch_size):
     total = 0
     num_items_summed = 0
+    batch = None
     for batch_weights, batch_vecs in zip(
             itergroups(weights, batch_size), itergroups(vecs, batch_size)):
         assert len(batch_weights) == len(batch_vecs) <= batch_size
+        if batch is None:
+            # Gather every batch of vectors into the same buffer
+            batch = np.empty((batch_size, len(batch_vecs[0])), np.float32)
+            total = np.zeros(len(batch_vecs[0]), np.float32)
+        for i, vec in enumerate(batch_vecs):
+            batch[i] = vec
         total += np.dot(
             np.asarray(batch_weights, dtype=np.float32),
-            np.asarray(batch_vecs, dtype=np.float32))
+            batch[:len(batch_vecs)])
         num_items_summed += len(batch_weights)
     return total, num_items_summed
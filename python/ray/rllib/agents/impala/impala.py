@@ -18,6 +18,7 @@ OPTIMIZER_SHARED_CONFIGS = [
     "replay_buffer_num_slots",
     "replay_proportion",
     "num_parallel_data_loaders",
+    "prefetch_depth",
     "grad_clip",
     "max_sample_requests_in_flight_per_worker",
     "broadcast_interval",
@@ -39,8 +40,12 @@ DEFAULT_CONFIG = with_common_config({
     # number of GPUs the learner should use.
     "num_gpus": 1,
     # set >1 to load data into GPUs in parallel. Increases GPU memory usage
-    # proportionally with the number of loaders.
+    # proportionally with the number of loaders. With 2 loaders, the next
+    # batch is copied to the GPUs while training on the current one.
     "num_parallel_data_loaders": 1,
+    # number of train batches to convert and stage on the host ahead of
+    # loading them into the GPUs (only used in multi-GPU mode).
+    "prefetch_depth": 2,
     # level of queuing for sampling.
     "max_sample_requests_in_flight_per_worker": 2,
     # max number of workers to broadcast one set of weights to
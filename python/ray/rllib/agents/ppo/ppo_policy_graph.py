@@ -5,7 +5,8 @@ from __future__ import print_function
 import tensorflow as tf
 
 import ray
-from ray.rllib.evaluation.postprocessing import compute_advantages
+from ray.rllib.evaluation.postprocessing import compute_advantages_batch, \
+    compute_last_values
 from ray.rllib.evaluation.tf_policy_graph import TFPolicyGraph, \
     LearningRateSchedule
 from ray.rllib.models.catalog import ModelCatalog
@@ -287,21 +288,21 @@ class PPOPolicyGraph(LearningRateSchedule, TFPolicyGraph):
                                sample_batch,
                                other_agent_batches=None,
                                episode=None):
-        completed = sample_batch["dones"][-1]
-        if completed:
-            last_r = 0.0
-        else:
-            next_state = []
-            for i in range(len(self.model.state_in)):
-                next_state.append([sample_batch["state_out_{}".format(i)][-1]])
-            last_r = self.value(sample_batch["new_obs"][-1], *next_state)
-        batch = compute_advantages(
-            sample_batch,
-            last_r,
+        return self.postprocess_trajectories([sample_batch])[0]
+
+    def postprocess_trajectories(self,
+                                 sample_batches,
+                                 other_agent_batches=None,
+                                 episodes=None):
+        last_rs = compute_last_values(self.sess, self.value_function,
+                                      self.observations, self.model,
+                                      sample_batches)
+        return compute_advantages_batch(
+            sample_batches,
+            last_rs,
             self.config["gamma"],
             self.config["lambda"],
             use_gae=self.config["use_gae"])
-        return batch
 
     def gradients(self, optimizer):
         return optimizer.compute_gradients(
@@ -2,6 +2,10 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import six.moves.queue as queue
+import threading
+import time
+
 from ray.rllib.env.external_env import ExternalEnv
 from ray.rllib.env.vector_env import VectorEnv
 from ray.rllib.env.multi_agent_env import MultiAgentEnv
@@ -64,8 +68,28 @@ class AsyncVectorEnv(object):
     """
 
     @staticmethod
-    def wrap_async(env, make_env=None, num_envs=1):
-        """Wraps any env type as needed to expose the async interface."""
+    def wrap_async(env,
+                   make_env=None,
+                   num_envs=1,
+                   async_stepping=False,
+                   min_ready_envs=1,
+                   ready_timeout=0.01):
+        """Wraps any env type as needed to expose the async interface.
+
+        If `async_stepping` is set, vector envs are stepped in background
+        threads, and poll() returns once `min_ready_envs` envs are ready or
+        `ready_timeout` seconds have passed (whichever comes first).
+        """
+        if async_stepping:
+            if isinstance(env, (AsyncVectorEnv, MultiAgentEnv, ExternalEnv)):
+                raise ValueError(
+                    "Async env stepping is only supported for gym envs and "
+                    "VectorEnvs, got {}".format(env))
+            if not isinstance(env, VectorEnv):
+                env = VectorEnv.wrap(
+                    make_env=make_env, existing_envs=[env], num_envs=num_envs)
+            env = _BackgroundVectorEnvToAsync(env, min_ready_envs,
+                                              ready_timeout)
         if not isinstance(env, AsyncVectorEnv):
             if isinstance(env, MultiAgentEnv):
                 env = _MultiAgentEnvToAsync(
@@ -166,12 +190,29 @@ class _ExternalEnvToAsync(AsyncVectorEnv):
                 results = self._poll()
                 if not self.external_env.isAlive():
                     raise Exception("Serving thread has stopped.")
+            if self.external_env._batch_window > 0:
+                results = self._poll_batch_window(results)
         limit = self.external_env._max_concurrent_episodes
         assert len(results[0]) < limit, \
             ("Too many concurrent episodes, were some leaked? This "
              "ExternalEnv was created with max_concurrent={}".format(limit))
         return results
 
+    def _poll_batch_window(self, results):
+        """Adds results that arrive within the batch window to the given ones.
+
+        Stops early once every active episode is waiting for an action.
+        """
+        deadline = time.time() + self.external_env._batch_window
+        while len(results[0]) < len(self.external_env._episodes):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            self.external_env._results_avail_condition.wait(remaining)
+            for merged, new in zip(results, self._poll()):
+                merged.update(new)
+        return results
+
     def _poll(self):
         all_obs, all_rewards, all_dones, all_infos = {}, {}, {}, {}
         off_policy_actions = {}
@@ -249,6 +290,95 @@ class _VectorEnvToAsync(AsyncVectorEnv):
         return self.vector_env.get_unwrapped()
 
 
+class _BackgroundVectorEnvToAsync(AsyncVectorEnv):
+    """Internal adapter of VectorEnv to AsyncVectorEnv that steps in the
+    background.
+
+    Each env is stepped by its own thread via VectorEnv.step_at(), so slow
+    envs don't hold back the others. A call to poll() returns observations
+    only for the envs that have finished stepping, and actions are only sent
+    for those envs.
+    """
+
+    def __init__(self, vector_env, min_ready_envs, ready_timeout):
+        self.vector_env = vector_env
+        self.action_space = vector_env.action_space
+        self.observation_space = vector_env.observation_space
+        self.num_envs = vector_env.num_envs
+        self.min_ready_envs = max(1, min(min_ready_envs, self.num_envs))
+        self.ready_timeout = ready_timeout
+        self.ready = queue.Queue()
+        self.inboxes = [queue.Queue() for _ in range(self.num_envs)]
+        for i in range(self.num_envs):
+            self.inboxes[i].put(("reset", None))
+            t = threading.Thread(target=self._step_loop, args=(i, ))
+            t.daemon = True
+            t.start()
+
+    def poll(self):
+        deadline = time.time() + self.ready_timeout
+        # Always wait for at least one env, to avoid busy looping
+        ready = [self._next_ready()]
+        while len(ready) < self.min_ready_envs:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                ready.append(self._next_ready(timeout=remaining))
+            except queue.Empty:
+                break
+        while True:
+            try:
+                ready.append(self._next_ready(block=False))
+            except queue.Empty:
+                break
+        new_obs, rewards, dones, infos = {}, {}, {}, {}
+        for env_id, obs, rew, done, info in ready:
+            new_obs[env_id] = obs
+            rewards[env_id] = rew
+            dones[env_id] = done
+            infos[env_id] = info
+        return _with_dummy_agent_id(new_obs), \
+            _with_dummy_agent_id(rewards), \
+            _with_dummy_agent_id(dones, "__all__"), \
+            _with_dummy_agent_id(infos), {}
+
+    def send_actions(self, action_dict):
+        for env_id, agent_dict in action_dict.items():
+            if _DUMMY_AGENT_ID in agent_dict:
+                self.inboxes[env_id].put(("step",
+                                          agent_dict[_DUMMY_AGENT_ID]))
+
+    def try_reset(self, env_id):
+        # The env thread is idle until we send it the next action
+        return {_DUMMY_AGENT_ID: self.vector_env.reset_at(env_id)}
+
+    def get_unwrapped(self):
+        return self.vector_env.get_unwrapped()
+
+    def _next_ready(self, block=True, timeout=None):
+        item = self.ready.get(block=block, timeout=timeout)
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    def _step_loop(self, index):
+        inbox = self.inboxes[index]
+        while True:
+            cmd, action = inbox.get()
+            try:
+                if cmd == "reset":
+                    obs = self.vector_env.reset_at(index)
+                    self.ready.put((index, obs, None, False, None))
+                else:
+                    obs, rew, done, info = self.vector_env.step_at(
+                        index, action)
+                    self.ready.put((index, obs, rew, done, info))
+            except BaseException as e:
+                self.ready.put(e)
+                raise e
+
+
 class _MultiAgentEnvToAsync(AsyncVectorEnv):
     """Internal adapter of MultiAgentEnv to AsyncVectorEnv.
 
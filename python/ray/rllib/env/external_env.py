@@ -36,7 +36,11 @@ class ExternalEnv(threading.Thread):
               print(agent.train())
     """
 
-    def __init__(self, action_space, observation_space, max_concurrent=100):
+    def __init__(self,
+                 action_space,
+                 observation_space,
+                 max_concurrent=100,
+                 batch_window=0.0):
         """Initialize an external env.
 
         ExternalEnv subclasses must call this during their __init__.
@@ -46,6 +50,10 @@ class ExternalEnv(threading.Thread):
             observation_space (gym.Space): Observation space of the env.
             max_concurrent (int): Max number of active episodes to allow at
                 once. Exceeding this limit raises an error.
+            batch_window (float): Once an episode has a new observation, the
+                sampler waits up to this many seconds for other episodes to
+                report theirs, so that all their actions are computed in one
+                batch. By default, it does not wait.
         """
 
         threading.Thread.__init__(self)
@@ -56,6 +64,7 @@ class ExternalEnv(threading.Thread):
         self._finished = set()
         self._results_avail_condition = threading.Condition()
         self._max_concurrent_episodes = max_concurrent
+        self._batch_window = batch_window
 
     def run(self):
         """Override this to implement the run loop.
@@ -2,6 +2,18 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
+import logging
+import multiprocessing
+import traceback
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Picklable part of the gym EnvSpec of an env in a subprocess
+_EnvSpec = collections.namedtuple("_EnvSpec", ["id", "max_episode_steps"])
+
 
 class VectorEnv(object):
     """An environment that supports batch evaluation.
@@ -15,7 +27,12 @@ class VectorEnv(object):
     """
 
     @staticmethod
-    def wrap(make_env=None, existing_envs=None, num_envs=1):
+    def wrap(make_env=None,
+             existing_envs=None,
+             num_envs=1,
+             use_subprocesses=False):
+        if use_subprocesses:
+            return _SubprocVectorEnv(make_env, existing_envs or [], num_envs)
         return _VectorizedGymEnv(make_env, existing_envs or [], num_envs)
 
     def vector_reset(self):
@@ -48,10 +65,32 @@ class VectorEnv(object):
         """
         raise NotImplementedError
 
+    def step_at(self, index, action):
+        """Steps a single environment.
+
+        This is optional, and only needed to step envs independently of each
+        other (e.g., with `async_env_stepping` enabled).
+
+        Arguments:
+            index (int): Index of the env to step.
+            action (obj): Action for the env.
+
+        Returns:
+            obs (obj): New observation for the env.
+            reward (float): Reward value for the env.
+            done (bool): Done value for the env.
+            info (dict): Info value for the env.
+        """
+        raise NotImplementedError
+
     def get_unwrapped(self):
         """Returns the underlying env instances."""
         raise NotImplementedError
 
+    def close(self):
+        """Releases the resources of the envs, e.g., their processes."""
+        pass
+
 
 class _VectorizedGymEnv(VectorEnv):
     """Internal wrapper for gym envs to implement VectorEnv.
@@ -88,5 +127,218 @@ class _VectorizedGymEnv(VectorEnv):
             info_batch.append(info)
         return obs_batch, rew_batch, done_batch, info_batch
 
+    def step_at(self, index, action):
+        return self.envs[index].step(action)
+
     def get_unwrapped(self):
         return self.envs
+
+
+class _SubprocVectorEnv(VectorEnv):
+    """Internal VectorEnv that steps each gym env in its own subprocess.
+
+    Actions are dispatched to the env workers over pipes, and all envs are
+    stepped in parallel. For Box observation spaces, observations are written
+    by the workers into a shared memory buffer instead of being pickled back
+    through the pipe. Since the envs live in the workers, get_unwrapped()
+    returns stand-ins with their spec and Atari episode results.
+
+    Arguments:
+        make_env (func|None): Factory that produces a new gym env. Must be
+            defined if the number of existing envs is less than num_envs.
+        existing_envs (list): List of existing gym envs. These are handed off
+            to the forked worker processes.
+        num_envs (int): Desired num gym envs to keep total.
+    """
+
+    def __init__(self, make_env, existing_envs, num_envs):
+        self.num_envs = num_envs
+        if existing_envs:
+            probe = existing_envs[0]
+        else:
+            probe = make_env(0)
+            existing_envs = [probe]
+        self.action_space = probe.action_space
+        self.observation_space = probe.observation_space
+
+        self._obs_shape = None
+        self._obs_dtype = None
+        obs_buffer = None
+        if hasattr(self.observation_space, "shape") and \
+                self.observation_space.shape:
+            self._obs_shape = tuple(self.observation_space.shape)
+            self._obs_dtype = np.dtype(
+                getattr(self.observation_space, "dtype", np.float32))
+            obs_buffer = multiprocessing.RawArray(
+                "b",
+                int(num_envs * np.prod(self._obs_shape) *
+                    self._obs_dtype.itemsize))
+            self._obs = _shared_view(obs_buffer, num_envs, self._obs_shape,
+                                     self._obs_dtype)
+
+        self._conns = []
+        self._procs = []
+        for i in range(num_envs):
+            existing = existing_envs[i] if i < len(existing_envs) else None
+            parent_conn, child_conn = multiprocessing.Pipe()
+            proc = multiprocessing.Process(
+                target=_subproc_env_worker,
+                args=(child_conn, existing, make_env, obs_buffer, i, num_envs,
+                      self._obs_shape, self._obs_dtype))
+            proc.daemon = True
+            proc.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._procs.append(proc)
+        self._handles = [
+            _SubprocEnvHandle(*self._recv(i)) for i in range(num_envs)
+        ]
+        logger.debug("Started {} env subprocesses (shared obs: {})".format(
+            num_envs, obs_buffer is not None))
+
+    def vector_reset(self):
+        for conn in self._conns:
+            conn.send(("reset", None))
+        return [self._recv_obs(i) for i in range(self.num_envs)]
+
+    def reset_at(self, index):
+        self._conns[index].send(("reset", None))
+        return self._recv_obs(index)
+
+    def vector_step(self, actions):
+        for i in range(self.num_envs):
+            self._conns[i].send(("step", actions[i]))
+        obs_batch, rew_batch, done_batch, info_batch = [], [], [], []
+        for i in range(self.num_envs):
+            rew, done, info, obs = self._recv_step(i)
+            obs_batch.append(self._read_obs(i, obs))
+            rew_batch.append(rew)
+            done_batch.append(done)
+            info_batch.append(info)
+        return obs_batch, rew_batch, done_batch, info_batch
+
+    def step_at(self, index, action):
+        self._conns[index].send(("step", action))
+        rew, done, info, obs = self._recv_step(index)
+        return self._read_obs(index, obs), rew, done, info
+
+    def get_unwrapped(self):
+        return self._handles
+
+    def close(self):
+        for conn in self._conns:
+            try:
+                conn.send(("close", None))
+            except (IOError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=1)
+            if proc.is_alive():
+                proc.terminate()
+
+    def _recv(self, index):
+        status, data = self._conns[index].recv()
+        if status == "error":
+            raise RuntimeError(
+                "Env subprocess {} failed:\n{}".format(index, data))
+        return data
+
+    def _recv_step(self, index):
+        rew, done, info, obs, episodes = self._recv(index)
+        self._handles[index].add_episode_results(episodes)
+        return rew, done, info, obs
+
+    def _recv_obs(self, index):
+        obs, episodes = self._recv(index)
+        self._handles[index].add_episode_results(episodes)
+        return self._read_obs(index, obs)
+
+    def _read_obs(self, index, obs):
+        if self._obs_shape is None:
+            return obs
+        # Copy out since the slot is overwritten by the next step
+        return self._obs[index].copy()
+
+
+class _SubprocEnvHandle(object):
+    """Stands in for an env that lives in a subprocess.
+
+    Attributes:
+        spec (_EnvSpec): Id and max episode steps of the env, or None.
+        has_monitor (bool): Whether the env is wrapped by a MonitorEnv,
+            whose episode results are then returned by
+            next_episode_results().
+    """
+
+    def __init__(self, spec, has_monitor):
+        self.spec = spec
+        self.has_monitor = has_monitor
+        self._episode_results = []
+
+    def add_episode_results(self, episode_results):
+        self._episode_results.extend(episode_results)
+
+    def next_episode_results(self):
+        results = self._episode_results
+        self._episode_results = []
+        return results
+
+
+def _shared_view(buf, num_envs, shape, dtype):
+    return np.frombuffer(buf, dtype=dtype).reshape((num_envs, ) + shape)
+
+
+def _subproc_env_worker(conn, env, make_env, obs_buffer, index, num_envs,
+                        obs_shape, obs_dtype):
+    obs_view = None
+    if obs_buffer is not None:
+        obs_view = _shared_view(obs_buffer, num_envs, obs_shape, obs_dtype)
+
+    def write_obs(obs):
+        if obs_view is None:
+            return obs
+        obs_view[index] = obs
+        return None
+
+    try:
+        if env is None:
+            env = make_env(index)
+        monitor = _get_monitor(env)
+        spec = None
+        if getattr(env, "spec", None) is not None:
+            spec = _EnvSpec(env.spec.id, env.spec.max_episode_steps)
+        conn.send(("ok", (spec, monitor is not None)))
+
+        def episode_results():
+            if monitor is None:
+                return []
+            return list(monitor.next_episode_results())
+
+        while True:
+            cmd, data = conn.recv()
+            if cmd == "step":
+                obs, rew, done, info = env.step(data)
+                conn.send(("ok", (rew, done, info, write_obs(obs),
+                                  episode_results())))
+            elif cmd == "reset":
+                obs = write_obs(env.reset())
+                conn.send(("ok", (obs, episode_results())))
+            elif cmd == "close":
+                env.close()
+                break
+            else:
+                raise ValueError("Unknown env worker command {}".format(cmd))
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def _get_monitor(env):
+    # Only Atari envs are wrapped by a MonitorEnv, see atari_wrappers
+    if not hasattr(env, "unwrapped") or not hasattr(env.unwrapped, "ale"):
+        return None
+    from ray.rllib.env.atari_wrappers import get_wrapper_by_cls, MonitorEnv
+    return get_wrapper_by_cls(env, MonitorEnv)
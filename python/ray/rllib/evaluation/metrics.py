@@ -4,7 +4,6 @@ from __future__ import print_function
 
 import logging
 import numpy as np
-import collections
 
 import ray
 from ray.rllib.evaluation.sample_batch import DEFAULT_POLICY_ID
@@ -16,39 +15,80 @@ def collect_metrics(local_evaluator, remote_evaluators=[],
                     timeout_seconds=180):
     """Gathers episode metrics from PolicyEvaluator instances."""
 
-    episodes, num_dropped = collect_episodes(
+    summary, num_dropped = collect_episode_summary(
         local_evaluator, remote_evaluators, timeout_seconds=timeout_seconds)
-    metrics = summarize_episodes(episodes, episodes, num_dropped)
+    metrics = summarize_episodes(summary, summary, num_dropped)
     return metrics
 
 
 def collect_episodes(local_evaluator,
                      remote_evaluators=[],
                      timeout_seconds=180):
-    """Gathers new episodes metrics tuples from the given evaluators."""
+    """Gathers new episodes metrics tuples from the given evaluators.
+
+    Prefer collect_episode_summary(), which sends one fixed-size summary
+    per evaluator instead of all of its episodes.
+    """
+
+    metric_lists, num_dropped = _collect_from_evaluators(
+        local_evaluator, remote_evaluators, lambda episodes: episodes,
+        timeout_seconds)
+    episodes = []
+    for metrics in metric_lists:
+        episodes.extend(metrics)
+    return episodes, num_dropped
+
+
+def collect_episode_summary(local_evaluator,
+                            remote_evaluators=[],
+                            timeout_seconds=180):
+    """Gathers a summary of the new episodes of the given evaluators.
+
+    Each evaluator summarizes its own episodes, so only one EpisodeSummary
+    per evaluator is sent to and merged by the caller.
+
+    Returns:
+        summary (EpisodeSummary): Merged summary of the new episodes.
+        num_dropped (int): Number of evaluators that did not return metrics.
+    """
+
+    summaries, num_dropped = _collect_from_evaluators(
+        local_evaluator, remote_evaluators, EpisodeSummary.from_episodes,
+        timeout_seconds)
+    summary = EpisodeSummary()
+    for evaluator_summary in summaries:
+        summary.merge(evaluator_summary)
+    return summary, num_dropped
+
+
+def _collect_from_evaluators(local_evaluator, remote_evaluators, process_fn,
+                             timeout_seconds):
+    """Applies process_fn to the new episodes of each evaluator.
+
+    Returns the results of the remote evaluators that returned in time
+    followed by the local evaluator's, and the number that did not return.
+    """
 
     pending = [
-        a.apply.remote(lambda ev: ev.sampler.get_metrics())
+        a.apply.remote(lambda ev: process_fn(ev.sampler.get_metrics()))
         for a in remote_evaluators
     ]
     collected, _ = ray.wait(
         pending, num_returns=len(pending), timeout=timeout_seconds * 1000)
     num_metric_batches_dropped = len(pending) - len(collected)
 
-    metric_lists = ray.get(collected)
-    metric_lists.append(local_evaluator.sampler.get_metrics())
-    episodes = []
-    for metrics in metric_lists:
-        episodes.extend(metrics)
-    return episodes, num_metric_batches_dropped
+    results = ray.get(collected)
+    results.append(process_fn(local_evaluator.sampler.get_metrics()))
+    return results, num_metric_batches_dropped
 
 
 def summarize_episodes(episodes, new_episodes, num_dropped):
     """Summarizes a set of episode metrics tuples.
 
     Arguments:
-        episodes: smoothed set of episodes including historical ones
-        new_episodes: just the new episodes in this iteration
+        episodes: smoothed set of episodes including historical ones, as an
+            EpisodeSummary or list of episode metrics tuples
+        new_episodes: just the new episodes in this iteration, likewise
         num_dropped: number of workers haven't returned their metrics
     """
 
@@ -56,39 +96,198 @@ def summarize_episodes(episodes, new_episodes, num_dropped):
         logger.warn("WARNING: {} workers have NOT returned metrics".format(
             num_dropped))
 
-    episode_rewards = []
-    episode_lengths = []
-    policy_rewards = collections.defaultdict(list)
-    custom_metrics = collections.defaultdict(list)
-    for episode in episodes:
-        episode_lengths.append(episode.episode_length)
-        episode_rewards.append(episode.episode_reward)
+    if not isinstance(episodes, EpisodeSummary):
+        episodes = EpisodeSummary.from_episodes(episodes)
+    if not isinstance(new_episodes, EpisodeSummary):
+        new_episodes = EpisodeSummary.from_episodes(new_episodes)
+
+    return dict(
+        episode_reward_max=episodes.rewards.max,
+        episode_reward_min=episodes.rewards.min,
+        episode_reward_mean=episodes.rewards.mean(),
+        episode_reward_median=episodes.rewards.quantile(0.5),
+        episode_len_mean=episodes.lengths.mean(),
+        episodes_this_iter=new_episodes.count,
+        policy_reward_mean={
+            policy_id: sketch.mean()
+            for policy_id, sketch in episodes.policy_rewards.items()
+        },
+        custom_metrics={
+            k: sketch.mean()
+            for k, sketch in episodes.custom_metrics.items()
+        },
+        num_metric_batches_dropped=num_dropped)
+
+
+class EpisodeSummary(object):
+    """Mergeable summary of the metrics of a set of episodes.
+
+    The summary has a fixed size regardless of the number of episodes, so
+    evaluators can summarize their own episodes and the driver only has to
+    merge one summary per evaluator.
+
+    Attributes:
+        count (int): Number of episodes summarized.
+        rewards (MetricSketch): Sketch of the episode rewards.
+        lengths (MetricSketch): Sketch of the episode lengths.
+        policy_rewards (dict): Sketch of the rewards of each non-default
+            policy, keyed by policy id.
+        custom_metrics (dict): Sketch of each custom metric, keyed by name.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.rewards = MetricSketch(track_quantiles=True)
+        self.lengths = MetricSketch()
+        self.policy_rewards = {}
+        self.custom_metrics = {}
+
+    @staticmethod
+    def from_episodes(episodes):
+        """Returns the summary of a list of episode metrics tuples."""
+
+        summary = EpisodeSummary()
+        for episode in episodes:
+            summary.add(episode)
+        return summary
+
+    def add(self, episode):
+        """Adds an episode metrics tuple to the summary."""
+
+        self.count += 1
+        self.rewards.add(episode.episode_reward)
+        self.lengths.add(episode.episode_length)
         for k, v in episode.custom_metrics.items():
-            custom_metrics[k].append(v)
+            _get_sketch(self.custom_metrics, k).add(v)
         for (_, policy_id), reward in episode.agent_rewards.items():
             if policy_id != DEFAULT_POLICY_ID:
-                policy_rewards[policy_id].append(reward)
-    if episode_rewards:
-        min_reward = min(episode_rewards)
-        max_reward = max(episode_rewards)
-    else:
-        min_reward = float('nan')
-        max_reward = float('nan')
-    avg_reward = np.mean(episode_rewards)
-    avg_length = np.mean(episode_lengths)
-
-    for policy_id, rewards in policy_rewards.copy().items():
-        policy_rewards[policy_id] = np.mean(rewards)
-
-    for k, v_list in custom_metrics.items():
-        custom_metrics[k] = np.mean(v_list)
+                _get_sketch(self.policy_rewards, policy_id).add(reward)
 
-    return dict(
-        episode_reward_max=max_reward,
-        episode_reward_min=min_reward,
-        episode_reward_mean=avg_reward,
-        episode_len_mean=avg_length,
-        episodes_this_iter=len(new_episodes),
-        policy_reward_mean=dict(policy_rewards),
-        custom_metrics=dict(custom_metrics),
-        num_metric_batches_dropped=num_dropped)
+    def merge(self, other):
+        """Adds all episodes of another summary to this summary."""
+
+        self.count += other.count
+        self.rewards.merge(other.rewards)
+        self.lengths.merge(other.lengths)
+        for k, sketch in other.custom_metrics.items():
+            _get_sketch(self.custom_metrics, k).merge(sketch)
+        for policy_id, sketch in other.policy_rewards.items():
+            _get_sketch(self.policy_rewards, policy_id).merge(sketch)
+
+
+class MetricSketch(object):
+    """Mergeable, fixed-size summary of a stream of values.
+
+    Tracks the count, sum, min and max of the values, and optionally a
+    t-digest of their distribution for estimating quantiles. The digest keeps
+    at most about `compression` centroids, which are kept small near the
+    tails of the distribution so that extreme quantiles stay accurate.
+    """
+
+    def __init__(self, track_quantiles=False, compression=100):
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("nan")
+        self.max = float("nan")
+        self.track_quantiles = track_quantiles
+        self.compression = compression
+        self._means = np.zeros(0)
+        self._weights = np.zeros(0)
+        self._unmerged = []
+
+    def add(self, value):
+        value = float(value)
+        if self.count == 0:
+            self.min = self.max = value
+        else:
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+        self.count += 1
+        self.sum += value
+        if self.track_quantiles:
+            self._unmerged.append(value)
+            if len(self._unmerged) >= 5 * self.compression:
+                self._compress()
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.min, self.max = other.min, other.max
+        else:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self.count += other.count
+        self.sum += other.sum
+        if self.track_quantiles and other.track_quantiles:
+            other._compress()
+            self._compress(other._means, other._weights)
+
+    def mean(self):
+        if self.count == 0:
+            return float("nan")
+        return self.sum / self.count
+
+    def quantile(self, q):
+        """Returns an estimate of the q-th quantile, for q in [0, 1]."""
+
+        if not self.track_quantiles:
+            raise ValueError("This sketch does not track quantiles.")
+        self._compress()
+        if self.count == 0:
+            return float("nan")
+        # Interpolate between the centers of the centroids
+        centers = np.cumsum(self._weights) - self._weights / 2.0
+        return float(
+            np.interp(q * self.count,
+                      np.concatenate([[0.0], centers, [self.count]]),
+                      np.concatenate([[self.min], self._means, [self.max]])))
+
+    def __getstate__(self):
+        self._compress()
+        return self.__dict__
+
+    def _compress(self, extra_means=None, extra_weights=None):
+        means = [self._means, np.array(self._unmerged, dtype=np.float64)]
+        weights = [self._weights, np.ones(len(self._unmerged))]
+        if extra_means is not None:
+            means.append(extra_means)
+            weights.append(extra_weights)
+        means = np.concatenate(means)
+        weights = np.concatenate(weights)
+        self._unmerged = []
+        if len(means) <= 1:
+            self._means, self._weights = means, weights
+            return
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+
+        # Merge neighboring centroids while they fit within one unit of the
+        # k1 scale function, which bounds their size by q * (1 - q)
+        new_means, new_weights = [means[0]], [weights[0]]
+        k_lower = self._scale(0.0)
+        cum_weight = 0.0
+        for mean, weight in zip(means[1:], weights[1:]):
+            q = (cum_weight + new_weights[-1] + weight) / total
+            if self._scale(q) - k_lower <= 1.0:
+                merged = new_weights[-1] + weight
+                new_means[-1] += (mean - new_means[-1]) * weight / merged
+                new_weights[-1] = merged
+            else:
+                cum_weight += new_weights[-1]
+                k_lower = self._scale(cum_weight / total)
+                new_means.append(mean)
+                new_weights.append(weight)
+        self._means = np.array(new_means)
+        self._weights = np.array(new_weights)
+
+    def _scale(self, q):
+        return self.compression / (2.0 * np.pi) * np.arcsin(
+            2.0 * min(q, 1.0) - 1.0)
+
+
+def _get_sketch(sketches, key):
+    if key not in sketches:
+        sketches[key] = MetricSketch()
+    return sketches[key]
@@ -9,17 +9,22 @@ import tensorflow as tf
 
 import ray
 from ray.rllib.models import ModelCatalog
+from ray.rllib.offline.sample_batch_files import SampleBatchReader, \
+    SampleBatchWriter
 from ray.rllib.env.async_vector_env import AsyncVectorEnv
 from ray.rllib.env.atari_wrappers import wrap_deepmind, is_atari
 from ray.rllib.env.env_context import EnvContext
+from ray.rllib.env.external_env import ExternalEnv
 from ray.rllib.env.multi_agent_env import MultiAgentEnv
+from ray.rllib.env.vector_env import VectorEnv
 from ray.rllib.evaluation.interface import EvaluatorInterface
 from ray.rllib.evaluation.sample_batch import MultiAgentBatch, \
-    DEFAULT_POLICY_ID
+    DEFAULT_POLICY_ID, SampleBatch
 from ray.rllib.evaluation.sampler import AsyncSampler, SyncSampler
 from ray.rllib.evaluation.policy_graph import PolicyGraph
 from ray.rllib.evaluation.tf_policy_graph import TFPolicyGraph
 from ray.rllib.utils import merge_dicts
+from ray.rllib.utils.broadcast import relay_broadcast
 from ray.rllib.utils.compression import pack
 from ray.rllib.utils.filter import get_filter
 from ray.rllib.utils.tf_run_builder import TFRunBuilder
@@ -98,6 +103,10 @@ class PolicyEvaluator(EvaluatorInterface):
                  sample_async=False,
                  compress_observations=False,
                  num_envs=1,
+                 subprocess_envs=False,
+                 async_env_stepping=False,
+                 async_env_min_ready=1,
+                 async_env_timeout=0.01,
                  observation_filter="NoFilter",
                  clip_rewards=None,
                  env_config=None,
@@ -106,7 +115,11 @@ class PolicyEvaluator(EvaluatorInterface):
                  worker_index=0,
                  monitor_path=None,
                  log_level=None,
-                 callbacks=None):
+                 callbacks=None,
+                 input_path=None,
+                 output_path=None,
+                 output_max_file_size=64 * 1024 * 1024,
+                 output_compress_columns=True):
         """Initialize a policy evaluator.
 
         Arguments:
@@ -151,6 +164,17 @@ class PolicyEvaluator(EvaluatorInterface):
             num_envs (int): If more than one, will create multiple envs
                 and vectorize the computation of actions. This has no effect if
                 if the env already implements VectorEnv.
+            subprocess_envs (bool): If true, step each of the `num_envs` gym
+                envs in its own subprocess so that env simulation runs in
+                parallel. Only applies to plain gym envs.
+            async_env_stepping (bool): If true, step envs in the background
+                and evaluate policies on whichever envs are ready, instead of
+                waiting for the slowest env in the vector at each step.
+            async_env_min_ready (int): With async_env_stepping, the min
+                number of ready envs to wait for before policy evaluation.
+            async_env_timeout (float): With async_env_stepping, the max
+                seconds to wait for async_env_min_ready envs. Policy
+                evaluation always waits for at least one ready env.
             observation_filter (str): Name of observation filter to use.
             clip_rewards (bool): Whether to clip rewards to [-1, 1] prior to
                 experience postprocessing. Setting to None means clip for Atari
@@ -167,6 +191,15 @@ class PolicyEvaluator(EvaluatorInterface):
                 directory if specified.
             log_level (str): Set the root log level on creation.
             callbacks (dict): Dict of custom debug callbacks.
+            input_path (str|list): If specified, sample() returns batches
+                read from the sample batch files in this directory, glob or
+                list of files instead of sampling the env.
+            output_path (str): If specified, batches from sample() are also
+                written to rotating sample batch files in this directory.
+            output_max_file_size (int): Size in bytes after which output
+                files are rotated.
+            output_compress_columns (bool): Whether to compress the numeric
+                columns of output files.
         """
 
         if log_level:
@@ -231,6 +264,19 @@ class PolicyEvaluator(EvaluatorInterface):
             return wrap(
                 env_creator(env_context.with_vector_index(vector_index)))
 
+        if subprocess_envs:
+            if isinstance(self.env, (MultiAgentEnv, AsyncVectorEnv,
+                                     ExternalEnv, VectorEnv)):
+                raise ValueError(
+                    "subprocess_envs is only supported for gym envs, "
+                    "got {}".format(self.env))
+            # Fork the env processes before any TF state is created here
+            self.env = VectorEnv.wrap(
+                make_env=make_env,
+                existing_envs=[self.env],
+                num_envs=num_envs,
+                use_subprocesses=True)
+
         self.tf_sess = None
         policy_dict = _validate_and_canonicalize(policy_graph, self.env)
         self.policies_to_train = policies_to_train or list(policy_dict.keys())
@@ -266,7 +312,12 @@ class PolicyEvaluator(EvaluatorInterface):
 
         # Always use vector env for consistency even if num_envs = 1
         self.async_env = AsyncVectorEnv.wrap_async(
-            self.env, make_env=make_env, num_envs=num_envs)
+            self.env,
+            make_env=make_env,
+            num_envs=num_envs,
+            async_stepping=async_env_stepping,
+            min_ready_envs=async_env_min_ready,
+            ready_timeout=async_env_timeout)
         self.num_envs = num_envs
 
         if self.batch_mode == "truncate_episodes":
@@ -278,7 +329,20 @@ class PolicyEvaluator(EvaluatorInterface):
         else:
             raise ValueError("Unsupported batch mode: {}".format(
                 self.batch_mode))
-        if sample_async:
+        self.input_reader = None
+        if input_path:
+            self.input_reader = SampleBatchReader(input_path, worker_index)
+        self.output_writer = None
+        if output_path:
+            self.output_writer = SampleBatchWriter(
+                output_path,
+                worker_index,
+                max_file_size=output_max_file_size,
+                compress_columns=output_compress_columns)
+
+        # There is no need to sample the env in the background when batches
+        # are read from input files
+        if sample_async and not self.input_reader:
             self.sampler = AsyncSampler(
                 self.async_env,
                 self.policy_map,
@@ -335,6 +399,9 @@ class PolicyEvaluator(EvaluatorInterface):
             SampleBatch|MultiAgentBatch from evaluating the current policies.
         """
 
+        if self.input_reader:
+            return self._read_input()
+
         batches = [self.sampler.get_data()]
         steps_so_far = batches[0].count
 
@@ -359,6 +426,21 @@ class PolicyEvaluator(EvaluatorInterface):
                 "samples": batch
             })
 
+        if self.output_writer:
+            self.output_writer.write(batch)
+
+        return self._maybe_compress(batch)
+
+    def _read_input(self):
+        batches = [self.input_reader.next()]
+        steps_so_far = batches[0].count
+        while steps_so_far < self.sample_batch_size:
+            batch = self.input_reader.next()
+            steps_so_far += batch.count
+            batches.append(batch)
+        return self._maybe_compress(SampleBatch.concat_samples(batches))
+
+    def _maybe_compress(self, batch):
         if self.compress_observations:
             if isinstance(batch, MultiAgentBatch):
                 for data in batch.policy_batches.values():
@@ -434,6 +516,14 @@ class PolicyEvaluator(EvaluatorInterface):
         for pid, w in weights.items():
             self.policy_map[pid].set_weights(w)
 
+    def broadcast_relay(self, method_name, value_ids, children, fanout):
+        """Applies a broadcast value and relays it on to other evaluators.
+
+        See ray.rllib.utils.broadcast for how values are relayed.
+        """
+        return relay_broadcast(self, method_name, value_ids, children,
+                               fanout)
+
     def compute_gradients(self, samples):
         if isinstance(samples, MultiAgentBatch):
             grad_out, info_out = {}, {}
@@ -518,6 +608,13 @@ class PolicyEvaluator(EvaluatorInterface):
     def set_global_vars(self, global_vars):
         self.foreach_policy(lambda p, _: p.on_global_var_update(global_vars))
 
+    def stop(self):
+        """Stops the sampler thread and closes the envs."""
+        if isinstance(self.sampler, AsyncSampler):
+            self.sampler.shutdown()
+        if isinstance(self.env, VectorEnv):
+            self.env.close()
+
 
 def _validate_and_canonicalize(policy_graph, env):
     if isinstance(policy_graph, dict):
@@ -120,6 +120,36 @@ class PolicyGraph(object):
         """
         return sample_batch
 
+    def postprocess_trajectories(self,
+                                 sample_batches,
+                                 other_agent_batches=None,
+                                 episodes=None):
+        """Postprocesses several trajectory fragments at once.
+
+        The sampler calls this with the fragments of all envs that are ready
+        for postprocessing at the same time. Override it to amortize work
+        across them, e.g., to compute values in one batched call. By default,
+        this calls postprocess_trajectory() on each fragment.
+
+        Arguments:
+            sample_batches (list): Batches of experiences for the policy,
+                each of which contains at most one episode trajectory.
+            other_agent_batches (list): For each batch, the other agent
+                batches as passed to postprocess_trajectory().
+            episodes (list): For each batch, its MultiAgentEpisode.
+
+        Returns:
+            list: postprocessed sample batches.
+        """
+        other_agent_batches = other_agent_batches or [None] * len(
+            sample_batches)
+        episodes = episodes or [None] * len(sample_batches)
+        return [
+            self.postprocess_trajectory(batch, other, episode)
+            for batch, other, episode in zip(sample_batches,
+                                             other_agent_batches, episodes)
+        ]
+
     def compute_gradients(self, postprocessed_batch):
         """Computes gradients against a batch of experiences.
 
@@ -26,32 +26,114 @@ def compute_advantages(rollout, last_r, gamma=0.9, lambda_=1.0, use_gae=True):
             processed rewards.
     """
 
-    traj = {}
-    trajsize = len(rollout["actions"])
-    for key in rollout:
-        traj[key] = np.stack(rollout[key])
-
-    if use_gae:
-        assert "vf_preds" in rollout, "Values not found!"
-        vpred_t = np.concatenate([rollout["vf_preds"], np.array([last_r])])
-        delta_t = traj["rewards"] + gamma * vpred_t[1:] - vpred_t[:-1]
-        # This formula for the advantage comes
-        # "Generalized Advantage Estimation": https://arxiv.org/abs/1506.02438
-        traj["advantages"] = discount(delta_t, gamma * lambda_)
-        traj["value_targets"] = (
-            traj["advantages"] + traj["vf_preds"]).copy().astype(np.float32)
-    else:
-        rewards_plus_v = np.concatenate(
-            [rollout["rewards"], np.array([last_r])])
-        traj["advantages"] = discount(rewards_plus_v, gamma)[:-1]
-        # TODO(ekl): support using a critic without GAE
-        traj["value_targets"] = np.zeros_like(traj["advantages"])
-
-    traj["advantages"] = traj["advantages"].copy().astype(np.float32)
-
-    assert all(val.shape[0] == trajsize for val in traj.values()), \
-        "Rollout stacked incorrectly!"
-    return SampleBatch(traj)
+    return compute_advantages_batch([rollout], [last_r], gamma, lambda_,
+                                    use_gae)[0]
+
+
+def compute_advantages_batch(rollouts,
+                             last_rs,
+                             gamma=0.9,
+                             lambda_=1.0,
+                             use_gae=True):
+    """Computes the advantages of many trajectories at once.
+
+    The per-step terms of all trajectories are laid out time-reversed in a
+    zero-padded [num_trajectories, T] block, so that a single filter pass
+    along its time axis computes the discounted sums of all of them.
+
+    Args:
+        rollouts (list): SampleBatches of a single trajectory each
+        last_rs (list): Value estimation for the last observation of each
+        gamma (float): Discount factor.
+        lambda_ (float): Parameter for GAE
+        use_gae (bool): Using Generalized Advantage Estamation
+
+    Returns:
+        list: SampleBatches with the experience from each rollout and the
+            processed rewards.
+    """
+
+    if not rollouts:
+        return []
+    lengths = [len(rollout["actions"]) for rollout in rollouts]
+    block = np.zeros((len(rollouts), max(lengths) + 1))
+    for i, (rollout, last_r) in enumerate(zip(rollouts, last_rs)):
+        size = lengths[i]
+        rewards = np.asarray(rollout["rewards"])
+        if use_gae:
+            assert "vf_preds" in rollout, "Values not found!"
+            vpred_t = np.append(rollout["vf_preds"], last_r)
+            # This formula for the advantage comes "Generalized Advantage
+            # Estimation": https://arxiv.org/abs/1506.02438
+            block[i, :size] = (
+                rewards + gamma * vpred_t[1:] - vpred_t[:-1])[::-1]
+        else:
+            block[i, 0] = last_r
+            block[i, 1:size + 1] = rewards[::-1]
+    sums = scipy.signal.lfilter(
+        [1], [1, -(gamma * lambda_ if use_gae else gamma)], block, axis=1)
+
+    batches = []
+    for i, rollout in enumerate(rollouts):
+        size = lengths[i]
+        traj = {}
+        for key in rollout:
+            value = rollout[key]
+            traj[key] = (value if isinstance(value, np.ndarray) else
+                         np.stack(value))
+        if use_gae:
+            traj["advantages"] = sums[i, :size][::-1].astype(np.float32)
+            traj["value_targets"] = (
+                traj["advantages"] + traj["vf_preds"]).astype(np.float32)
+        else:
+            traj["advantages"] = sums[i, 1:size + 1][::-1].astype(np.float32)
+            # TODO(ekl): support using a critic without GAE
+            traj["value_targets"] = np.zeros_like(traj["advantages"])
+
+        assert all(val.shape[0] == size for val in traj.values()), \
+            "Rollout stacked incorrectly!"
+        batches.append(SampleBatch(traj))
+    return batches
+
+
+def compute_last_values(sess, value_function, observations, model,
+                        sample_batches):
+    """Returns the value after the last step of each trajectory.
+
+    The values of all incomplete trajectories come from one session call.
+
+    Args:
+        sess (tf.Session): Session to evaluate the value function in.
+        value_function (tf.Tensor): Value function output of the model.
+        observations (tf.Tensor): Observation placeholder of the model.
+        model (Model): Model providing the seq_lens and state_in inputs.
+        sample_batches (list): SampleBatches of a single trajectory each
+
+    Returns:
+        list: Value estimation for the last observation of each trajectory,
+            or 0.0 for trajectories that ended their episode.
+    """
+
+    last_rs = [0.0] * len(sample_batches)
+    incomplete = [
+        i for i, batch in enumerate(sample_batches) if not batch["dones"][-1]
+    ]
+    if incomplete:
+        feed_dict = {
+            observations: [
+                sample_batches[i]["new_obs"][-1] for i in incomplete
+            ],
+            model.seq_lens: [1] * len(incomplete),
+        }
+        for j, state_in in enumerate(model.state_in):
+            feed_dict[state_in] = [
+                sample_batches[i]["state_out_{}".format(j)][-1]
+                for i in incomplete
+            ]
+        values = sess.run(value_function, feed_dict)
+        for i, value in zip(incomplete, values):
+            last_rs[i] = value
+    return last_rs
 
 
 def compute_targets(rollout, action_space, last_r=0.0, gamma=0.9, lambda_=1.0):
@@ -16,21 +16,110 @@ def to_float_array(v):
     return arr
 
 
+def _storage_dtype(dtype):
+    if dtype == np.float64:
+        return np.dtype(np.float32)  # save some memory
+    return dtype
+
+
+class _ColumnBuffer(object):
+    """Growable numpy column used by SampleBatchBuilder.
+
+    The dtype and row shape are inferred from the first value added. Storage
+    grows geometrically, and is widened (or falls back to an object column)
+    if later values don't fit the inferred type.
+    """
+
+    def __init__(self, first_value, capacity):
+        self.value_type = type(first_value)
+        arr = np.asarray(first_value)
+        self.src_dtype = arr.dtype
+        if arr.dtype.kind in "OSUV":
+            self.row_shape = ()
+            dtype = np.dtype(object)
+        else:
+            self.row_shape = arr.shape
+            dtype = _storage_dtype(arr.dtype)
+        self.data = np.empty((capacity, ) + self.row_shape, dtype=dtype)
+        self.count = 0
+
+    def append(self, value):
+        if self.count == len(self.data):
+            self._grow(self.count + 1)
+        if self.data.dtype != object:
+            if type(value) is not self.value_type:
+                self.value_type = type(value)
+                self._adapt(np.asarray(value))
+            elif self.value_type is np.ndarray and (
+                    value.dtype != self.src_dtype
+                    or value.shape != self.row_shape):
+                self._adapt(value)
+        self.data[self.count] = value
+        self.count += 1
+
+    def extend(self, values):
+        arr = np.asarray(values)
+        n = len(arr)
+        if self.count + n > len(self.data):
+            self._grow(self.count + n)
+        if self.data.dtype != object and (arr.dtype != self.src_dtype or
+                                          arr.shape[1:] != self.row_shape):
+            self._adapt(arr[0] if n else arr)
+        if self.data.dtype == object and arr.dtype != object:
+            for i in range(n):
+                self.data[self.count + i] = arr[i]
+        else:
+            self.data[self.count:self.count + n] = arr
+        self.count += n
+
+    def view(self):
+        return self.data[:self.count]
+
+    def _grow(self, min_capacity):
+        capacity = max(min_capacity, 2 * len(self.data))
+        new_data = np.empty(
+            (capacity, ) + self.data.shape[1:], dtype=self.data.dtype)
+        new_data[:self.count] = self.data[:self.count]
+        self.data = new_data
+
+    def _adapt(self, arr):
+        self.src_dtype = arr.dtype
+        if arr.dtype.kind in "OSUV" or arr.shape != self.row_shape:
+            # Not representable as a typed column, fall back to objects
+            new_data = np.empty(len(self.data), dtype=object)
+            for i in range(self.count):
+                new_data[i] = self.data[i]
+            self.data = new_data
+            self.row_shape = ()
+        elif not np.can_cast(arr.dtype, self.data.dtype, "same_kind"):
+            self.data = self.data.astype(
+                _storage_dtype(np.result_type(self.data.dtype, arr.dtype)))
+
+
 class SampleBatchBuilder(object):
     """Util to build a SampleBatch incrementally.
 
     For efficiency, SampleBatches hold values in column form (as arrays).
     However, it is useful to add data one row (dict) at a time.
+
+    Columns are preallocated numpy arrays typed from the first row added, so
+    that adding a row is a single array write per column, and building the
+    batch returns views of the columns without copying.
     """
 
-    def __init__(self):
-        self.buffers = collections.defaultdict(list)
+    _MIN_CAPACITY = 32
+
+    def __init__(self, initial_capacity=None):
+        self.buffers = {}
         self.count = 0
+        self.capacity = max(initial_capacity or 0, self._MIN_CAPACITY)
 
     def add_values(self, **values):
         """Add the given dictionary (row) of values to this batch."""
 
         for k, v in values.items():
+            if k not in self.buffers:
+                self.buffers[k] = _ColumnBuffer(v, self.capacity)
             self.buffers[k].append(v)
         self.count += 1
 
@@ -38,16 +127,22 @@ class SampleBatchBuilder(object):
         """Add the given batch of values to this batch."""
 
         for k, column in batch.items():
+            if k not in self.buffers:
+                self.buffers[k] = _ColumnBuffer(
+                    column[0], max(self.capacity, batch.count))
             self.buffers[k].extend(column)
         self.count += batch.count
 
     def build_and_reset(self):
-        """Returns a sample batch including all previously added values."""
+        """Returns a sample batch including all previously added values.
 
-        batch = SampleBatch(
-            {k: to_float_array(v)
-             for k, v in self.buffers.items()})
-        self.buffers.clear()
+        The returned columns are views of this builder's buffers, which are
+        released (not reused) here to keep the batch valid.
+        """
+
+        batch = SampleBatch({k: v.view() for k, v in self.buffers.items()})
+        self.capacity = max(self.count, self._MIN_CAPACITY)
+        self.buffers = {}
         self.count = 0
         return batch
 
@@ -109,36 +204,54 @@ class MultiAgentSampleBatchBuilder(object):
             episode: current MultiAgentEpisode object or None
         """
 
-        # Materialize the batches so far
-        pre_batches = {}
-        for agent_id, builder in self.agent_builders.items():
-            pre_batches[agent_id] = (
-                self.policy_map[self.agent_to_policy[agent_id]],
-                builder.build_and_reset())
-
-        # Apply postprocessor
-        post_batches = {}
-        if self.clip_rewards:
-            for _, (_, pre_batch) in pre_batches.items():
-                pre_batch["rewards"] = np.sign(pre_batch["rewards"])
-        for agent_id, (_, pre_batch) in pre_batches.items():
-            other_batches = pre_batches.copy()
-            del other_batches[agent_id]
-            policy = self.policy_map[self.agent_to_policy[agent_id]]
-            if any(pre_batch["dones"][:-1]) or len(set(
-                    pre_batch["eps_id"])) > 1:
-                raise ValueError(
-                    "Batches sent to postprocessing must only contain steps "
-                    "from a single trajectory.", pre_batch)
-            post_batches[agent_id] = policy.postprocess_trajectory(
-                pre_batch, other_batches, episode)
-
-        # Append into policy batches and reset
-        for agent_id, post_batch in sorted(post_batches.items()):
-            self.policy_builders[self.agent_to_policy[agent_id]].add_batch(
-                post_batch)
-        self.agent_builders.clear()
-        self.agent_to_policy.clear()
+        MultiAgentSampleBatchBuilder.postprocess_all([(self, episode)])
+
+    @staticmethod
+    def postprocess_all(builders_and_episodes):
+        """Apply policy postprocessors to the unprocessed rows of builders.
+
+        Unlike calling postprocess_batch_so_far() on each builder, this
+        hands all trajectories of the same policy to a single call of its
+        postprocess_trajectories(), so that policies can batch their work.
+
+        Arguments:
+            builders_and_episodes (list): (MultiAgentSampleBatchBuilder,
+                MultiAgentEpisode or None) pairs to postprocess.
+        """
+
+        # Materialize the batches so far, grouped by policy
+        to_process = collections.defaultdict(list)
+        for builder, episode in builders_and_episodes:
+            pre_batches = {}
+            for agent_id, agent_builder in builder.agent_builders.items():
+                pre_batches[agent_id] = (
+                    builder.policy_map[builder.agent_to_policy[agent_id]],
+                    agent_builder.build_and_reset())
+            if builder.clip_rewards:
+                for _, (_, pre_batch) in pre_batches.items():
+                    pre_batch["rewards"] = np.sign(pre_batch["rewards"])
+            for agent_id, (_, pre_batch) in sorted(pre_batches.items()):
+                if any(pre_batch["dones"][:-1]) or len(
+                        set(pre_batch["eps_id"])) > 1:
+                    raise ValueError(
+                        "Batches sent to postprocessing must only contain "
+                        "steps from a single trajectory.", pre_batch)
+                other_batches = pre_batches.copy()
+                del other_batches[agent_id]
+                policy_id = builder.agent_to_policy[agent_id]
+                to_process[policy_id].append((builder, pre_batch,
+                                              other_batches, episode))
+            builder.agent_builders.clear()
+            builder.agent_to_policy.clear()
+
+        # Apply postprocessors and append into the policy batches
+        for policy_id, items in to_process.items():
+            builders, pre_batches, other_batches, episodes = zip(*items)
+            policy = builders[0].policy_map[policy_id]
+            post_batches = policy.postprocess_trajectories(
+                list(pre_batches), list(other_batches), list(episodes))
+            for builder, post_batch in zip(builders, post_batches):
+                builder.policy_builders[policy_id].add_batch(post_batch)
 
     def build_and_reset(self, episode):
         """Returns the accumulated sample batches for each policy.
@@ -215,6 +328,9 @@ class SampleBatch(object):
 
     For example, {"obs": [1, 2, 3], "reward": [0, -1, 1]} is a batch of three
     samples, each with an "obs" and "reward" attribute.
+
+    Batches fetched with ray.get() hold read-only numpy views over the object
+    store buffers, so columns should be replaced rather than updated in place.
     """
 
     def __init__(self, *args, **kwargs):
@@ -232,12 +348,30 @@ class SampleBatch(object):
 
     @staticmethod
     def concat_samples(samples):
+        """Concatenates the given batches into a single SampleBatch.
+
+        Each output column is allocated once and filled in place. If there is
+        only one non-empty batch, its columns are returned without copying.
+        """
+
         if isinstance(samples[0], MultiAgentBatch):
             return MultiAgentBatch.concat_samples(samples)
+        nonempty = [s for s in samples if s.count > 0]
+        if len(nonempty) == 1:
+            return SampleBatch(nonempty[0].data)
+        samples = nonempty or samples[:1]
+        total = sum(s.count for s in samples)
         out = {}
-        samples = [s for s in samples if s.count > 0]
         for k in samples[0].keys():
-            out[k] = np.concatenate([s[k] for s in samples])
+            columns = [np.asarray(s[k]) for s in samples]
+            col = np.empty(
+                (total, ) + columns[0].shape[1:],
+                dtype=np.result_type(*columns))
+            i = 0
+            for c in columns:
+                col[i:i + len(c)] = c
+                i += len(c)
+            out[k] = col
         return SampleBatch(out)
 
     def concat(self, other):
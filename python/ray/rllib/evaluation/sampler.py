@@ -123,6 +123,7 @@ class AsyncSampler(threading.Thread):
         self.pack = pack
         self.tf_sess = tf_sess
         self.callbacks = callbacks
+        self.shutdown_event = threading.Event()
 
     def run(self):
         try:
@@ -137,7 +138,7 @@ class AsyncSampler(threading.Thread):
             self.policy_mapping_fn, self.unroll_length, self.horizon,
             self._obs_filters, self.clip_rewards, self.pack, self.callbacks,
             self.tf_sess)
-        while True:
+        while not self.shutdown_event.is_set():
             # The timeout variable exists because apparently, if one worker
             # dies, the other workers won't die with it, unless the timeout is
             # set to some large number. This is an empirical observation.
@@ -147,6 +148,23 @@ class AsyncSampler(threading.Thread):
             else:
                 self.queue.put(item, timeout=600.0)
 
+    def shutdown(self, timeout=10.0):
+        """Stops the sampling thread, after the env step in progress.
+
+        Arguments:
+            timeout (float): Max seconds to wait for the thread to exit.
+        """
+
+        self.shutdown_event.set()
+        # Unblocks the thread if it is waiting for space in the queue
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+        if self.is_alive():
+            self.join(timeout)
+
     def get_data(self):
         rollout = self.queue.get(timeout=600.0)
 
@@ -299,8 +317,13 @@ def _process_observations(async_vector_env, policies, batch_builder_pool,
     active_envs = set()
     to_eval = defaultdict(list)
     outputs = []
+    env_dones = {}
+    raw_obs_by_policy = defaultdict(list)
+    to_postprocess = []
+    done_episodes = []
 
-    # For each environment
+    # For each environment, update the episode and group the raw observations
+    # by policy so that they can be filtered in batches
     for env_id, agent_obs in unfiltered_obs.items():
         new_episode = env_id not in active_episodes
         episode = active_episodes[env_id]
@@ -311,7 +334,7 @@ def _process_observations(async_vector_env, policies, batch_builder_pool,
 
         # Check episode termination conditions
         if dones[env_id]["__all__"] or episode.length >= horizon:
-            all_done = True
+            env_dones[env_id] = True
             atari_metrics = _fetch_atari_metrics(async_vector_env)
             if atari_metrics is not None:
                 for m in atari_metrics:
@@ -323,13 +346,24 @@ def _process_observations(async_vector_env, policies, batch_builder_pool,
                                    dict(episode.agent_rewards),
                                    episode.custom_metrics))
         else:
-            all_done = False
+            env_dones[env_id] = False
             active_envs.add(env_id)
 
-        # For each agent in the environment
         for agent_id, raw_obs in agent_obs.items():
+            raw_obs_by_policy[episode.policy_for(agent_id)].append(
+                ((env_id, agent_id), raw_obs))
+
+    all_filtered_obs = _filter_observations(obs_filters, raw_obs_by_policy)
+
+    # For each environment
+    for env_id, agent_obs in unfiltered_obs.items():
+        episode = active_episodes[env_id]
+        all_done = env_dones[env_id]
+
+        # For each agent in the environment
+        for agent_id in agent_obs.keys():
             policy_id = episode.policy_for(agent_id)
-            filtered_obs = _get_or_raise(obs_filters, policy_id)(raw_obs)
+            filtered_obs = all_filtered_obs[(env_id, agent_id)]
             agent_done = bool(all_done or dones[env_id].get(agent_id))
             if not agent_done:
                 to_eval[policy_id].append(
@@ -372,47 +406,86 @@ def _process_observations(async_vector_env, policies, batch_builder_pool,
         if episode.batch_builder.has_pending_data():
             if (all_done and not pack) or \
                     episode.batch_builder.count >= unroll_length:
-                outputs.append(episode.batch_builder.build_and_reset(episode))
+                to_postprocess.append((episode, True))
             elif all_done:
                 # Make sure postprocessor stays within one episode
-                episode.batch_builder.postprocess_batch_so_far(episode)
+                to_postprocess.append((episode, False))
 
         if all_done:
-            # Handle episode termination
-            batch_builder_pool.append(episode.batch_builder)
-            if callbacks.get("on_episode_end"):
-                callbacks["on_episode_end"]({
-                    "env": async_vector_env,
-                    "episode": episode
-                })
-            del active_episodes[env_id]
-            resetted_obs = async_vector_env.try_reset(env_id)
-            if resetted_obs is None:
-                # Reset not supported, drop this env from the ready list
-                if horizon != float("inf"):
-                    raise ValueError(
-                        "Setting episode horizon requires reset() support "
-                        "from the environment.")
-            else:
-                # Creates a new episode
-                episode = active_episodes[env_id]
-                for agent_id, raw_obs in resetted_obs.items():
-                    policy_id = episode.policy_for(agent_id)
-                    policy = _get_or_raise(policies, policy_id)
-                    filtered_obs = _get_or_raise(obs_filters,
-                                                 policy_id)(raw_obs)
-                    episode._set_last_observation(agent_id, filtered_obs)
-                    to_eval[policy_id].append(
-                        PolicyEvalData(
-                            env_id, agent_id, filtered_obs,
-                            episode.rnn_state_for(agent_id),
-                            np.zeros_like(
-                                _flatten_action(policy.action_space.sample())),
-                            0.0))
+            done_episodes.append((env_id, episode))
+
+    # Postprocess the trajectories of each policy in one call. Episodes are
+    # only ended afterwards, so on_episode_end still sees them postprocessed.
+    MultiAgentSampleBatchBuilder.postprocess_all(
+        [(episode.batch_builder, episode) for episode, _ in to_postprocess])
+    for episode, cut_batch in to_postprocess:
+        if cut_batch:
+            outputs.append(episode.batch_builder.build_and_reset(episode))
+
+    for env_id, episode in done_episodes:
+        # Handle episode termination
+        batch_builder_pool.append(episode.batch_builder)
+        if callbacks.get("on_episode_end"):
+            callbacks["on_episode_end"]({
+                "env": async_vector_env,
+                "episode": episode
+            })
+        del active_episodes[env_id]
+        resetted_obs = async_vector_env.try_reset(env_id)
+        if resetted_obs is None:
+            # Reset not supported, drop this env from the ready list
+            if horizon != float("inf"):
+                raise ValueError(
+                    "Setting episode horizon requires reset() support "
+                    "from the environment.")
+        else:
+            # Creates a new episode
+            episode = active_episodes[env_id]
+            for agent_id, raw_obs in resetted_obs.items():
+                policy_id = episode.policy_for(agent_id)
+                policy = _get_or_raise(policies, policy_id)
+                filtered_obs = _get_or_raise(obs_filters, policy_id)(raw_obs)
+                episode._set_last_observation(agent_id, filtered_obs)
+                to_eval[policy_id].append(
+                    PolicyEvalData(
+                        env_id, agent_id, filtered_obs,
+                        episode.rnn_state_for(agent_id),
+                        np.zeros_like(
+                            _flatten_action(policy.action_space.sample())),
+                        0.0))
 
     return active_envs, to_eval, outputs
 
 
+def _filter_observations(obs_filters, raw_obs_by_policy):
+    """Applies the observation filter of each policy to its observations.
+
+    Array observations of the same policy and shape are stacked into one
+    [N, ...] array, so that each filter processes (and updates its statistics
+    from) them in a single vectorized call. Other observations, such as those
+    of tuple and dict spaces, are filtered one by one.
+
+    Returns:
+        filtered: map of (env_id, agent_id) to filtered observation
+    """
+
+    filtered = {}
+    for policy_id, keyed_obs in raw_obs_by_policy.items():
+        obs_filter = _get_or_raise(obs_filters, policy_id)
+        keys = [k for k, _ in keyed_obs]
+        first_obs = keyed_obs[0][1]
+        if len(keyed_obs) == 1 or not all(
+                isinstance(o, np.ndarray) and o.shape == first_obs.shape
+                for _, o in keyed_obs):
+            for k, o in keyed_obs:
+                filtered[k] = obs_filter(o)
+            continue
+        stacked = np.stack([o for _, o in keyed_obs])
+        for k, o in zip(keys, obs_filter(stacked)):
+            filtered[k] = o
+    return filtered
+
+
 def _do_policy_eval(tf_sess, to_eval, policies, active_episodes):
     """Call compute actions on observation batches to get next actions.
 
@@ -510,7 +583,10 @@ def _fetch_atari_metrics(async_vector_env):
         return None
     atari_out = []
     for u in unwrapped:
-        monitor = get_wrapper_by_cls(u, MonitorEnv)
+        if getattr(u, "has_monitor", False):
+            monitor = u  # stand-in for an env in a subprocess
+        else:
+            monitor = get_wrapper_by_cls(u, MonitorEnv)
         if not monitor:
             return None
         for eps_rew, eps_len in monitor.next_episode_results():
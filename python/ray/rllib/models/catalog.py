@@ -373,15 +373,19 @@ class _RLlibVectorPreprocessorWrapper(VectorEnv):
         self.num_envs = env.num_envs
 
     def vector_reset(self):
-        return [self.prep.transform(obs) for obs in self.env.vector_reset()]
+        return self.prep.transform_batch(self.env.vector_reset())
 
     def reset_at(self, index):
         return self.prep.transform(self.env.reset_at(index))
 
     def vector_step(self, actions):
         obs, rewards, dones, infos = self.env.vector_step(actions)
-        obs = [self.prep.transform(o) for o in obs]
+        obs = self.prep.transform_batch(obs)
         return obs, rewards, dones, infos
 
+    def step_at(self, index, action):
+        obs, reward, done, info = self.env.step_at(index, action)
+        return self.prep.transform(obs), reward, done, info
+
     def get_unwrapped(self):
         return self.env.get_unwrapped()
@@ -35,6 +35,13 @@ class Preprocessor(object):
         """Returns the preprocessed observation."""
         raise NotImplementedError
 
+    def transform_batch(self, observations):
+        """Returns the preprocessed observations as an [N, ...] array.
+
+        Subclasses can override this to vectorize preprocessing.
+        """
+        return np.array([self.transform(o) for o in observations])
+
     @property
     def size(self):
         return int(np.product(self.shape))
@@ -102,6 +109,9 @@ class AtariRamPreprocessor(Preprocessor):
     def transform(self, observation):
         return (observation - 128) / 128
 
+    def transform_batch(self, observations):
+        return (np.asarray(observations) - 128) / 128
+
 
 class OneHotPreprocessor(Preprocessor):
     def _init_shape(self, obs_space, options):
@@ -112,6 +122,11 @@ class OneHotPreprocessor(Preprocessor):
         arr[observation] = 1
         return arr
 
+    def transform_batch(self, observations):
+        arr = np.zeros((len(observations), self._obs_space.n))
+        arr[np.arange(len(observations)), observations] = 1
+        return arr
+
 
 class NoPreprocessor(Preprocessor):
     def _init_shape(self, obs_space, options):
@@ -120,6 +135,9 @@ class NoPreprocessor(Preprocessor):
     def transform(self, observation):
         return observation
 
+    def transform_batch(self, observations):
+        return np.asarray(observations)
+
 
 class TupleFlatteningPreprocessor(Preprocessor):
     """Preprocesses each tuple element, then flattens it all into a vector.
@@ -146,6 +164,16 @@ class TupleFlatteningPreprocessor(Preprocessor):
             for (o, p) in zip(observation, self.preprocessors)
         ])
 
+    def transform_batch(self, observations):
+        n = len(observations)
+        return np.concatenate(
+            [
+                np.reshape(
+                    p.transform_batch([o[i] for o in observations]),
+                    [n, p.size]) for i, p in enumerate(self.preprocessors)
+            ],
+            axis=1)
+
 
 class DictFlatteningPreprocessor(Preprocessor):
     """Preprocesses each dict value, then flattens it all into a vector.
@@ -174,6 +202,23 @@ class DictFlatteningPreprocessor(Preprocessor):
             for (o, p) in zip(observation.values(), self.preprocessors)
         ])
 
+    def transform_batch(self, observations):
+        n = len(observations)
+        columns = [[] for _ in self.preprocessors]
+        for observation in observations:
+            if not isinstance(observation, OrderedDict):
+                observation = OrderedDict(sorted(list(observation.items())))
+            assert len(observation) == len(self.preprocessors), \
+                (len(observation), len(self.preprocessors))
+            for i, o in enumerate(observation.values()):
+                columns[i].append(o)
+        return np.concatenate(
+            [
+                np.reshape(p.transform_batch(c), [n, p.size])
+                for (c, p) in zip(columns, self.preprocessors)
+            ],
+            axis=1)
+
 
 def get_preprocessor(space):
     """Returns an appropriate preprocessor class for the given space."""
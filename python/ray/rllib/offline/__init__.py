@@ -0,0 +1,4 @@
+from ray.rllib.offline.sample_batch_files import SampleBatchReader, \
+    SampleBatchWriter
+
+__all__ = ["SampleBatchReader", "SampleBatchWriter"]
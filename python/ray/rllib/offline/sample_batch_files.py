@@ -0,0 +1,281 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import glob
+import json
+import mmap
+import os
+import pickle
+import random
+import socket
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from ray.rllib.evaluation.sample_batch import MultiAgentBatch, SampleBatch
+
+try:
+    import lz4.frame
+    LZ4_ENABLED = True
+except ImportError:
+    LZ4_ENABLED = False
+
+# Marks the start of each sample batch file
+MAGIC = b"RLLIBSB1"
+
+FILE_SUFFIX = ".sb"
+
+
+class SampleBatchWriter(object):
+    """Appends sample batches to rotating, columnar files in a directory.
+
+    Each batch is stored as a record: a small JSON header followed by one
+    blob per column. Numeric columns are stored as raw array bytes, which
+    are optionally compressed with LZ4 (or zlib if LZ4 is not installed).
+    Columns of arbitrary Python objects, such as infos, are pickled.
+
+    Each writer only appends to its own files, so any number of evaluators
+    can write to the same directory.
+
+    Examples:
+        >>> writer = SampleBatchWriter("/tmp/experiences", worker_index=1)
+        >>> writer.write(evaluator.sample())
+    """
+
+    def __init__(self,
+                 path,
+                 worker_index=0,
+                 max_file_size=64 * 1024 * 1024,
+                 compress_columns=True):
+        """Initializes a writer.
+
+        Arguments:
+            path (str): Directory to write the files to.
+            worker_index (int): Index of the evaluator, used in file names.
+            max_file_size (int): Files are rotated once they reach this many
+                bytes.
+            compress_columns (bool): Whether to compress numeric columns.
+        """
+
+        self.path = path
+        self.worker_index = worker_index
+        self.max_file_size = max_file_size
+        if not compress_columns:
+            self.codec = "none"
+        elif LZ4_ENABLED:
+            self.codec = "lz4"
+        else:
+            self.codec = "zlib"
+        if not os.path.exists(path):
+            try:
+                os.makedirs(path)
+            except OSError:
+                # Another writer may have created it meanwhile
+                if not os.path.isdir(path):
+                    raise
+        self.file_index = 0
+        self.cur_file = None
+        self.cur_file_size = 0
+
+    def write(self, batch):
+        """Appends a SampleBatch to the current file."""
+
+        if isinstance(batch, MultiAgentBatch):
+            raise ValueError(
+                "Writing multi-agent batches is not supported, got {}".format(
+                    batch))
+        record = _encode_record(batch, self.codec)
+        f = self._get_file()
+        f.write(record)
+        f.flush()
+        self.cur_file_size += len(record)
+
+    def close(self):
+        if self.cur_file:
+            self.cur_file.close()
+            self.cur_file = None
+
+    def _get_file(self):
+        if self.cur_file and self.cur_file_size >= self.max_file_size:
+            self.close()
+        if not self.cur_file:
+            name = "output-{}_{}_worker-{}_{}{}".format(
+                time.strftime("%Y-%m-%d_%H-%M-%S"), socket.gethostname(),
+                self.worker_index, self.file_index, FILE_SUFFIX)
+            self.cur_file = open(os.path.join(self.path, name), "wb")
+            self.cur_file.write(MAGIC)
+            self.cur_file_size = len(MAGIC)
+            self.file_index += 1
+        return self.cur_file
+
+
+class SampleBatchReader(object):
+    """Reads sample batches from files written by SampleBatchWriter.
+
+    Files are memory-mapped, so uncompressed numeric columns are returned as
+    read-only views of the page cache without being copied. The reader
+    cycles over its files forever, and picks up files added to a directory
+    or glob input in the meantime. Each reader visits the files in an order
+    seeded by its worker index, so parallel readers spread over the files.
+
+    Examples:
+        >>> reader = SampleBatchReader("/tmp/experiences", worker_index=1)
+        >>> batch = reader.next()
+    """
+
+    def __init__(self, inputs, worker_index=0):
+        """Initializes a reader.
+
+        Arguments:
+            inputs (str|list): A directory, glob pattern, or list of files.
+            worker_index (int): Index of the evaluator, used to seed the
+                order in which files are read.
+        """
+
+        self.inputs = inputs
+        self.random = random.Random(worker_index)
+        self.files = []
+        self.num_files = 0
+        self.cur_mmap = None
+        self.cur_offset = 0
+        if not self._list_files():
+            raise ValueError("No sample batch files found in {}".format(
+                self.inputs))
+
+    def next(self):
+        """Returns the next SampleBatch."""
+
+        tried = set()
+        while True:
+            if self.cur_mmap is not None:
+                batch = self._read_record()
+                if batch is not None:
+                    return batch
+            if len(tried) >= self.num_files > 0:
+                raise ValueError("No sample batches in {}".format(
+                    self.inputs))
+            tried.add(self._open_next_file())
+
+    def _list_files(self):
+        if isinstance(self.inputs, list):
+            files = list(self.inputs)
+        elif os.path.isdir(self.inputs):
+            files = glob.glob(os.path.join(self.inputs, "*" + FILE_SUFFIX))
+        else:
+            files = glob.glob(self.inputs)
+        return sorted(files)
+
+    def _open_next_file(self):
+        """Maps the next file to read from, and returns its path."""
+
+        if not self.files:
+            self.files = self._list_files()
+            if not self.files:
+                raise ValueError("No sample batch files found in {}".format(
+                    self.inputs))
+            self.num_files = len(self.files)
+            self.random.shuffle(self.files)
+        path = self.files.pop()
+        # Arrays returned earlier may still reference the previous mapping,
+        # so it is released by garbage collection rather than closed here
+        self.cur_mmap = None
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= len(MAGIC):
+                return path
+            mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        if mapped[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a sample batch file: {}".format(path))
+        self.cur_mmap = mapped
+        self.cur_offset = len(MAGIC)
+        return path
+
+    def _read_record(self):
+        """Reads the record at the current offset, if it is complete."""
+
+        buf, offset = self.cur_mmap, self.cur_offset
+        if offset + 4 > len(buf):
+            return None
+        header_len = struct.unpack_from("!I", buf, offset)[0]
+        offset += 4
+        if offset + header_len > len(buf):
+            return None
+        header = json.loads(buf[offset:offset + header_len].decode("utf-8"))
+        offset += header_len
+        if offset + sum(c["nbytes"] for c in header["columns"]) > len(buf):
+            # The writer has not finished this record yet
+            return None
+        data = {}
+        for column in header["columns"]:
+            data[str(column["name"])] = _decode_column(buf, offset, column)
+            offset += column["nbytes"]
+        self.cur_offset = offset
+        return SampleBatch(data)
+
+
+def _encode_record(batch, codec):
+    columns = []
+    blobs = []
+    for name, value in sorted(batch.data.items()):
+        value = np.asarray(value)
+        if value.dtype.hasobject:
+            blob = pickle.dumps(list(value), pickle.HIGHEST_PROTOCOL)
+            column = {"format": "pickle"}
+        else:
+            blob = np.ascontiguousarray(value).tobytes()
+            column = {
+                "format": "array",
+                "dtype": value.dtype.str,
+                "shape": list(value.shape),
+            }
+        column["name"] = name
+        column["codec"] = codec
+        blob = _compress(blob, codec)
+        column["nbytes"] = len(blob)
+        columns.append(column)
+        blobs.append(blob)
+    header = json.dumps({
+        "count": batch.count,
+        "columns": columns
+    }).encode("utf-8")
+    return b"".join([struct.pack("!I", len(header)), header] + blobs)
+
+
+def _decode_column(buf, offset, column):
+    if column["codec"] == "none" and column["format"] == "array":
+        dtype = np.dtype(str(column["dtype"]))
+        count = int(np.prod(column["shape"]))
+        return np.frombuffer(
+            buf, dtype, count, offset).reshape(column["shape"])
+    blob = _decompress(buf[offset:offset + column["nbytes"]], column["codec"])
+    if column["format"] == "pickle":
+        items = pickle.loads(blob)
+        value = np.empty(len(items), dtype=object)
+        for i, item in enumerate(items):
+            value[i] = item
+        return value
+    return np.frombuffer(blob, np.dtype(str(column["dtype"]))).reshape(
+        column["shape"])
+
+
+def _compress(blob, codec):
+    if codec == "lz4":
+        return lz4.frame.compress(blob)
+    elif codec == "zlib":
+        return zlib.compress(blob, 1)
+    return blob
+
+
+def _decompress(blob, codec):
+    if codec == "lz4":
+        if not LZ4_ENABLED:
+            raise ImportError(
+                "This file was written with LZ4 compression. To read it, "
+                "install lz4 with `pip install lz4`.")
+        return lz4.frame.decompress(blob)
+    elif codec == "zlib":
+        return zlib.decompress(blob)
+    return blob
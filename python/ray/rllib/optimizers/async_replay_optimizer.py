@@ -21,6 +21,7 @@ from ray.rllib.evaluation.sample_batch import SampleBatch, DEFAULT_POLICY_ID, \
 from ray.rllib.optimizers.policy_optimizer import PolicyOptimizer
 from ray.rllib.optimizers.replay_buffer import PrioritizedReplayBuffer
 from ray.rllib.utils.actors import TaskPool, create_colocated
+from ray.rllib.utils.broadcast import broadcast
 from ray.rllib.utils.timer import TimerStat
 from ray.rllib.utils.window_stat import WindowStat
 
@@ -254,6 +255,7 @@ class AsyncReplayOptimizer(PolicyOptimizer):
     def _step(self):
         sample_timesteps, train_timesteps = 0, 0
         weights = None
+        evaluators_to_sync = []
 
         with self.timers["sample_processing"]:
             completed = list(self.sample_tasks.completed())
@@ -268,18 +270,24 @@ class AsyncReplayOptimizer(PolicyOptimizer):
                 # Update weights if needed
                 self.steps_since_update[ev] += counts[i]
                 if self.steps_since_update[ev] >= self.max_weight_sync_delay:
-                    # Note that it's important to pull new weights once
-                    # updated to avoid excessive correlation between actors
-                    if weights is None or self.learner.weights_updated:
-                        self.learner.weights_updated = False
-                        with self.timers["put_weights"]:
-                            weights = ray.put(
-                                self.local_evaluator.get_weights())
-                    ev.set_weights.remote(weights)
+                    evaluators_to_sync.append(ev)
                     self.num_weight_syncs += 1
                     self.steps_since_update[ev] = 0
 
-                # Kick off another sample request
+            if evaluators_to_sync:
+                # Note that it's important to pull new weights once
+                # updated to avoid excessive correlation between actors
+                if weights is None or self.learner.weights_updated:
+                    self.learner.weights_updated = False
+                    with self.timers["put_weights"]:
+                        weights = ray.put(self.local_evaluator.get_weights())
+                # Evaluators due for new weights get them in one broadcast,
+                # sent before their next sample request. Evaluators reached
+                # through a relay may still sample once with the old weights.
+                broadcast(weights, evaluators_to_sync, "set_weights")
+
+            # Kick off another sample request
+            for ev, _ in completed:
                 self.sample_tasks.add(ev, ev.sample_with_count.remote())
 
         with self.timers["replay_processing"]:
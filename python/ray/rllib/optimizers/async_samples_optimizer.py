@@ -15,9 +15,11 @@ import threading
 from six.moves import queue
 
 import ray
+from ray.rllib.evaluation.sample_batch import SampleBatch
 from ray.rllib.optimizers.multi_gpu_impl import LocalSyncParallelOptimizer
 from ray.rllib.optimizers.policy_optimizer import PolicyOptimizer
 from ray.rllib.utils.actors import TaskPool
+from ray.rllib.utils.prefetch import Prefetcher
 from ray.rllib.utils.timer import TimerStat
 from ray.rllib.utils.window_stat import WindowStat
 
@@ -57,7 +59,10 @@ class LearnerThread(threading.Thread):
 
     def step(self):
         with self.queue_timer:
-            batch = self.inqueue.get()
+            batches = self.inqueue.get()
+
+        with self.load_timer:
+            batch = SampleBatch.concat_samples(batches)
 
         with self.grad_timer:
             fetches = self.local_evaluator.compute_apply(batch)
@@ -77,7 +82,8 @@ class TFMultiGPULearner(LearnerThread):
                  lr=0.0005,
                  train_batch_size=500,
                  grad_clip=40,
-                 num_parallel_data_loaders=1):
+                 num_parallel_data_loaders=1,
+                 prefetch_depth=2):
         # Multi-GPU requires TensorFlow to function.
         import tensorflow as tf
 
@@ -121,16 +127,24 @@ class TFMultiGPULearner(LearnerThread):
                 self.sess = self.local_evaluator.tf_sess
                 self.sess.run(tf.global_variables_initializer())
 
+        # Batches are converted and staged on the host ahead of time, while
+        # the devices are busy, and then copied into idle device buffers
+        self.prefetcher = Prefetcher(
+            self.inqueue,
+            self._prepare_batches,
+            depth=prefetch_depth,
+            num_threads=min(prefetch_depth, NUM_DATA_LOAD_THREADS))
         self.idle_optimizers = queue.Queue()
         self.ready_optimizers = queue.Queue()
         for opt in self.par_opt:
             self.idle_optimizers.put(opt)
-        for i in range(NUM_DATA_LOAD_THREADS):
+        for i in range(len(self.par_opt)):
             self.loader_thread = _LoaderThread(self, share_stats=(i == 0))
             self.loader_thread.start()
 
     def step(self):
         assert self.loader_thread.is_alive()
+        assert self.prefetcher.is_alive()
         with self.load_wait_timer:
             opt = self.ready_optimizers.get()
 
@@ -143,8 +157,21 @@ class TFMultiGPULearner(LearnerThread):
         self.outqueue.put(self.train_batch_size)
         self.learner_queue_size.push(self.inqueue.qsize())
 
+    def _prepare_batches(self, batches):
+        batch = _concat_loss_columns(batches, self.policy)
+        tuples = self.policy._get_loss_inputs_dict(batch)
+        data_keys = [ph for _, ph in self.policy.loss_inputs()]
+        if self.policy._state_inputs:
+            state_keys = self.policy._state_inputs + [self.policy._seq_lens]
+        else:
+            state_keys = []
+        return self.par_opt[0].prepare_data([tuples[k] for k in data_keys],
+                                            [tuples[k] for k in state_keys])
+
 
 class _LoaderThread(threading.Thread):
+    """Copies prefetched data into idle device buffers."""
+
     def __init__(self, learner, share_stats):
         threading.Thread.__init__(self)
         self.learner = learner
@@ -163,23 +190,36 @@ class _LoaderThread(threading.Thread):
     def step(self):
         s = self.learner
         with self.queue_timer:
-            batch = s.inqueue.get()
+            prepared = s.prefetcher.get()
 
         opt = s.idle_optimizers.get()
 
         with self.load_timer:
-            tuples = s.policy._get_loss_inputs_dict(batch)
-            data_keys = [ph for _, ph in s.policy.loss_inputs()]
-            if s.policy._state_inputs:
-                state_keys = s.policy._state_inputs + [s.policy._seq_lens]
-            else:
-                state_keys = []
-            opt.load_data(s.sess, [tuples[k] for k in data_keys],
-                          [tuples[k] for k in state_keys])
+            opt.load_prepared(s.sess, prepared)
 
         s.ready_optimizers.put(opt)
 
 
+def _concat_loss_columns(batches, policy):
+    """Concatenates only the batch columns needed to feed the policy loss.
+
+    The sample batches are read-only views of object store buffers, so this
+    is the single copy into contiguous memory on the way to the TF feed.
+    """
+
+    if len(batches) == 1:
+        return batches[0]
+    keys = [k for k, _ in policy.loss_inputs()]
+    # Recurrent policies also read the initial states of the sequences
+    keys += [
+        k for k in batches[0].keys() if k.startswith("state_in_")
+        or k in ["eps_id", "agent_index", "seq_lens"]
+    ]
+    return SampleBatch.concat_samples(
+        [SampleBatch({k: b[k]
+                      for k in keys}) for b in batches])
+
+
 class AsyncSamplesOptimizer(PolicyOptimizer):
     """Main event loop of the IMPALA architecture.
 
@@ -197,6 +237,7 @@ class AsyncSamplesOptimizer(PolicyOptimizer):
               replay_buffer_num_slots=0,
               replay_proportion=0.0,
               num_parallel_data_loaders=1,
+              prefetch_depth=2,
               max_sample_requests_in_flight_per_worker=2,
               broadcast_interval=1):
         self.learning_started = False
@@ -218,7 +259,8 @@ class AsyncSamplesOptimizer(PolicyOptimizer):
                 num_gpus=num_gpus,
                 train_batch_size=train_batch_size,
                 grad_clip=grad_clip,
-                num_parallel_data_loaders=num_parallel_data_loaders)
+                num_parallel_data_loaders=num_parallel_data_loaders,
+                prefetch_depth=prefetch_depth)
         else:
             self.learner = LearnerThread(self.local_evaluator)
         self.learner.start()
@@ -292,9 +334,9 @@ class AsyncSamplesOptimizer(PolicyOptimizer):
             self.batch_buffer.append(sample_batch)
             if sum(b.count
                    for b in self.batch_buffer) >= self.train_batch_size:
-                train_batch = self.batch_buffer[0].concat_samples(
-                    self.batch_buffer)
-                self.learner.inqueue.put(train_batch)
+                # Hand the zero-copy object store views to the learner, which
+                # concatenates them off the main thread.
+                self.learner.inqueue.put(self.batch_buffer)
                 self.batch_buffer = []
 
             # If the batch was replayed, skip the update below.
@@ -356,4 +398,6 @@ class AsyncSamplesOptimizer(PolicyOptimizer):
         }
         if self.learner.stats:
             stats["learner"] = self.learner.stats
+        if hasattr(self.learner, "prefetcher"):
+            stats["learner_prefetch"] = self.learner.prefetcher.stats()
         return dict(PolicyOptimizer.stats(self), **stats)
@@ -4,6 +4,7 @@ from __future__ import print_function
 
 from collections import namedtuple
 
+import numpy as np
 import tensorflow as tf
 
 # Variable scope in which created variables will be placed under
@@ -106,6 +107,8 @@ class LocalSyncParallelOptimizer(object):
         The data is split equally across all the devices. If the data is not
         evenly divisible by the batch size, excess data will be discarded.
 
+        This is equivalent to `load_prepared(sess, prepare_data(...))`.
+
         Args:
             sess: TensorFlow session.
             inputs: List of arrays matching the input placeholders, of shape
@@ -117,7 +120,25 @@ class LocalSyncParallelOptimizer(object):
             The number of tuples loaded per device.
         """
 
-        feed_dict = {}
+        return self.load_prepared(sess,
+                                  self.prepare_data(inputs, state_inputs))
+
+    def prepare_data(self, inputs, state_inputs):
+        """Truncates and stages the inputs on the host for load_prepared().
+
+        This only does host-side work and does not touch the TF session, so
+        it can run in a background thread while the devices are training.
+
+        Args:
+            inputs: List of arrays matching the input placeholders, of shape
+                [BATCH_SIZE, ...].
+            state_inputs: List of RNN input arrays. These arrays have size
+                [BATCH_SIZE / MAX_SEQ_LEN, ...].
+
+        Returns:
+            A PreparedData tuple to pass to load_prepared().
+        """
+
         assert len(self.loss_inputs) == len(inputs + state_inputs), \
             (self.loss_inputs, inputs, state_inputs)
 
@@ -132,13 +153,13 @@ class LocalSyncParallelOptimizer(object):
         if len(state_inputs) > 0:
             smallest_array = state_inputs[0]
             seq_len = len(inputs[0]) // len(state_inputs[0])
-            self._loaded_max_seq_len = seq_len
+            max_seq_len = seq_len
         else:
             smallest_array = inputs[0]
-            self._loaded_max_seq_len = 1
+            max_seq_len = 1
 
-        seq_batch_size = (self.max_per_device_batch_size //
-                          self._loaded_max_seq_len * len(self.devices))
+        seq_batch_size = (
+            self.max_per_device_batch_size // max_seq_len * len(self.devices))
         if len(smallest_array) < seq_batch_size:
             # Dynamically shrink the batch size if insufficient data
             seq_batch_size = make_divisible_by(
@@ -146,8 +167,8 @@ class LocalSyncParallelOptimizer(object):
         if seq_batch_size < len(self.devices):
             raise ValueError("Must load at least 1 tuple sequence per device, "
                              "got only {} total.".format(len(smallest_array)))
-        self._loaded_per_device_batch_size = (
-            seq_batch_size // len(self.devices) * self._loaded_max_seq_len)
+        per_device_batch_size = (
+            seq_batch_size // len(self.devices) * max_seq_len)
 
         if len(state_inputs) > 0:
             # First truncate the RNN state arrays to the seq_batch_size
@@ -158,18 +179,41 @@ class LocalSyncParallelOptimizer(object):
             inputs = [arr[:len(state_inputs[0]) * seq_len] for arr in inputs]
             assert len(state_inputs[0]) * seq_len == len(inputs[0]), \
                 (len(state_inputs[0]), seq_batch_size, seq_len, len(inputs[0]))
-            for ph, arr in zip(self.loss_inputs, inputs + state_inputs):
-                feed_dict[ph] = arr
+            arrays = inputs + state_inputs
             truncated_len = len(inputs[0])
         else:
-            for ph, arr in zip(self.loss_inputs, inputs + state_inputs):
-                truncated_arr = make_divisible_by(arr, seq_batch_size)
-                feed_dict[ph] = truncated_arr
-                truncated_len = len(truncated_arr)
+            arrays = [
+                make_divisible_by(arr, seq_batch_size)
+                for arr in inputs + state_inputs
+            ]
+            truncated_len = len(arrays[0])
+
+        # Stage contiguous copies, so that feeding them to the devices is a
+        # plain memory copy
+        feed_dict = {
+            ph: np.ascontiguousarray(arr)
+            for ph, arr in zip(self.loss_inputs, arrays)
+        }
+        return PreparedData(feed_dict, max_seq_len, per_device_batch_size,
+                            truncated_len)
 
-        sess.run([t.init_op for t in self._towers], feed_dict=feed_dict)
+    def load_prepared(self, sess, prepared):
+        """Copies data staged by prepare_data() into device memory.
+
+        Args:
+            sess: TensorFlow session.
+            prepared: PreparedData tuple returned by prepare_data().
 
-        tuples_per_device = truncated_len / len(self.devices)
+        Returns:
+            The number of tuples loaded per device.
+        """
+
+        sess.run([t.init_op for t in self._towers],
+                 feed_dict=prepared.feed_dict)
+        self._loaded_max_seq_len = prepared.max_seq_len
+        self._loaded_per_device_batch_size = prepared.per_device_batch_size
+
+        tuples_per_device = prepared.truncated_len / len(self.devices)
         assert tuples_per_device > 0, "No data loaded?"
         assert tuples_per_device % self._loaded_per_device_batch_size == 0
         return tuples_per_device
@@ -253,6 +297,11 @@ class LocalSyncParallelOptimizer(object):
 # Each tower is a copy of the loss graph pinned to a specific device.
 Tower = namedtuple("Tower", ["init_op", "grads", "loss_graph"])
 
+# Host-side data staged by LocalSyncParallelOptimizer.prepare_data().
+PreparedData = namedtuple(
+    "PreparedData",
+    ["feed_dict", "max_seq_len", "per_device_batch_size", "truncated_len"])
+
 
 def make_divisible_by(a, n):
     if type(a) is int:
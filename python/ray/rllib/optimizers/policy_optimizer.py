@@ -6,7 +6,8 @@ import logging
 
 import ray
 from ray.rllib.evaluation.policy_evaluator import PolicyEvaluator
-from ray.rllib.evaluation.metrics import collect_episodes, summarize_episodes
+from ray.rllib.evaluation.metrics import collect_episode_summary, \
+    summarize_episodes, EpisodeSummary
 from ray.rllib.evaluation.sample_batch import MultiAgentBatch
 
 logger = logging.getLogger(__name__)
@@ -96,18 +97,25 @@ class PolicyOptimizer(object):
             res (dict): A training result dict from evaluator metrics with
                 `info` replaced with stats from self.
         """
-        episodes, num_dropped = collect_episodes(
+        new_episodes, num_dropped = collect_episode_summary(
             self.local_evaluator,
             self.remote_evaluators,
             timeout_seconds=timeout_seconds)
-        orig_episodes = list(episodes)
-        missing = min_history - len(episodes)
-        if missing > 0:
-            episodes.extend(self.episode_history[-missing:])
-            assert len(episodes) <= min_history
-        self.episode_history.extend(orig_episodes)
-        self.episode_history = self.episode_history[-min_history:]
-        res = summarize_episodes(episodes, orig_episodes, num_dropped)
+        # Smooth over the summaries of previous iterations until at least
+        # min_history episodes are covered
+        episodes = EpisodeSummary()
+        episodes.merge(new_episodes)
+        for past_episodes in reversed(self.episode_history):
+            if episodes.count >= min_history:
+                break
+            episodes.merge(past_episodes)
+        if new_episodes.count > 0:
+            self.episode_history.append(new_episodes)
+        while (len(self.episode_history) > 1
+               and sum(h.count for h in self.episode_history[1:]) >=
+               min_history):
+            self.episode_history.pop(0)
+        res = summarize_episodes(episodes, new_episodes, num_dropped)
         res.update(info=self.stats())
         return res
 
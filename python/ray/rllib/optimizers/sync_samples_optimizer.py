@@ -6,6 +6,7 @@ import ray
 import logging
 from ray.rllib.optimizers.policy_optimizer import PolicyOptimizer
 from ray.rllib.evaluation.sample_batch import SampleBatch
+from ray.rllib.utils.broadcast import broadcast, wait_for_broadcast
 from ray.rllib.utils.filter import RunningStat
 from ray.rllib.utils.timer import TimerStat
 
@@ -32,9 +33,10 @@ class SyncSamplesOptimizer(PolicyOptimizer):
     def step(self):
         with self.update_weights_timer:
             if self.remote_evaluators:
-                weights = ray.put(self.local_evaluator.get_weights())
-                for e in self.remote_evaluators:
-                    e.set_weights.remote(weights)
+                # Wait so that no evaluator samples with the old weights
+                wait_for_broadcast(
+                    broadcast(self.local_evaluator.get_weights(),
+                              self.remote_evaluators, "set_weights"))
 
         with self.sample_timer:
             samples = []
@@ -5,6 +5,7 @@ from __future__ import print_function
 import numpy as np
 from ray.rllib.evaluation import SampleBatch
 
+from ray.rllib.utils.broadcast import relay_broadcast
 from ray.rllib.utils.filter import MeanStdFilter
 
 
@@ -40,6 +41,10 @@ class _MockEvaluator(object):
     def set_weights(self, weights):
         self._weights = weights
 
+    def broadcast_relay(self, method_name, value_ids, children, fanout):
+        return relay_broadcast(self, method_name, value_ids, children,
+                               fanout)
+
     def get_filters(self, flush_after=False):
         obs_filter = self.obs_filter.copy()
         rew_filter = self.rew_filter.copy()
@@ -0,0 +1,74 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import unittest
+
+import gym
+import numpy as np
+import tensorflow as tf
+
+from ray.rllib.agents.es.policies import GenericPolicy, rollout
+from ray.rllib.env.vector_env import VectorEnv
+from ray.rllib.models import ModelCatalog
+from ray.rllib.models.catalog import MODEL_DEFAULTS
+from ray.rllib.utils.batched_policy import (BatchedGenericPolicy,
+                                            batched_rollout)
+
+
+def _make_env(seed):
+    env = gym.make("CartPole-v0")
+    env.seed(seed)
+    return env
+
+
+class BatchedRolloutTest(unittest.TestCase):
+    def testMatchesSingleRollouts(self):
+        env = _make_env(0)
+        preprocessor = ModelCatalog.get_preprocessor(env, MODEL_DEFAULTS)
+        with tf.Graph().as_default():
+            sess = tf.Session()
+            policy = GenericPolicy(
+                sess,
+                env.action_space,
+                env.observation_space,
+                preprocessor,
+                "NoFilter",
+                MODEL_DEFAULTS,
+                action_noise_std=0.0)
+            batched_policy = BatchedGenericPolicy(
+                sess,
+                env.action_space,
+                env.observation_space,
+                preprocessor,
+                policy.get_filter(),
+                MODEL_DEFAULTS,
+                num_copies=4)
+            params = policy.get_weights()
+            perturbations = [
+                np.random.randn(*params.shape).astype(np.float32)
+                for _ in range(2)
+            ]
+            weights = []
+            for perturbation in perturbations:
+                weights.extend([params + perturbation, params - perturbation])
+
+            # Roll out each perturbed weight vector on its own
+            expected = []
+            for i, w in enumerate(weights):
+                policy.set_weights(w)
+                expected.append(rollout(policy, _make_env(i)))
+
+            batched_policy.set_weights(weights)
+            vector_env = VectorEnv.wrap(
+                existing_envs=[_make_env(i) for i in range(4)], num_envs=4)
+            rewards, lengths = batched_rollout(batched_policy, vector_env)
+
+        self.assertEqual(lengths, [length for _, length in expected])
+        for (rews, _), batch_rews in zip(expected, rewards):
+            self.assertEqual(batch_rews.dtype, np.float32)
+            self.assertTrue(np.array_equal(rews, batch_rews))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
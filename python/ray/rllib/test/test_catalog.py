@@ -54,6 +54,9 @@ class ModelCatalogTest(unittest.TestCase):
         self.assertEqual(
             list(p1.transform((0, [1, 2, 3]))),
             [float(x) for x in [1, 0, 0, 0, 0, 1, 2, 3]])
+        self.assertEqual(
+            p1.transform_batch([(0, [1, 2, 3]), (4, [4, 5, 6])]).tolist(),
+            [[1, 0, 0, 0, 0, 1, 2, 3], [0, 0, 0, 0, 1, 4, 5, 6]])
 
     def testCustomPreprocessor(self):
         ray.init()
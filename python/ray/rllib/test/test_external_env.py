@@ -5,6 +5,7 @@ from __future__ import print_function
 import gym
 import numpy as np
 import random
+import threading
 import unittest
 import uuid
 
@@ -13,6 +14,8 @@ from ray.rllib.agents.dqn import DQNAgent
 from ray.rllib.agents.pg import PGAgent
 from ray.rllib.evaluation.policy_evaluator import PolicyEvaluator
 from ray.rllib.env.external_env import ExternalEnv
+from ray.rllib.utils.policy_client import PolicyClient
+from ray.rllib.utils.policy_server import BinaryPolicyServer
 from ray.rllib.test.test_policy_evaluator import BadPolicyGraph, \
     MockPolicyGraph, MockEnv
 from ray.tune.registry import register_env
@@ -36,6 +39,38 @@ class SimpleServing(ExternalEnv):
                 eid = self.start_episode()
 
 
+class BinaryServing(ExternalEnv):
+    def __init__(self, episode_length, num_clients):
+        env = MockEnv(episode_length)
+        ExternalEnv.__init__(
+            self, env.action_space, env.observation_space, batch_window=0.01)
+        self.episode_length = episode_length
+        self.num_clients = num_clients
+
+    def run(self):
+        server = BinaryPolicyServer(self, "localhost", 0)
+        address = "tcp://localhost:{}".format(server.server_address[1])
+        for _ in range(self.num_clients):
+            client = threading.Thread(
+                target=self._run_client,
+                args=(PolicyClient(address), MockEnv(self.episode_length)))
+            client.daemon = True
+            client.start()
+        server.serve_forever()
+
+    def _run_client(self, client, env):
+        eid = client.start_episode()
+        obs = env.reset()
+        while True:
+            action = client.get_action(eid, obs)
+            obs, reward, done, info = env.step(action)
+            client.log_returns(eid, reward, info=info)
+            if done:
+                client.end_episode(eid, obs)
+                obs = env.reset()
+                eid = client.start_episode()
+
+
 class PartOffPolicyServing(ExternalEnv):
     def __init__(self, env, off_pol_frac):
         ExternalEnv.__init__(self, env.action_space, env.observation_space)
@@ -128,6 +163,17 @@ class TestExternalEnv(unittest.TestCase):
             batch = ev.sample()
             self.assertEqual(batch.count, 40)
 
+    def testBinaryPolicyServer(self):
+        ev = PolicyEvaluator(
+            env_creator=lambda _: BinaryServing(25, num_clients=4),
+            policy_graph=MockPolicyGraph,
+            batch_steps=40,
+            batch_mode="complete_episodes")
+        for _ in range(3):
+            batch = ev.sample()
+            self.assertGreaterEqual(batch.count, 50)
+            self.assertEqual(batch.count % 25, 0)
+
     def testExternalEnvOffPolicy(self):
         ev = PolicyEvaluator(
             env_creator=lambda _: SimpleOffPolicyServing(MockEnv(25), 42),
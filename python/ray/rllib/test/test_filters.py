@@ -8,6 +8,7 @@ import numpy as np
 import ray
 from ray.rllib.utils.filter import RunningStat, MeanStdFilter
 from ray.rllib.utils import FilterManager
+from ray.rllib.evaluation.sampler import _filter_observations
 from ray.rllib.test.mock_evaluator import _MockEvaluator
 
 
@@ -45,6 +46,21 @@ class RunningStatTest(unittest.TestCase):
             assert np.allclose(rs.mean, rs1.mean)
             assert np.allclose(rs.std, rs1.std)
 
+    def testPushBatch(self):
+        for shape in [(), (3, ), (3, 4)]:
+            rs1 = RunningStat(shape)
+            rs2 = RunningStat(shape)
+            vals = np.random.randn(10, *shape)
+            for val in vals[:3]:
+                rs1.push(val)
+                rs2.push(val)
+            for val in vals[3:]:
+                rs1.push(val)
+            rs2.push_batch(vals[3:])
+            self.assertEqual(rs1.n, rs2.n)
+            self.assertTrue(np.allclose(rs1.mean, rs2.mean))
+            self.assertTrue(np.allclose(rs1.std, rs2.std))
+
 
 class MSFTest(unittest.TestCase):
     def testBasic(self):
@@ -72,6 +88,26 @@ class MSFTest(unittest.TestCase):
             self.assertEqual(filt.buffer.n, 5)
             self.assertEqual(filt.rs.n, 15)
 
+    def testFilterObservations(self):
+        inputs = []
+
+        def obs_filter(obs):
+            inputs.append(obs)
+            return obs
+
+        obs = {
+            "p1": [((0, "a"), np.zeros(3)), ((1, "a"), np.ones(3))],
+            "p2": [((0, "b"), (np.zeros(2), np.zeros(2))),
+                   ((1, "b"), (np.ones(2), np.ones(2)))],
+        }
+        filtered = _filter_observations({"p1": obs_filter, "p2": obs_filter},
+                                        obs)
+        # Array observations are filtered in one batch, others one by one
+        self.assertEqual(len(inputs), 3)
+        self.assertEqual(filtered[(1, "a")].tolist(), [1, 1, 1])
+        self.assertIsInstance(filtered[(1, "b")], tuple)
+        self.assertEqual(filtered[(1, "b")][0].tolist(), [1, 1])
+
 
 class FilterManagerTest(unittest.TestCase):
     def setUp(self):
@@ -2,14 +2,19 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import time
 import unittest
 
 import numpy as np
+from six.moves import queue
 
 import ray
 from ray.rllib.test.mock_evaluator import _MockEvaluator
 from ray.rllib.optimizers import AsyncGradientsOptimizer
-from ray.rllib.evaluation import SampleBatch
+from ray.rllib.optimizers.async_samples_optimizer import _concat_loss_columns
+from ray.rllib.evaluation import SampleBatch, SampleBatchBuilder
+from ray.rllib.utils.broadcast import broadcast, wait_for_broadcast
+from ray.rllib.utils.prefetch import Prefetcher
 
 
 class AsyncOptimizerTest(unittest.TestCase):
@@ -27,6 +32,56 @@ class AsyncOptimizerTest(unittest.TestCase):
         self.assertTrue(all(local.get_weights() == 0))
 
 
+class BroadcastTest(unittest.TestCase):
+    def tearDown(self):
+        ray.shutdown()
+
+    def testTreeBroadcast(self):
+        ray.init(num_cpus=8)
+        remotes = ray.remote(_MockEvaluator)
+        remote_evaluators = [remotes.remote() for i in range(7)]
+        weights = np.array([1, 2, 3, 4])
+        wait_for_broadcast(
+            broadcast(weights, remote_evaluators, "set_weights", fanout=2))
+        for w in ray.get([e.get_weights.remote() for e in remote_evaluators]):
+            self.assertEqual(w.tolist(), [1, 2, 3, 4])
+
+
+class PrefetcherTest(unittest.TestCase):
+    def testPrefetch(self):
+        def double(x):
+            if x is None:
+                raise ValueError("intentional error")
+            return 2 * x
+
+        inqueue = queue.Queue()
+        prefetcher = Prefetcher(inqueue, double, depth=2)
+        for i in range(5):
+            inqueue.put(i)
+        self.assertEqual([prefetcher.get() for _ in range(5)],
+                         [0, 2, 4, 6, 8])
+        inqueue.put(None)
+        self.assertRaises(ValueError, prefetcher.get)
+        self.assertEqual(prefetcher.stats()["ready"]["size_count"], 6)
+
+    def testPrefetchDepthBoundsThreads(self):
+        processed = []
+
+        def record(x):
+            processed.append(x)
+            return x
+
+        inqueue = queue.Queue()
+        prefetcher = Prefetcher(inqueue, record, depth=2, num_threads=8)
+        for i in range(10):
+            inqueue.put(i)
+        time.sleep(0.5)
+        self.assertEqual(len(processed), 2)
+        self.assertIn(prefetcher.get(), [0, 1])
+        time.sleep(0.5)
+        self.assertEqual(len(processed), 3)
+
+
 class SampleBatchTest(unittest.TestCase):
     def testConcat(self):
         b1 = SampleBatch({"a": np.array([1, 2, 3]), "b": np.array([4, 5, 6])})
@@ -39,6 +94,58 @@ class SampleBatchTest(unittest.TestCase):
         self.assertEqual(b["a"].tolist(), [1, 2, 3, 1, 1])
         self.assertEqual(b["b"].tolist(), [4, 5, 6, 4, 5])
 
+    def testConcatSingleBatch(self):
+        b1 = SampleBatch({"a": np.array([1, 2, 3])})
+        b2 = SampleBatch({"a": np.array([], dtype=np.int64)})
+        b = SampleBatch.concat_samples([b1, b2])
+        self.assertIs(b["a"], b1["a"])
+
+    def testConcatLossColumnsWithRNNState(self):
+        class _MockRNNPolicy(object):
+            def loss_inputs(self):
+                return [("obs", None), ("actions", None)]
+
+        def make_batch(n):
+            return SampleBatch({
+                "obs": np.arange(n),
+                "actions": np.arange(n),
+                "infos": np.arange(n),
+                "eps_id": np.zeros(n),
+                "agent_index": np.zeros(n),
+                "state_in_0": np.ones((n, 4)),
+                "state_in_1": np.ones((n, 4)) * 2,
+                "state_out_0": np.ones((n, 4)),
+            })
+
+        b = _concat_loss_columns([make_batch(2), make_batch(3)],
+                                 _MockRNNPolicy())
+        self.assertEqual(
+            sorted(b.keys()), [
+                "actions", "agent_index", "eps_id", "obs", "state_in_0",
+                "state_in_1"
+            ])
+        self.assertEqual(b.count, 5)
+        self.assertEqual(b["state_in_1"].shape, (5, 4))
+
+    def testBuilder(self):
+        builder = SampleBatchBuilder()
+        for i in range(100):
+            builder.add_values(
+                obs=np.ones(4) * i, rewards=i, dones=False, infos={"i": i})
+        builder.add_values(
+            obs=np.zeros(4), rewards=0.5, dones=True, infos={"i": 100})
+        batch = builder.build_and_reset()
+        self.assertEqual(batch.count, 101)
+        self.assertEqual(builder.count, 0)
+        self.assertEqual(batch["obs"].shape, (101, 4))
+        self.assertEqual(batch["obs"].dtype, np.float32)
+        self.assertEqual(batch["rewards"].tolist()[-2:], [99.0, 0.5])
+        self.assertEqual(batch["dones"].tolist()[-2:], [False, True])
+        self.assertEqual(batch["infos"][5], {"i": 5})
+        builder.add_batch(batch)
+        builder.add_batch(batch)
+        self.assertEqual(builder.build_and_reset().count, 202)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
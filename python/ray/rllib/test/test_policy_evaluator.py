@@ -4,6 +4,9 @@ from __future__ import print_function
 
 import gym
 import numpy as np
+import os
+import shutil
+import tempfile
 import time
 import unittest
 from collections import Counter
@@ -12,10 +15,15 @@ import ray
 from ray.rllib.agents.pg import PGAgent
 from ray.rllib.agents.a3c import A2CAgent
 from ray.rllib.evaluation.policy_evaluator import PolicyEvaluator
-from ray.rllib.evaluation.metrics import collect_metrics
+from ray.rllib.evaluation.metrics import collect_metrics, collect_episodes, \
+    EpisodeSummary
+from ray.rllib.evaluation.sampler import RolloutMetrics
 from ray.rllib.evaluation.policy_graph import PolicyGraph
-from ray.rllib.evaluation.postprocessing import compute_advantages
+from ray.rllib.evaluation.postprocessing import compute_advantages, \
+    compute_advantages_batch
 from ray.rllib.env.vector_env import VectorEnv
+from ray.rllib.offline.sample_batch_files import SampleBatchReader, \
+    FILE_SUFFIX, MAGIC
 from ray.tune.registry import register_env
 
 
@@ -55,6 +63,21 @@ class BadPolicyGraph(PolicyGraph):
         return compute_advantages(batch, 100.0, 0.9, use_gae=False)
 
 
+class BatchPostprocessingPolicyGraph(MockPolicyGraph):
+    def __init__(self, observation_space, action_space, config):
+        MockPolicyGraph.__init__(self, observation_space, action_space, config)
+        self.postprocess_sizes = []
+
+    def postprocess_trajectories(self,
+                                 batches,
+                                 other_agent_batches=None,
+                                 episodes=None):
+        assert all(episode is not None for episode in episodes)
+        self.postprocess_sizes.append(len(batches))
+        return compute_advantages_batch(
+            batches, [100.0] * len(batches), 0.9, use_gae=False)
+
+
 class FailOnStepEnv(gym.Env):
     def __init__(self):
         self.observation_space = gym.spaces.Discrete(1)
@@ -255,6 +278,39 @@ class TestPolicyEvaluator(unittest.TestCase):
         self.assertEqual(result["episodes_this_iter"], 20)
         self.assertEqual(result["episode_reward_mean"], 10)
 
+    def testCollectEpisodes(self):
+        ev = PolicyEvaluator(
+            env_creator=lambda _: MockEnv(episode_length=10),
+            policy_graph=MockPolicyGraph,
+            batch_mode="complete_episodes")
+        ev.sample()
+        episodes, num_dropped = collect_episodes(ev, [])
+        self.assertEqual(len(episodes), 10)
+        self.assertTrue(all(isinstance(e, RolloutMetrics) for e in episodes))
+        self.assertEqual([e.episode_length for e in episodes], [10] * 10)
+        self.assertEqual(num_dropped, 0)
+
+    def testMergedEpisodeSummary(self):
+        rewards = np.random.RandomState(0).exponential(size=10000)
+        episodes = [
+            RolloutMetrics(10, r, {(0, "p1"): r}, {"m": 1.0}) for r in rewards
+        ]
+        summary = EpisodeSummary()
+        for i in range(0, len(episodes), 1000):
+            summary.merge(EpisodeSummary.from_episodes(episodes[i:i + 1000]))
+        self.assertEqual(summary.count, 10000)
+        self.assertEqual(summary.rewards.min, min(rewards))
+        self.assertEqual(summary.rewards.max, max(rewards))
+        self.assertAlmostEqual(summary.rewards.mean(), np.mean(rewards))
+        self.assertAlmostEqual(summary.policy_rewards["p1"].mean(),
+                               np.mean(rewards))
+        self.assertEqual(summary.custom_metrics["m"].mean(), 1.0)
+        for q in [0.01, 0.5, 0.99]:
+            self.assertAlmostEqual(
+                summary.rewards.quantile(q),
+                np.percentile(rewards, 100 * q),
+                delta=0.02 * np.percentile(rewards, 100 * q) + 1e-3)
+
     def testAsync(self):
         ev = PolicyEvaluator(
             env_creator=lambda _: gym.make("CartPole-v0"),
@@ -300,6 +356,66 @@ class TestPolicyEvaluator(unittest.TestCase):
             indices.append(env.unwrapped.config.vector_index)
         self.assertEqual(indices, [0, 1, 2, 3, 4, 5, 6, 7])
 
+    def testBatchedPostprocessing(self):
+        ev = PolicyEvaluator(
+            env_creator=lambda cfg: MockEnv(episode_length=20, config=cfg),
+            policy_graph=BatchPostprocessingPolicyGraph,
+            batch_mode="truncate_episodes",
+            batch_steps=5,
+            num_envs=8)
+        batch = ev.sample()
+        self.assertEqual(batch.count, 40)
+        self.assertEqual(ev.policy_map["default"].postprocess_sizes, [8])
+        expected = [
+            sum(0.9**k for k in range(5 - t)) + 0.9**(5 - t) * 100.0
+            for t in range(5)
+        ]
+        self.assertTrue(
+            np.allclose(batch["advantages"][:5], expected, rtol=1e-5))
+
+    def testSubprocessVectorization(self):
+        ev = PolicyEvaluator(
+            env_creator=lambda cfg: MockEnv(episode_length=20, config=cfg),
+            policy_graph=MockPolicyGraph,
+            batch_mode="truncate_episodes",
+            batch_steps=2,
+            num_envs=4,
+            subprocess_envs=True)
+        for _ in range(16):
+            batch = ev.sample()
+            self.assertEqual(batch.count, 8)
+        result = collect_metrics(ev, [])
+        self.assertEqual(result["episodes_this_iter"], 4)
+        procs = ev.env._procs
+        ev.stop()
+        self.assertFalse(any(p.is_alive() for p in procs))
+
+    def testSubprocessEnvSpec(self):
+        ev = PolicyEvaluator(
+            env_creator=lambda _: gym.make("CartPole-v0"),
+            policy_graph=MockPolicyGraph,
+            num_envs=2,
+            subprocess_envs=True)
+        specs = [u.spec for u in ev.env.get_unwrapped()]
+        self.assertEqual([s.id for s in specs], ["CartPole-v0"] * 2)
+        self.assertEqual([s.max_episode_steps for s in specs], [200] * 2)
+        ev.stop()
+
+    def testAsyncEnvStepping(self):
+        ev = PolicyEvaluator(
+            env_creator=lambda _: MockEnv(episode_length=20),
+            policy_graph=MockPolicyGraph,
+            batch_mode="truncate_episodes",
+            batch_steps=2,
+            num_envs=8,
+            async_env_stepping=True,
+            async_env_min_ready=4)
+        for _ in range(16):
+            batch = ev.sample()
+            self.assertEqual(batch.count, 16)
+        result = collect_metrics(ev, [])
+        self.assertGreater(result["episodes_this_iter"], 0)
+
     def testBatchesLargerWhenVectorized(self):
         ev = PolicyEvaluator(
             env_creator=lambda _: MockEnv(episode_length=8),
@@ -362,6 +478,42 @@ class TestPolicyEvaluator(unittest.TestCase):
             batch["t"].tolist(),
             [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 0, 1, 2, 3, 4, 5, 6, 7, 8, 9])
 
+    def testOutputAndInput(self):
+        output_dir = tempfile.mkdtemp()
+        try:
+            ev = PolicyEvaluator(
+                env_creator=lambda _: MockEnv(10),
+                policy_graph=MockPolicyGraph,
+                batch_steps=15,
+                output_path=output_dir,
+                output_max_file_size=1)
+            written = [ev.sample() for _ in range(3)]
+            ev.output_writer.close()
+            ev2 = PolicyEvaluator(
+                env_creator=lambda _: MockEnv(10),
+                policy_graph=MockPolicyGraph,
+                batch_steps=15,
+                input_path=output_dir)
+            read = [ev2.sample() for _ in range(3)]
+            self.assertEqual(
+                sorted(b["t"].tolist() for b in written),
+                sorted(b["t"].tolist() for b in read))
+            self.assertEqual(read[0]["infos"][0], {})
+        finally:
+            shutil.rmtree(output_dir)
+
+    def testInputWithoutBatches(self):
+        input_dir = tempfile.mkdtemp()
+        try:
+            for name, data in [("a", b""), ("b", MAGIC)]:
+                with open(os.path.join(input_dir, name + FILE_SUFFIX),
+                          "wb") as f:
+                    f.write(data)
+            reader = SampleBatchReader(input_dir)
+            self.assertRaises(ValueError, reader.next)
+        finally:
+            shutil.rmtree(input_dir)
+
     def testFilterSync(self):
         ev = PolicyEvaluator(
             env_creator=lambda _: gym.make("CartPole-v0"),
@@ -0,0 +1,78 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import ray
+from ray.rllib.utils import shared_noise
+from ray.rllib.utils.shared_noise import create_shared_noise
+
+
+@ray.remote
+class _NoiseReader(object):
+    def read(self, count, noise_dir):
+        noise = create_shared_noise(count, noise_dir=noise_dir)
+        return os.getpid(), np.array(noise)
+
+
+class SharedNoiseTest(unittest.TestCase):
+    def setUp(self):
+        self.noise_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        ray.shutdown()
+        shutil.rmtree(self.noise_dir)
+
+    def testMatchesGenerator(self):
+        chunk_size = shared_noise._GENERATE_CHUNK_SIZE
+        shared_noise._GENERATE_CHUNK_SIZE = 7
+        try:
+            noise = create_shared_noise(100, noise_dir=self.noise_dir)
+        finally:
+            shared_noise._GENERATE_CHUNK_SIZE = chunk_size
+        expected = np.random.RandomState(123).randn(100).astype(np.float32)
+        self.assertEqual(noise.dtype, np.float32)
+        self.assertTrue(np.array_equal(noise, expected))
+        self.assertFalse(noise.flags.writeable)
+
+    def testFileReused(self):
+        noise = create_shared_noise(100, noise_dir=self.noise_dir)
+        [path] = [
+            os.path.join(self.noise_dir, f)
+            for f in os.listdir(self.noise_dir) if f.endswith(".float32")
+        ]
+        stat = os.stat(path)
+
+        generate = shared_noise._generate_noise_file
+        shared_noise._generate_noise_file = None  # fails if called
+        try:
+            noise2 = create_shared_noise(100, noise_dir=self.noise_dir)
+        finally:
+            shared_noise._generate_noise_file = generate
+        self.assertTrue(np.array_equal(noise, noise2))
+        self.assertEqual(os.stat(path).st_ino, stat.st_ino)
+        self.assertEqual(os.stat(path).st_mtime, stat.st_mtime)
+
+    def testWorkersShareNoise(self):
+        ray.init(num_cpus=2)
+        readers = [_NoiseReader.remote() for _ in range(2)]
+        results = ray.get(
+            [reader.read.remote(1000, self.noise_dir) for reader in readers])
+        self.assertNotEqual(results[0][0], results[1][0])
+        self.assertTrue(np.array_equal(results[0][1], results[1][1]))
+        local = create_shared_noise(1000, noise_dir=self.noise_dir)
+        self.assertTrue(np.array_equal(local, results[0][1]))
+        files = [
+            f for f in os.listdir(self.noise_dir) if f.endswith(".float32")
+        ]
+        self.assertEqual(len(files), 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,73 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+
+from ray.rllib.evaluation.postprocessing import compute_advantages
+from ray.rllib.evaluation.sample_batch import SampleBatch
+from ray.rllib.utils.compression import pack, unpack
+from ray.rllib.utils.filter import MeanStdFilter
+
+
+def _make_batch(count, obs_shape=(84, )):
+    return SampleBatch({
+        "obs": np.random.randn(count, *obs_shape).astype(np.float32),
+        "actions": np.random.randint(0, 2, count),
+        "rewards": np.random.randn(count).astype(np.float32),
+        "dones": np.zeros(count, dtype=np.bool_),
+        "vf_preds": np.random.randn(count).astype(np.float32),
+    })
+
+
+class ConcatSamplesSuite(object):
+    params = [4, 64]
+    param_names = ["num_batches"]
+
+    def setup(self, num_batches):
+        self.batches = [_make_batch(200) for _ in range(num_batches)]
+
+    def time_concat_samples(self, num_batches):
+        SampleBatch.concat_samples(self.batches)
+
+
+class ComputeAdvantagesSuite(object):
+    params = [[10, 1000], [False, True]]
+    param_names = ["trajectory_length", "use_gae"]
+
+    def setup(self, trajectory_length, use_gae):
+        self.batches = [
+            _make_batch(trajectory_length)
+            for _ in range(10000 // trajectory_length)
+        ]
+
+    def time_compute_advantages(self, trajectory_length, use_gae):
+        for batch in self.batches:
+            compute_advantages(
+                batch, 0.0, gamma=0.99, lambda_=0.95, use_gae=use_gae)
+
+
+class MeanStdFilterSuite(object):
+    def setup(self):
+        self.filter = MeanStdFilter((84, ))
+        self.obs = np.random.randn(84)
+        self.obs_batch = np.random.randn(256, 84)
+
+    def time_push(self):
+        for _ in range(256):
+            self.filter(self.obs)
+
+    def time_push_batch(self):
+        self.filter(self.obs_batch)
+
+
+class CompressionSuite(object):
+    def setup(self):
+        self.obs = np.random.randint(0, 255, (84, 84, 4)).astype(np.uint8)
+        self.packed = pack(self.obs)
+
+    def time_pack(self):
+        pack(self.obs)
+
+    def time_unpack(self):
+        unpack(self.packed)
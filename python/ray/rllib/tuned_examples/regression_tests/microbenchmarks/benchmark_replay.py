@@ -0,0 +1,68 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import numpy as np
+
+from ray.rllib.optimizers.replay_buffer import PrioritizedReplayBuffer, \
+    ReplayBuffer
+from ray.rllib.optimizers.segment_tree import SumSegmentTree
+
+BUFFER_SIZE = 100000
+NUM_ADDS = 10000
+BATCH_SIZE = 512
+
+
+def _fill(buf, count):
+    obs = np.zeros(84, dtype=np.float32)
+    for i in range(count):
+        buf.add(obs, 0, 1.0, obs, False, 1.0)
+
+
+class ReplayBufferSuite(object):
+    def setup(self):
+        self.buffer = ReplayBuffer(BUFFER_SIZE)
+        _fill(self.buffer, BUFFER_SIZE)
+
+    def time_add(self):
+        _fill(self.buffer, NUM_ADDS)
+
+    def time_sample(self):
+        self.buffer.sample(BATCH_SIZE)
+
+
+class PrioritizedReplayBufferSuite(object):
+    def setup(self):
+        self.buffer = PrioritizedReplayBuffer(BUFFER_SIZE, alpha=0.6)
+        _fill(self.buffer, BUFFER_SIZE)
+        self.idxes = np.random.randint(0, BUFFER_SIZE, BATCH_SIZE)
+        self.priorities = np.random.uniform(0.1, 1.0, BATCH_SIZE)
+
+    def time_add(self):
+        _fill(self.buffer, NUM_ADDS)
+
+    def time_sample(self):
+        self.buffer.sample(BATCH_SIZE, beta=0.4)
+
+    def time_update_priorities(self):
+        self.buffer.update_priorities(self.idxes, self.priorities)
+
+
+class SumSegmentTreeSuite(object):
+    def setup(self):
+        self.tree = SumSegmentTree(2**17)
+        for i in range(BUFFER_SIZE):
+            self.tree[i] = 1.0
+        self.prefixsums = np.random.uniform(0, BUFFER_SIZE, BATCH_SIZE)
+
+    def time_setitem(self):
+        for i in range(BATCH_SIZE):
+            self.tree[i] = 2.0
+
+    def time_sum(self):
+        for i in range(BATCH_SIZE):
+            self.tree.sum(i, BUFFER_SIZE - i)
+
+    def time_find_prefixsum_idx(self):
+        for prefixsum in self.prefixsums:
+            self.tree.find_prefixsum_idx(prefixsum)
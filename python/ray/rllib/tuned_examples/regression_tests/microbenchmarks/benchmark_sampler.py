@@ -0,0 +1,93 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import gym
+import numpy as np
+
+from ray.rllib.evaluation.policy_graph import PolicyGraph
+from ray.rllib.evaluation.sample_batch import DEFAULT_POLICY_ID
+from ray.rllib.evaluation.sampler import AsyncSampler, SyncSampler
+from ray.rllib.env.vector_env import VectorEnv
+from ray.rllib.utils.filter import NoFilter
+
+# Number of env steps collected per benchmark run
+NUM_STEPS = 2000
+
+
+class _MockEnv(gym.Env):
+    def __init__(self, episode_length=100):
+        self.episode_length = episode_length
+        self.i = 0
+        self.observation_space = gym.spaces.Box(
+            -1.0, 1.0, shape=(16, ), dtype=np.float32)
+        self.action_space = gym.spaces.Discrete(2)
+        self.obs = np.zeros(16, dtype=np.float32)
+
+    def reset(self):
+        self.i = 0
+        return self.obs
+
+    def step(self, action):
+        self.i += 1
+        return self.obs, 1.0, self.i >= self.episode_length, {}
+
+
+class _MockPolicyGraph(PolicyGraph):
+    def compute_actions(self,
+                        obs_batch,
+                        state_batches,
+                        prev_action_batch=None,
+                        prev_reward_batch=None,
+                        is_training=False,
+                        episodes=None):
+        return np.zeros(len(obs_batch), dtype=np.int64), [], {}
+
+
+def _make_sampler(sampler_cls, num_envs):
+    env = _MockEnv()
+    if num_envs > 1:
+        env = VectorEnv.wrap(
+            make_env=lambda _: _MockEnv(),
+            existing_envs=[env],
+            num_envs=num_envs)
+    policy = _MockPolicyGraph(env.observation_space, env.action_space, {})
+    return sampler_cls(
+        env, {DEFAULT_POLICY_ID: policy},
+        lambda agent_id: DEFAULT_POLICY_ID, {DEFAULT_POLICY_ID: NoFilter()},
+        clip_rewards=False,
+        unroll_length=100,
+        callbacks={},
+        pack=True)
+
+
+def _collect(sampler):
+    steps = 0
+    while steps < NUM_STEPS:
+        steps += sampler.get_data().count
+
+
+class SyncSamplerSuite(object):
+    params = [1, 16]
+    param_names = ["num_envs"]
+
+    def setup(self, num_envs):
+        self.sampler = _make_sampler(SyncSampler, num_envs)
+
+    def time_sample(self, num_envs):
+        _collect(self.sampler)
+
+
+class AsyncSamplerSuite(object):
+    params = [1, 16]
+    param_names = ["num_envs"]
+
+    def setup(self, num_envs):
+        self.sampler = _make_sampler(AsyncSampler, num_envs)
+        self.sampler.start()
+
+    def teardown(self, num_envs):
+        self.sampler.shutdown()
+
+    def time_sample(self, num_envs):
+        _collect(self.sampler)
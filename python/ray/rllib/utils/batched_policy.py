@@ -0,0 +1,126 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import gym
+import numpy as np
+import tensorflow as tf
+
+import ray
+from ray.rllib.evaluation.sampler import _unbatch_tuple_actions
+from ray.rllib.models import ModelCatalog
+
+
+def batched_rollout(policy,
+                    vector_env,
+                    timestep_limit=None,
+                    add_noise=False,
+                    offset=0):
+    """Do one rollout in each env of the vector env, in lockstep.
+
+    The env at index i takes actions from copy i of the batched policy, so
+    each step of all the rollouts needs only a single TF session call.
+
+    Arguments:
+        policy (BatchedGenericPolicy): Policy with one copy per env.
+        vector_env (VectorEnv): Envs to roll out, which must support
+            step_at().
+        timestep_limit (int): Steps after which to end the rollouts.
+        add_noise (bool): Whether to add exploratory action noise.
+        offset (float): Value to subtract from each reward, e.g. the
+            survival bonus of humanoid.
+
+    Returns:
+        rews (list): Reward arrays of each rollout.
+        lengths (list): Lengths of each rollout.
+    """
+    env_timestep_limit = vector_env.get_unwrapped()[0].spec.max_episode_steps
+    timestep_limit = (env_timestep_limit if timestep_limit is None else min(
+        timestep_limit, env_timestep_limit))
+    num_envs = vector_env.num_envs
+    rews = [[] for _ in range(num_envs)]
+    active = [True] * num_envs
+    observations = vector_env.vector_reset()
+    for _ in range(timestep_limit or 999999):
+        actions = policy.compute(
+            observations, active, add_noise=add_noise, update=True)
+        for i in range(num_envs):
+            if active[i]:
+                observations[i], rew, done, _ = vector_env.step_at(
+                    i, actions[i])
+                rews[i].append(rew - np.abs(offset))
+                if done:
+                    active[i] = False
+        if not any(active):
+            break
+    lengths = [len(r) for r in rews]
+    rews = [np.array(r, dtype=np.float32) for r in rews]
+    return rews, lengths
+
+
+class BatchedGenericPolicy(object):
+    """Several copies of the ES/ARS policy network, each with own weights.
+
+    All copies are evaluated in a single session call, which lets a worker
+    roll out several parameter perturbations at once. The copies share the
+    observation filter of the given single-copy policy.
+    """
+
+    def __init__(self,
+                 sess,
+                 action_space,
+                 obs_space,
+                 preprocessor,
+                 observation_filter,
+                 model_config,
+                 num_copies,
+                 action_noise_std=0.0):
+        self.sess = sess
+        self.action_space = action_space
+        self.action_noise_std = action_noise_std
+        self.preprocessor = preprocessor
+        self.observation_filter = observation_filter
+        self.num_copies = num_copies
+        self.inputs = tf.placeholder(
+            tf.float32, [num_copies] + list(self.preprocessor.shape))
+
+        dist_class, dist_dim = ModelCatalog.get_action_dist(
+            self.action_space, model_config, dist_type="deterministic")
+        self.samplers = []
+        self.variables = []
+        for i in range(num_copies):
+            with tf.variable_scope("policy_copy_{}".format(i)):
+                model = ModelCatalog.get_model({
+                    "obs": self.inputs[i:i + 1]
+                }, obs_space, dist_dim, model_config)
+            self.samplers.append(dist_class(model.outputs).sample())
+            self.variables.append(
+                ray.experimental.TensorFlowVariables(model.outputs,
+                                                     self.sess))
+        self.sess.run(tf.global_variables_initializer())
+
+    def compute(self, observations, active, add_noise=False, update=True):
+        """Computes one action per copy, for the observation of that copy.
+
+        Only the observations of active copies update the filter statistics.
+        """
+        observations = self.preprocessor.transform_batch(observations)
+        if update and any(active):
+            self.observation_filter(
+                observations[np.asarray(active)], update=True)
+        observations = self.observation_filter(observations, update=False)
+        actions = self.sess.run(
+            self.samplers, feed_dict={self.inputs: observations})
+        actions = [_unbatch_tuple_actions(a)[0] for a in actions]
+        if add_noise and isinstance(self.action_space, gym.spaces.Box):
+            actions = [
+                a + np.random.randn(*a.shape) * self.action_noise_std
+                for a in actions
+            ]
+        return actions
+
+    def set_weights(self, xs):
+        """Sets the flat weights of each copy from a list of weights."""
+        assert len(xs) == self.num_copies
+        for variables, x in zip(self.variables, xs):
+            variables.set_flat(x)
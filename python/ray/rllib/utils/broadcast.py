@@ -0,0 +1,90 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import ray
+
+# Max number of actors that a single process sends a broadcast value to
+BROADCAST_FANOUT = 16
+
+
+def broadcast(value, actors, method_name, fanout=BROADCAST_FANOUT):
+    """Calls `method_name(value)` on each actor, relaying through a tree.
+
+    With more actors than the fanout, the caller only sends the value to
+    `fanout` actors. Each of those applies it, puts a copy in its own node's
+    object store and relays that copy to the next level of the tree, so no
+    single node has to serve the value to every actor. Actors opt in to
+    relaying by exposing `broadcast_relay` (see `relay_broadcast`); if any
+    of them does not, the value is sent to all actors directly.
+
+    Calls sent directly are ordered before later calls from the caller to
+    the same actor. Relayed calls are not, so pass the returned ids to
+    `wait_for_broadcast` if later calls depend on the value.
+
+    Arguments:
+        value (obj|ObjectID): Value to broadcast, or its object id.
+        actors (list): Actor handles to call the method on.
+        method_name (str): Name of the actor method to call with the value.
+        fanout (int): Max number of actors each process relays to.
+
+    Returns:
+        ids (list): Object ids of the calls sent by the caller. The calls to
+            relaying actors return the ids of the calls to their children.
+    """
+
+    if not actors:
+        return []
+    value_id = value if isinstance(value, ray.ObjectID) else ray.put(value)
+    if (len(actors) <= fanout
+            or not all(hasattr(a, "broadcast_relay") for a in actors)):
+        return [getattr(a, method_name).remote(value_id) for a in actors]
+    # Wrap the id in a list so that it is not resolved before the relay
+    return [
+        root.broadcast_relay.remote(method_name, [value_id], subtree, fanout)
+        for root, subtree in _split_tree(actors, fanout)
+    ]
+
+
+def relay_broadcast(actor, method_name, value_ids, children, fanout):
+    """Implements the `broadcast_relay` method of an actor.
+
+    Arguments:
+        actor (obj): The actor instance that received the value.
+        method_name (str): Name of the method to call with the value.
+        value_ids (list): Single-element list with the value's object id.
+        children (list): Actor handles to relay the value to.
+        fanout (int): Max number of actors each process relays to.
+
+    Returns:
+        ids (list): Object ids of the calls to the children. These are not
+            waited on, so a busy child does not block the relaying actor.
+    """
+
+    value = ray.get(value_ids[0])
+    # Children pull the value from this node instead of from the sender
+    pending = broadcast(ray.put(value), children, method_name, fanout)
+    getattr(actor, method_name)(value)
+    return pending
+
+
+def wait_for_broadcast(ids):
+    """Blocks until the method has been called on all actors of a broadcast.
+
+    Arguments:
+        ids (list): Object ids returned by `broadcast`.
+    """
+
+    while ids:
+        ids = [
+            child_id for result in ray.get(ids) if isinstance(result, list)
+            for child_id in result if isinstance(child_id, ray.ObjectID)
+        ]
+
+
+def _split_tree(actors, fanout):
+    """Splits actors into at most `fanout` (root, subtree) pairs."""
+
+    num_groups = min(fanout, len(actors))
+    groups = [actors[i::num_groups] for i in range(num_groups)]
+    return [(group[0], group[1:]) for group in groups]
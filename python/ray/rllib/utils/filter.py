@@ -87,6 +87,25 @@ class RunningStat(object):
             self._M[...] += delta / self._n
             self._S[...] += delta * delta * n1 / self._n
 
+    def push_batch(self, xs):
+        """Pushes a batch of samples of shape [N, ...] at once.
+
+        The batch statistics are merged with the running statistics using the
+        parallel variance formula, instead of pushing samples one at a time.
+        """
+        xs = np.asarray(xs)
+        if xs.shape[1:] != self._M.shape:
+            raise ValueError(
+                "Unexpected input shape {}, expected [N, {}]".format(
+                    xs.shape, self._M.shape))
+        if xs.shape[0] == 0:
+            return
+        batch = RunningStat()
+        batch._n = xs.shape[0]
+        batch._M = xs.mean(axis=0, dtype=np.float64)
+        batch._S = np.square(xs - batch._M).sum(axis=0)
+        self.update(batch)
+
     def update(self, other):
         n1 = self._n
         n2 = other._n
@@ -211,9 +230,8 @@ class MeanStdFilter(Filter):
         if update:
             if len(x.shape) == len(self.rs.shape) + 1:
                 # The vectorized case.
-                for i in range(x.shape[0]):
-                    self.rs.push(x[i])
-                    self.buffer.push(x[i])
+                self.rs.push_batch(x)
+                self.buffer.push_batch(x)
             else:
                 # The unvectorized case.
                 self.rs.push(x)
@@ -3,6 +3,7 @@ from __future__ import division
 from __future__ import print_function
 
 import ray
+from ray.rllib.utils.broadcast import broadcast
 
 
 class FilterManager(object):
@@ -14,7 +15,8 @@ class FilterManager(object):
     def synchronize(local_filters, remotes, update_remote=True):
         """Aggregates all filters from remote evaluators.
 
-        Local copy is updated and then broadcasted to all remote evaluators.
+        Local copy is updated and then broadcasted to all remote evaluators,
+        through a relay tree if there are many of them.
 
         Args:
             local_filters (dict): Filters to be synchronized.
@@ -28,5 +30,4 @@ class FilterManager(object):
                 local_filters[k].apply_changes(rf[k], with_buffer=False)
         if update_remote:
             copies = {k: v.as_serializable() for k, v in local_filters.items()}
-            remote_copy = ray.put(copies)
-            [r.sync_filters.remote(remote_copy) for r in remotes]
+            broadcast(copies, remotes, "sync_filters")
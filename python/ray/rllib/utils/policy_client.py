@@ -4,6 +4,12 @@ from __future__ import print_function
 
 import logging
 import pickle
+import socket
+import struct
+import threading
+
+import numpy as np
+import six
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +22,13 @@ except ImportError:
 
 
 class PolicyClient(object):
-    """REST client to interact with a RLlib policy server."""
+    """Client to interact with a RLlib policy server.
+
+    Addresses of the form "http://host:port" talk to a PolicyServer over
+    REST. Addresses of the form "tcp://host:port" talk to a
+    BinaryPolicyServer over a single persistent connection, using a compact
+    binary encoding instead of pickle.
+    """
 
     START_EPISODE = "START_EPISODE"
     GET_ACTION = "GET_ACTION"
@@ -26,6 +38,12 @@ class PolicyClient(object):
 
     def __init__(self, address):
         self._address = address
+        self._socket = None
+        if address.startswith("tcp://"):
+            host, port = address[len("tcp://"):].rsplit(":", 1)
+            self._socket = socket.create_connection((host, int(port)))
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._lock = threading.Lock()
 
     def start_episode(self, episode_id=None, training_enabled=True):
         """Record the start of an episode.
@@ -109,6 +127,8 @@ class PolicyClient(object):
         })
 
     def _send(self, data):
+        if self._socket is not None:
+            return self._send_binary(data)
         payload = pickle.dumps(data)
         response = requests.post(self._address, data=payload)
         if response.status_code != 200:
@@ -116,3 +136,134 @@ class PolicyClient(object):
         response.raise_for_status()
         parsed = pickle.loads(response.content)
         return parsed
+
+    def _send_binary(self, data):
+        with self._lock:
+            write_message(self._socket, data)
+            parsed = read_message(self._socket)
+        if parsed is None:
+            raise IOError("Connection to {} closed".format(self._address))
+        if "error" in parsed:
+            raise Exception("Request failed {}: {}".format(
+                parsed["error"], data))
+        return parsed
+
+
+def write_message(sock, message):
+    """Sends a message in the binary policy serving protocol.
+
+    Messages are length-prefixed frames holding an encoded value. Values may
+    be None, bools, ints, floats, strings, numpy arrays, and lists, tuples
+    and string-keyed dicts of these. Arrays are sent as raw bytes.
+    """
+    chunks = []
+    _encode(message, chunks)
+    body = b"".join(chunks)
+    sock.sendall(struct.pack("!I", len(body)) + body)
+
+
+def read_message(sock):
+    """Receives a message sent by write_message, or None on a closed socket.
+    """
+    header = _recv_exactly(sock, 4)
+    if header is None:
+        return None
+    body = _recv_exactly(sock, struct.unpack("!I", header)[0])
+    if body is None:
+        raise IOError("Connection closed in the middle of a message")
+    value, _ = _decode(body, 0)
+    return value
+
+
+def _recv_exactly(sock, size):
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            return None
+        received += n
+    return bytes(buf)
+
+
+def _encode(value, chunks):
+    if value is None:
+        chunks.append(b"N")
+    elif isinstance(value, (bool, np.bool_)):
+        chunks.append(b"T" if value else b"F")
+    elif isinstance(value, (six.integer_types, np.integer)):
+        chunks.append(b"i" + struct.pack("!q", value))
+    elif isinstance(value, (float, np.floating)):
+        chunks.append(b"f" + struct.pack("!d", value))
+    elif isinstance(value, (six.string_types, bytes)):
+        if not isinstance(value, bytes):
+            value = value.encode("utf-8")
+        chunks.append(b"s" + struct.pack("!I", len(value)))
+        chunks.append(value)
+    elif isinstance(value, np.ndarray) and value.dtype.hasobject:
+        _encode(value.tolist(), chunks)
+    elif isinstance(value, np.ndarray):
+        dtype = value.dtype.str.encode("ascii")
+        chunks.append(b"a" + struct.pack("!BB", len(dtype), value.ndim))
+        chunks.append(dtype)
+        chunks.append(struct.pack("!{}I".format(value.ndim), *value.shape))
+        chunks.append(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        chunks.append((b"l" if isinstance(value, list) else b"t") +
+                      struct.pack("!I", len(value)))
+        for item in value:
+            _encode(item, chunks)
+    elif isinstance(value, dict):
+        chunks.append(b"d" + struct.pack("!I", len(value)))
+        for k, v in value.items():
+            _encode(k, chunks)
+            _encode(v, chunks)
+    else:
+        raise TypeError("Cannot encode value of type {}".format(type(value)))
+
+
+def _decode(buf, offset):
+    """Decodes the value at the offset and returns it with the next offset."""
+    tag = buf[offset:offset + 1]
+    offset += 1
+    if tag == b"N":
+        return None, offset
+    elif tag == b"T" or tag == b"F":
+        return tag == b"T", offset
+    elif tag == b"i":
+        return struct.unpack_from("!q", buf, offset)[0], offset + 8
+    elif tag == b"f":
+        return struct.unpack_from("!d", buf, offset)[0], offset + 8
+    elif tag == b"s":
+        size = struct.unpack_from("!I", buf, offset)[0]
+        offset += 4
+        return buf[offset:offset + size].decode("utf-8"), offset + size
+    elif tag == b"a":
+        dtype_len, ndim = struct.unpack_from("!BB", buf, offset)
+        offset += 2
+        dtype = np.dtype(buf[offset:offset + dtype_len].decode("ascii"))
+        offset += dtype_len
+        shape = struct.unpack_from("!{}I".format(ndim), buf, offset)
+        offset += 4 * ndim
+        count = int(np.prod(shape))
+        value = np.frombuffer(buf, dtype, count, offset).reshape(shape)
+        return value.copy(), offset + count * dtype.itemsize
+    elif tag == b"l" or tag == b"t":
+        size = struct.unpack_from("!I", buf, offset)[0]
+        offset += 4
+        items = []
+        for _ in range(size):
+            item, offset = _decode(buf, offset)
+            items.append(item)
+        return (items if tag == b"l" else tuple(items)), offset
+    elif tag == b"d":
+        size = struct.unpack_from("!I", buf, offset)[0]
+        offset += 4
+        value = {}
+        for _ in range(size):
+            k, offset = _decode(buf, offset)
+            value[k], offset = _decode(buf, offset)
+        return value, offset
+    else:
+        raise ValueError("Unknown value tag {!r}".format(tag))
@@ -6,15 +6,16 @@ import pickle
 import sys
 import traceback
 
-from ray.rllib.utils.policy_client import PolicyClient
+from ray.rllib.utils.policy_client import PolicyClient, read_message, \
+    write_message
 
 if sys.version_info[0] == 2:
     from SimpleHTTPServer import SimpleHTTPRequestHandler
     from SocketServer import TCPServer as HTTPServer
-    from SocketServer import ThreadingMixIn
+    from SocketServer import TCPServer, StreamRequestHandler, ThreadingMixIn
 elif sys.version_info[0] == 3:
     from http.server import SimpleHTTPRequestHandler, HTTPServer
-    from socketserver import ThreadingMixIn
+    from socketserver import TCPServer, StreamRequestHandler, ThreadingMixIn
 
 
 class PolicyServer(ThreadingMixIn, HTTPServer):
@@ -55,6 +56,45 @@ class PolicyServer(ThreadingMixIn, HTTPServer):
         HTTPServer.__init__(self, (address, port), handler)
 
 
+class BinaryPolicyServer(ThreadingMixIn, TCPServer):
+    """High-throughput policy server for many concurrent clients.
+
+    Unlike PolicyServer, each client keeps one persistent TCP connection open
+    and requests use a compact binary encoding instead of pickled HTTP
+    bodies. Connect to it with a PolicyClient whose address has the form
+    "tcp://host:port".
+
+    To have the actions of many clients computed in a single policy
+    evaluation, create the ExternalEnv with a `batch_window`.
+
+    Examples:
+        >>> class CartpoleServing(ExternalEnv):
+               def __init__(self):
+                   ExternalEnv.__init__(
+                       self, spaces.Discrete(2),
+                       spaces.Box(
+                           low=-10,
+                           high=10,
+                           shape=(4,),
+                           dtype=np.float32),
+                       max_concurrent=10000,
+                       batch_window=0.005)
+               def run(self):
+                   server = BinaryPolicyServer(self, "localhost", 8900)
+                   server.serve_forever()
+
+        >>> client = PolicyClient("tcp://localhost:8900")
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+    def __init__(self, external_env, address, port):
+        handler = _make_binary_handler(external_env)
+        TCPServer.__init__(self, (address, port), handler)
+
+
 def _make_handler(external_env):
     class Handler(SimpleHTTPRequestHandler):
         def do_POST(self):
@@ -62,33 +102,49 @@ def _make_handler(external_env):
             raw_body = self.rfile.read(content_len)
             parsed_input = pickle.loads(raw_body)
             try:
-                response = self.execute_command(parsed_input)
+                response = _execute_command(external_env, parsed_input)
                 self.send_response(200)
                 self.end_headers()
                 self.wfile.write(pickle.dumps(response))
             except Exception:
                 self.send_error(500, traceback.format_exc())
 
-        def execute_command(self, args):
-            command = args["command"]
-            response = {}
-            if command == PolicyClient.START_EPISODE:
-                response["episode_id"] = external_env.start_episode(
-                    args["episode_id"], args["training_enabled"])
-            elif command == PolicyClient.GET_ACTION:
-                response["action"] = external_env.get_action(
-                    args["episode_id"], args["observation"])
-            elif command == PolicyClient.LOG_ACTION:
-                external_env.log_action(args["episode_id"],
-                                        args["observation"], args["action"])
-            elif command == PolicyClient.LOG_RETURNS:
-                external_env.log_returns(args["episode_id"], args["reward"],
-                                         args["info"])
-            elif command == PolicyClient.END_EPISODE:
-                external_env.end_episode(args["episode_id"],
-                                         args["observation"])
-            else:
-                raise Exception("Unknown command: {}".format(command))
-            return response
+    return Handler
+
+
+def _make_binary_handler(external_env):
+    class Handler(StreamRequestHandler):
+        def handle(self):
+            while True:
+                args = read_message(self.connection)
+                if args is None:
+                    return
+                try:
+                    response = _execute_command(external_env, args)
+                except Exception:
+                    response = {"error": traceback.format_exc()}
+                write_message(self.connection, response)
 
     return Handler
+
+
+def _execute_command(external_env, args):
+    command = args["command"]
+    response = {}
+    if command == PolicyClient.START_EPISODE:
+        response["episode_id"] = external_env.start_episode(
+            args["episode_id"], args["training_enabled"])
+    elif command == PolicyClient.GET_ACTION:
+        response["action"] = external_env.get_action(args["episode_id"],
+                                                     args["observation"])
+    elif command == PolicyClient.LOG_ACTION:
+        external_env.log_action(args["episode_id"], args["observation"],
+                                args["action"])
+    elif command == PolicyClient.LOG_RETURNS:
+        external_env.log_returns(args["episode_id"], args["reward"],
+                                 args["info"])
+    elif command == PolicyClient.END_EPISODE:
+        external_env.end_episode(args["episode_id"], args["observation"])
+    else:
+        raise Exception("Unknown command: {}".format(command))
+    return response
@@ -0,0 +1,102 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import threading
+import time
+
+from six.moves import queue
+
+from ray.rllib.utils.timer import TimerStat
+from ray.rllib.utils.window_stat import WindowStat
+
+
+class Prefetcher(object):
+    """Applies a function to queued items ahead of time in background threads.
+
+    Up to `depth` items are processed or kept ready at any time, whatever
+    the number of threads, so that the consumer only blocks (stalls) when the
+    processing falls behind. Errors raised by the function are re-raised to
+    the consumer by get().
+
+    Examples:
+        >>> inqueue = queue.Queue()
+        >>> prefetcher = Prefetcher(inqueue, convert, depth=2)
+        >>> inqueue.put(batch)
+        >>> converted = prefetcher.get()
+    """
+
+    def __init__(self, inqueue, fn, depth=2, num_threads=1):
+        """Initializes a prefetcher and starts its threads.
+
+        Arguments:
+            inqueue (Queue): Queue to take the items to process from.
+            fn (func): Function to apply to each item.
+            depth (int): Max number of items being processed or ready.
+            num_threads (int): Number of threads applying the function. More
+                than `depth` threads are never busy at the same time.
+        """
+
+        self.inqueue = inqueue
+        self.outqueue = queue.Queue()
+        # A slot is taken before dequeuing an item and freed once the
+        # consumer has taken its result
+        self.slots = threading.Semaphore(depth)
+        self.fn = fn
+        self.input_wait_timer = TimerStat()
+        self.process_timer = TimerStat()
+        self.stall_timer = TimerStat()
+        self.ready_size = WindowStat("size", 50)
+        self.threads = []
+        for _ in range(num_threads):
+            thread = threading.Thread(target=self._run)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def get(self):
+        """Returns the next processed item, blocking until it is ready."""
+
+        self.ready_size.push(self.outqueue.qsize())
+        start = time.time()
+        item = self.outqueue.get()
+        self.stall_timer.push(time.time() - start)
+        self.slots.release()
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    def is_alive(self):
+        return all(thread.is_alive() for thread in self.threads)
+
+    def stats(self):
+        """Returns the timings of the pipeline stage in milliseconds."""
+
+        return {
+            "input_wait_time_ms": _mean_ms(self.input_wait_timer),
+            "process_time_ms": _mean_ms(self.process_timer),
+            "stall_time_ms": _mean_ms(self.stall_timer),
+            "ready": self.ready_size.stats(),
+        }
+
+    def _run(self):
+        while True:
+            self.slots.acquire()
+            # The timers are shared by all threads, so durations are pushed
+            # rather than using them as (non thread-safe) context managers
+            start = time.time()
+            item = self.inqueue.get()
+            self.input_wait_timer.push(time.time() - start)
+            start = time.time()
+            try:
+                result = self.fn(item)
+            except BaseException as e:
+                result = e
+            self.process_timer.push(time.time() - start)
+            self.outqueue.put(result)
+
+
+def _mean_ms(timer):
+    if not timer.count:
+        return 0.0
+    return round(1000 * timer.mean, 3)
@@ -0,0 +1,62 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import fcntl
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Number of noise values generated at a time when creating the table
+_GENERATE_CHUNK_SIZE = 1 << 22
+
+
+def create_shared_noise(count, seed=123, noise_dir=None):
+    """Returns a read-only, node-local table of Gaussian noise.
+
+    The table is generated deterministically from the seed into a file, once
+    per node, and then memory-mapped. All processes on the node that open the
+    same table share its pages, so memory use does not grow with the number
+    of workers, and nothing has to be serialized through the object store.
+
+    Arguments:
+        count (int): Number of float32 noise values in the table.
+        seed (int): Seed of the noise generator.
+        noise_dir (str|None): Directory to keep the table in. Defaults to the
+            system temp dir.
+
+    Returns:
+        noise (np.memmap): Read-only float32 array of the noise values.
+    """
+
+    path = os.path.join(noise_dir or tempfile.gettempdir(),
+                        "ray_shared_noise_{}_{}.float32".format(seed, count))
+    if not os.path.exists(path):
+        with open(path + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Another process on this node may have created it meanwhile
+                if not os.path.exists(path):
+                    _generate_noise_file(path, count, seed)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    return np.memmap(path, dtype=np.float32, mode="r", shape=(count, ))
+
+
+def _generate_noise_file(path, count, seed):
+    logger.info("Generating shared noise table {}".format(path))
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    noise = np.memmap(tmp_path, dtype=np.float32, mode="w+", shape=(count, ))
+    # Drawing in chunks gives the same values as a single randn(count) call
+    random_state = np.random.RandomState(seed)
+    for start in range(0, count, _GENERATE_CHUNK_SIZE):
+        end = min(count, start + _GENERATE_CHUNK_SIZE)
+        noise[start:end] = random_state.randn(end - start)
+    noise.flush()
+    del noise
+    # Rename atomically so that readers never see a partial table
+    os.rename(tmp_path, path)
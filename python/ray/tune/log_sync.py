@@ -2,11 +2,13 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 import distutils.spawn
 import logging
 import os
 import subprocess
 import time
+from multiprocessing.pool import ThreadPool
 
 try:  # py3
     from shlex import quote
@@ -14,7 +16,6 @@ except ImportError:  # py2
     from pipes import quote
 
 import ray
-from ray.tune.cluster_info import get_ssh_key, get_ssh_user
 from ray.tune.error import TuneError
 from ray.tune.result import DEFAULT_RESULTS_DIR
 
@@ -25,16 +26,40 @@ _syncers = {}
 
 S3_PREFIX = "s3://"
 GCS_PREFIX = "gs://"
-ALLOWED_REMOTE_PREFIXES = (S3_PREFIX, GCS_PREFIX)
+
+# Min seconds between syncs of a trial's files from its worker
+FETCH_PERIOD_S = 30
+
+# Min seconds between uploads of a trial's files to remote storage
+UPLOAD_PERIOD_S = 300
+
+# Max bytes of file changes to send in one sync from a worker. Larger
+# changes, such as big checkpoints, are sent over several syncs.
+MAX_FETCH_BYTES = 64 * 1024 * 1024
+
+# Max syncs in flight from the trials of a single node
+MAX_FETCHES_PER_NODE = 8
+
+# Max seconds to wait for a sync from a worker when flushing
+FETCH_TIMEOUT_S = 60
+
+# Number of threads uploading to remote storage
+NUM_UPLOAD_THREADS = 4
+
+# Map from remote storage prefix -> function(local_dir, remote_dir)
+_uploaders = {}
+
+# Number of syncs in flight from each node
+_fetches_per_node = collections.Counter()
+
+_upload_pool = None
 
 
 def get_syncer(local_dir, remote_dir=None):
     if remote_dir:
-        if not any(
-                remote_dir.startswith(prefix)
-                for prefix in ALLOWED_REMOTE_PREFIXES):
+        if not any(remote_dir.startswith(prefix) for prefix in _uploaders):
             raise TuneError("Upload uri must start with one of: {}"
-                            "".format(ALLOWED_REMOTE_PREFIXES))
+                            "".format(tuple(_uploaders)))
 
         if (remote_dir.startswith(S3_PREFIX)
                 and not distutils.spawn.find_executable("aws")):
@@ -63,19 +88,129 @@ def wait_for_log_sync():
         syncer.wait()
 
 
+def register_uploader(prefix, upload_fn):
+    """Registers a function to upload trial dirs to remote storage.
+
+    Uploads run in a pool of NUM_UPLOAD_THREADS threads, and the upload
+    of a trial dir never runs concurrently with another of the same dir.
+
+    Args:
+        prefix (str): Prefix of the upload uris to handle, e.g. "s3://".
+        upload_fn (func): Function called with (local_dir, remote_dir) to
+            upload the contents of local_dir. It should raise on failure.
+    """
+
+    _uploaders[prefix] = upload_fn
+
+
+def _command_uploader(template):
+    def upload(local_dir, remote_dir):
+        subprocess.check_call(
+            template.format(quote(local_dir), quote(remote_dir)), shell=True)
+
+    return upload
+
+
+register_uploader(S3_PREFIX, _command_uploader("aws s3 sync {} {}"))
+register_uploader(GCS_PREFIX, _command_uploader("gsutil rsync -r {} {}"))
+
+
+def _get_upload_pool():
+    global _upload_pool
+    if _upload_pool is None:
+        _upload_pool = ThreadPool(NUM_UPLOAD_THREADS)
+    return _upload_pool
+
+
+def collect_changes(logdir, synced, max_bytes=MAX_FETCH_BYTES):
+    """Returns the changes to the files in a dir since they were synced.
+
+    Files that have grown are assumed to have been appended to, and only
+    their new bytes are returned.
+
+    Arguments:
+        logdir (str): Dir to collect the changes of.
+        synced (dict): Map from the relative path of each synced file to
+            its synced (size, mtime), where mtime is None if only part of
+            the file was synced.
+        max_bytes (int): Max bytes of data to return.
+
+    Returns:
+        List of (relative path, offset, data, mtime) changes, where mtime
+        is None if the data does not extend to the end of the file.
+    """
+
+    changes = []
+    budget = max_bytes
+    for root, _, files in os.walk(logdir):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            rel_path = os.path.relpath(path, logdir)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # removed since listing the dir
+            prior_size, prior_mtime = synced.get(rel_path, (0, None))
+            if (prior_size, prior_mtime) == (stat.st_size, stat.st_mtime):
+                continue
+            if budget <= 0:
+                return changes
+            offset = prior_size if prior_size <= stat.st_size else 0
+            if offset == stat.st_size and prior_mtime is not None:
+                offset = 0  # rewritten in place
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read(min(stat.st_size - offset, budget))
+            complete = offset + len(data) == stat.st_size
+            changes.append((rel_path, offset, data,
+                            stat.st_mtime if complete else None))
+            budget -= len(data)
+    return changes
+
+
+def apply_changes(logdir, synced, changes):
+    """Writes the changes returned by collect_changes() to a dir.
+
+    The synced map passed to collect_changes() is updated accordingly.
+    """
+
+    for rel_path, offset, data, mtime in changes:
+        path = os.path.join(logdir, rel_path)
+        if offset > 0 and not os.path.exists(path):
+            synced.pop(rel_path, None)  # resend the whole file next time
+            continue
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, "r+b" if offset > 0 else "wb") as f:
+            f.seek(offset)
+            f.write(data)
+            f.truncate()
+        synced[rel_path] = (offset + len(data), mtime)
+
+
 class _LogSyncer(object):
     """Log syncer for tune.
 
     This syncs files from workers to the local node, and optionally also from
-    the local node to a remote directory (e.g. S3)."""
+    the local node to a remote directory (e.g. S3).
+
+    Files are synced from workers through the object store, by asking the
+    trial's actor for the changes to its logdir since the last sync."""
 
     def __init__(self, local_dir, remote_dir=None):
         self.local_dir = local_dir
         self.remote_dir = remote_dir
         self.last_sync_time = 0
-        self.sync_process = None
+        self.last_upload_time = 0
         self.local_ip = ray.services.get_node_ip_address()
         self.worker_ip = None
+        self._worker = None
+        # Synced (size, mtime) of the files on each node, by relative path
+        self._synced = collections.defaultdict(dict)
+        # Syncs in flight as (future, worker ip), applied in order
+        self._fetches = collections.deque()
+        self._upload = None
+        self._upload_queued = False
         logger.info("Created LogSyncer for {} -> {}".format(
             local_dir, remote_dir))
 
@@ -84,67 +219,123 @@ class _LogSyncer(object):
 
         self.worker_ip = worker_ip
 
+    def set_worker(self, worker):
+        """Set the actor to sync logs from.
+
+        The worker ip is unknown until the next result of the actor."""
+
+        self._worker = worker
+        self.worker_ip = None
+
+    def release_worker(self):
+        """Starts a last sync from the actor, before it is stopped."""
+
+        if self._worker is not None:
+            self._start_fetch(last=True)
+            self._worker = None
+
     def sync_if_needed(self):
-        if time.time() - self.last_sync_time > 300:
-            self.sync_now()
+        self._poll_fetches()
+        if (not self._fetches
+                and time.time() - self.last_sync_time > FETCH_PERIOD_S):
+            self._start_fetch()
+        if (self.remote_dir
+                and time.time() - self.last_upload_time > UPLOAD_PERIOD_S):
+            self._start_upload()
 
     def sync_now(self, force=False):
+        """Syncs from the worker and starts an upload to remote storage.
+
+        If force is set, this waits for the syncs from the worker to finish
+        before the upload, which starts even if another is in progress.
+        """
+
+        self._poll_fetches()
+        if not self._fetches:
+            self._start_fetch()
+        if force:
+            self._wait_for_fetches()
+        if self.remote_dir:
+            if force or not self._upload_in_progress():
+                self._start_upload()
+            else:
+                logger.warning("Last sync is still in progress, skipping.")
+
+    def wait(self):
+        self._wait_for_fetches()
+        if self._upload is not None:
+            self._upload.wait()
+
+    def _start_fetch(self, last=False):
         self.last_sync_time = time.time()
         if not self.worker_ip:
             logger.info("Worker ip unknown, skipping log sync for {}".format(
                 self.local_dir))
             return
+        if self.worker_ip == self.local_ip or self._worker is None:
+            return  # the files are local, or the worker is gone
+        if (not last and
+                _fetches_per_node[self.worker_ip] >= MAX_FETCHES_PER_NODE):
+            self.last_sync_time = 0  # retry on the next result
+            return
+        future = self._worker.export_logdir.remote(
+            self._synced[self.worker_ip], MAX_FETCH_BYTES)
+        self._fetches.append((future, self.worker_ip))
+        _fetches_per_node[self.worker_ip] += 1
 
-        if self.worker_ip == self.local_ip:
-            worker_to_local_sync_cmd = None  # don't need to rsync
-        else:
-            ssh_key = get_ssh_key()
-            ssh_user = get_ssh_user()
-            if ssh_key is None or ssh_user is None:
-                logger.error("Log sync requires cluster to be setup with "
-                             "`ray create_or_update`.")
-                return
-            if not distutils.spawn.find_executable("rsync"):
-                logger.error("Log sync requires rsync to be installed.")
-                return
-            source = '{}@{}:{}/'.format(ssh_user, self.worker_ip,
-                                        self.local_dir)
-            target = '{}/'.format(self.local_dir)
-            worker_to_local_sync_cmd = ((
-                """rsync -savz -e "ssh -i {} -o ConnectTimeout=120s """
-                """-o StrictHostKeyChecking=no" {} {}""").format(
-                    quote(ssh_key), quote(source), quote(target)))
+    def _poll_fetches(self):
+        while self._fetches:
+            ready, _ = ray.wait([self._fetches[0][0]], timeout=0)
+            if not ready:
+                break
+            self._finish_fetch()
 
-        if self.remote_dir:
-            if self.remote_dir.startswith(S3_PREFIX):
-                local_to_remote_sync_cmd = ("aws s3 sync {} {}".format(
-                    quote(self.local_dir), quote(self.remote_dir)))
-            elif self.remote_dir.startswith(GCS_PREFIX):
-                local_to_remote_sync_cmd = ("gsutil rsync -r {} {}".format(
-                    quote(self.local_dir), quote(self.remote_dir)))
-        else:
-            local_to_remote_sync_cmd = None
-
-        if self.sync_process:
-            self.sync_process.poll()
-            if self.sync_process.returncode is None:
-                if force:
-                    self.sync_process.kill()
-                else:
-                    logger.warning("Last sync is still in progress, skipping.")
-                    return
-
-        if worker_to_local_sync_cmd or local_to_remote_sync_cmd:
-            final_cmd = ""
-            if worker_to_local_sync_cmd:
-                final_cmd += worker_to_local_sync_cmd
-            if local_to_remote_sync_cmd:
-                if final_cmd:
-                    final_cmd += " && "
-                final_cmd += local_to_remote_sync_cmd
-            logger.info("Running log sync: {}".format(final_cmd))
-            self.sync_process = subprocess.Popen(final_cmd, shell=True)
+    def _wait_for_fetches(self):
+        while self._fetches:
+            future, worker_ip = self._fetches[0]
+            ready, _ = ray.wait([future], timeout=int(FETCH_TIMEOUT_S * 1000))
+            if not ready:
+                logger.warning(
+                    "Timed out syncing logs from {}".format(worker_ip))
+                self._fetches.popleft()
+                _fetches_per_node[worker_ip] -= 1
+                continue
+            self._finish_fetch()
 
-    def wait(self):
-        if self.sync_process:
-            self.sync_process.wait()
+    def _finish_fetch(self):
+        future, worker_ip = self._fetches.popleft()
+        _fetches_per_node[worker_ip] -= 1
+        try:
+            changes = ray.get(future)
+        except Exception:
+            logger.exception("Error syncing logs from {}".format(worker_ip))
+            return
+        apply_changes(self.local_dir, self._synced[worker_ip], changes)
+        if sum(len(change[2]) for change in changes) >= MAX_FETCH_BYTES:
+            self.last_sync_time = 0  # more changes are left to sync
+
+    def _upload_in_progress(self):
+        return self._upload is not None and not self._upload.ready()
+
+    def _start_upload(self):
+        self.last_upload_time = time.time()
+        if self._upload_queued:
+            return  # the queued upload will include the latest files
+        self._upload_queued = True
+        upload_fn = next(fn for prefix, fn in _uploaders.items()
+                         if self.remote_dir.startswith(prefix))
+        self._upload = _get_upload_pool().apply_async(
+            self._run_upload, (upload_fn, self._upload))
+
+    def _run_upload(self, upload_fn, prior_upload):
+        # Uploads of the same dir run one after the other
+        if prior_upload is not None:
+            prior_upload.wait()
+        self._upload_queued = False
+        logger.info("Uploading {} to {}".format(self.local_dir,
+                                                self.remote_dir))
+        try:
+            upload_fn(self.local_dir, self.remote_dir)
+        except Exception:
+            logger.exception("Error uploading {} to {}".format(
+                self.local_dir, self.remote_dir))
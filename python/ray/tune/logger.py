@@ -2,14 +2,20 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import atexit
 import csv
 import json
 import logging
 import numpy as np
 import os
+import threading
+import time
 import yaml
 
+from six.moves import queue
+
 from ray.tune.log_sync import get_syncer
+from ray.tune.result_store import ResultColumns, RESULT_COLUMNS_DIR
 from ray.tune.result import NODE_IP, TRAINING_ITERATION, TIME_TOTAL_S, \
     TIMESTEPS_TOTAL
 
@@ -22,6 +28,23 @@ except ImportError:
     logger.warning("Couldn't import TensorFlow - "
                    "disabling TensorBoard logging.")
 
+# Max results waiting to be written before on_result() blocks
+MAX_QUEUED_RESULTS = 1000
+
+# Written results are flushed after this many seconds or results
+FLUSH_INTERVAL_S = 5
+FLUSH_MAX_RESULTS = 100
+
+# Durability of the logs: never fsync, fsync on flush() and close() only
+# (e.g., when a trial is checkpointed or restarted), or on every flush
+FSYNC_NEVER = "never"
+FSYNC_ON_FLUSH = "on_flush"
+FSYNC_ALWAYS = "always"
+
+# Whether unified loggers also write memory-mappable result columns, which
+# takes one file per numeric result value of each trial
+RESULT_COLUMNS = os.environ.get("TUNE_RESULT_COLUMNS", "0") == "1"
+
 
 class Logger(object):
     """Logging interface for ray.tune; specialized implementations follow.
@@ -54,39 +77,190 @@ class Logger(object):
 
         pass
 
+    def _fsync(self):
+        """Forces the flushed writes of this logger to disk."""
+
+        pass
+
 
 class UnifiedLogger(Logger):
-    """Unified result logger for TensorBoard, rllab/viskit, plain json.
+    """Unified result logger for TensorBoard, rllab/viskit, plain json and
+    optionally memory-mappable result columns.
+
+    Results are written by a background thread shared by all loggers of the
+    process, and are flushed in batches every FLUSH_INTERVAL_S seconds or
+    FLUSH_MAX_RESULTS results. Calls to flush() and close() block until all
+    results logged before have been written.
 
     This class also periodically syncs output to the given upload uri."""
 
+    def __init__(self,
+                 config,
+                 logdir,
+                 upload_uri=None,
+                 fsync=FSYNC_ON_FLUSH,
+                 result_columns=None):
+        """Initializes a unified logger.
+
+        Args:
+            fsync (str): When to force writes to disk, one of FSYNC_NEVER,
+                FSYNC_ON_FLUSH and FSYNC_ALWAYS.
+            result_columns (bool): Whether to also write the numeric results
+                to <logdir>/result_columns, see ray.tune.result_store.
+                Defaults to the TUNE_RESULT_COLUMNS environment variable.
+        """
+
+        if fsync not in [FSYNC_NEVER, FSYNC_ON_FLUSH, FSYNC_ALWAYS]:
+            raise ValueError("Unknown fsync mode: {}".format(fsync))
+        self._fsync_mode = fsync
+        if result_columns is None:
+            result_columns = RESULT_COLUMNS
+        self._result_columns = result_columns
+        super(UnifiedLogger, self).__init__(config, logdir, upload_uri)
+
     def _init(self):
         self._loggers = []
-        for cls in [_JsonLogger, _TFLogger, _VisKitLogger]:
+        for cls in [_JsonLogger, _TFLogger, _VisKitLogger, _ColumnarLogger]:
             if cls is _TFLogger and tf is None:
                 logger.info("TF not installed - "
                             "cannot log with {}...".format(cls))
                 continue
+            if cls is _ColumnarLogger and not self._result_columns:
+                continue
             self._loggers.append(cls(self.config, self.logdir, self.uri))
         self._log_syncer = get_syncer(self.logdir, self.uri)
+        # Only accessed by the writer thread
+        self._num_unflushed = 0
+        self._last_flush = time.time()
+        _get_log_writer().register(self)
 
     def on_result(self, result):
-        for logger in self._loggers:
-            logger.on_result(result)
+        _get_log_writer().submit(self._write, result.copy())
         self._log_syncer.set_worker_ip(result.get(NODE_IP))
         self._log_syncer.sync_if_needed()
 
     def close(self):
-        for logger in self._loggers:
-            logger.close()
+        _get_log_writer().unregister(self)
+        _get_log_writer().call(self._close)
         self._log_syncer.sync_now(force=True)
 
     def flush(self):
-        for logger in self._loggers:
-            logger.flush()
+        _get_log_writer().call(self._flush,
+                               self._fsync_mode != FSYNC_NEVER)
         self._log_syncer.sync_now(force=True)
         self._log_syncer.wait()
 
+    def _write(self, result):
+        for logger in self._loggers:
+            logger.on_result(result)
+        self._num_unflushed += 1
+
+    def _flush_if_needed(self):
+        if not self._num_unflushed:
+            return
+        if (self._num_unflushed >= FLUSH_MAX_RESULTS
+                or time.time() - self._last_flush >= FLUSH_INTERVAL_S):
+            self._flush(self._fsync_mode == FSYNC_ALWAYS)
+
+    def _flush(self, fsync):
+        for logger in self._loggers:
+            logger.flush()
+            if fsync:
+                logger._fsync()
+        self._num_unflushed = 0
+        self._last_flush = time.time()
+
+    def _close(self):
+        self._flush(self._fsync_mode != FSYNC_NEVER)
+        for logger in self._loggers:
+            logger.close()
+
+
+class _LogWriter(object):
+    """Thread that writes the results of all unified loggers in batches.
+
+    The queue of results is bounded, so that producers block rather than
+    buffer an unbounded backlog if the disk cannot keep up.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=MAX_QUEUED_RESULTS)
+        # Only accessed by the writer thread
+        self._loggers = set()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        atexit.register(self.call, self._flush_all)
+
+    def register(self, unified_logger):
+        """Flushes the logger periodically until it is unregistered."""
+
+        self.submit(self._loggers.add, unified_logger)
+
+    def unregister(self, unified_logger):
+        self.submit(self._loggers.discard, unified_logger)
+
+    def submit(self, fn, *args):
+        """Runs a function in the writer thread."""
+
+        self._queue.put((fn, args, None))
+
+    def call(self, fn, *args):
+        """Like submit(), but waits for the call and re-raises its error."""
+
+        request = _LogRequest()
+        self._queue.put((fn, args, request))
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+
+    def _run(self):
+        while True:
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=FLUSH_INTERVAL_S))
+                while len(batch) < MAX_QUEUED_RESULTS:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            for fn, args, request in batch:
+                try:
+                    fn(*args)
+                except Exception as e:
+                    if request is None:
+                        logger.exception("Error writing results.")
+                    else:
+                        request.error = e
+                if request is not None:
+                    request.done.set()
+            for unified_logger in self._loggers:
+                try:
+                    unified_logger._flush_if_needed()
+                except Exception:
+                    logger.exception("Error flushing results.")
+
+    def _flush_all(self):
+        for unified_logger in self._loggers:
+            unified_logger._flush(False)
+
+
+class _LogRequest(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.error = None
+
+
+_log_writer = None
+_log_writer_lock = threading.Lock()
+
+
+def _get_log_writer():
+    global _log_writer
+    with _log_writer_lock:
+        if _log_writer is None:
+            _log_writer = _LogWriter()
+        return _log_writer
+
 
 class NoopLogger(Logger):
     def on_result(self, result):
@@ -112,8 +286,13 @@ class _JsonLogger(Logger):
 
     def write(self, b):
         self.local_out.write(b)
+
+    def flush(self):
         self.local_out.flush()
 
+    def _fsync(self):
+        os.fsync(self.local_out.fileno())
+
     def close(self):
         self.local_out.close()
 
@@ -150,7 +329,6 @@ class _TFLogger(Logger):
         }, ["ray", "tune"])
         iteration_stats = tf.Summary(value=iteration_value)
         self._file_writer.add_summary(iteration_stats, t)
-        self._file_writer.flush()
 
     def flush(self):
         self._file_writer.flush()
@@ -172,10 +350,37 @@ class _VisKitLogger(Logger):
             self._csv_out.writeheader()
         self._csv_out.writerow(result.copy())
 
+    def flush(self):
+        self._file.flush()
+
+    def _fsync(self):
+        os.fsync(self._file.fileno())
+
     def close(self):
         self._file.close()
 
 
+class _ColumnarLogger(Logger):
+    """Writes the numeric results to columns, buffering only unflushed rows.
+    """
+
+    def _init(self):
+        self._columns = ResultColumns(
+            os.path.join(self.logdir, RESULT_COLUMNS_DIR))
+
+    def on_result(self, result):
+        self._columns.append(result)
+
+    def flush(self):
+        self._columns.flush()
+
+    def _fsync(self):
+        self._columns.flush(fsync=True)
+
+    def close(self):
+        self._columns.close()
+
+
 class _SafeFallbackEncoder(json.JSONEncoder):
     def __init__(self, nan_str="null", **kwargs):
         super(_SafeFallbackEncoder, self).__init__(**kwargs)
@@ -3,40 +3,53 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 import logging
 import os
 import time
 import traceback
 
 import ray
+from ray.tune.log_sync import get_syncer
 from ray.tune.logger import NoopLogger
 from ray.tune.trial import Trial, Resources, Checkpoint
 from ray.tune.trial_executor import TrialExecutor
 
 logger = logging.getLogger(__name__)
 
+# Min seconds between refreshes of the available cluster resources
+RESOURCE_REFRESH_PERIOD = 0.5
+
 
 class RayTrialExecutor(TrialExecutor):
     """An implemention of TrialExecutor based on Ray."""
 
-    def __init__(self, queue_trials=False):
+    def __init__(self, queue_trials=False, reuse_actors=False):
         super(RayTrialExecutor, self).__init__(queue_trials)
         self._running = {}
+        # Maps each running trial to its future in self._running
+        self._running_futures = {}
         # Since trial resume after paused should not run
         # trial.train.remote(), thus no more new remote object id generated.
         # We use self._paused to store paused trials here.
         self._paused = {}
+        # Disk checkpoints being written, in the order they were issued,
+        # mapping each checkpoint future to its trial and Checkpoint
+        self._pending_checkpoints = collections.OrderedDict()
+        # Actors of terminated trials kept for reuse, in the order they
+        # were cached, mapping each actor to its (trainable name, resources)
+        self._reuse_actors = reuse_actors
+        self._cached_actors = collections.OrderedDict()
+        self._cached_resources = Resources(cpu=0, gpu=0)
+        self._num_actors_reused = 0
         self._avail_resources = Resources(cpu=0, gpu=0)
         self._committed_resources = Resources(cpu=0, gpu=0)
         self._resources_initialized = False
+        self._last_resource_refresh = float("-inf")
         if ray.is_initialized():
             self._update_avail_resources()
 
     def _setup_runner(self, trial):
-        cls = ray.remote(
-            num_cpus=trial.resources.cpu,
-            num_gpus=trial.resources.gpu)(trial._get_trainable_cls())
-
         trial.init_logger()
         remote_logdir = trial.logdir
 
@@ -47,9 +60,70 @@ class RayTrialExecutor(TrialExecutor):
             os.chdir(remote_logdir)
             return NoopLogger(config, remote_logdir)
 
-        # Logging for trials is handled centrally by TrialRunner, so
-        # configure the remote runner to use a noop-logger.
-        return cls.remote(config=trial.config, logger_creator=logger_creator)
+        runner = None
+        cached_actor = self._pop_cached_actor(trial)
+        if cached_actor is not None:
+            if ray.get(
+                    cached_actor.reset.remote(trial.config, logger_creator)):
+                logger.debug("Reusing actor for {}".format(trial))
+                runner = cached_actor
+                self._num_actors_reused += 1
+            else:
+                self._terminate_actor(cached_actor)
+
+        if runner is None:
+            self._evict_cached_actors()
+            cls = ray.remote(
+                num_cpus=trial.resources.cpu,
+                num_gpus=trial.resources.gpu)(trial._get_trainable_cls())
+            # Logging for trials is handled centrally by TrialRunner, so
+            # configure the remote runner to use a noop-logger.
+            runner = cls.remote(
+                config=trial.config, logger_creator=logger_creator)
+        get_syncer(trial.logdir, trial.upload_dir).set_worker(runner)
+        return runner
+
+    def _pop_cached_actor(self, trial):
+        """Returns a cached actor for the trial's trainable and resources."""
+
+        key = (trial.trainable_name, trial.resources)
+        for actor, actor_key in self._cached_actors.items():
+            if actor_key == key:
+                del self._cached_actors[actor]
+                self._cached_resources = _subtract(self._cached_resources,
+                                                   trial.resources)
+                return actor
+        return None
+
+    def _cache_actor(self, trial):
+        self._cached_actors[trial.runner] = (trial.trainable_name,
+                                             trial.resources)
+        self._cached_resources = _add(self._cached_resources,
+                                      trial.resources)
+
+    def _evict_cached_actors(self):
+        """Stops the oldest cached actors until the committed resources fit.
+
+        Cached actors still hold their resources in the cluster, so they are
+        stopped to make room before creating a new actor.
+        """
+
+        while self._cached_actors:
+            in_use = _add(self._committed_resources, self._cached_resources)
+            if (in_use.cpu <= self._avail_resources.cpu
+                    and in_use.gpu <= self._avail_resources.gpu):
+                break
+            actor, (_, resources) = self._cached_actors.popitem(last=False)
+            self._cached_resources = _subtract(self._cached_resources,
+                                               resources)
+            self._terminate_actor(actor)
+
+    def _terminate_actor(self, actor):
+        try:
+            actor.stop.remote()
+            actor.__ray_terminate__.remote()
+        except Exception:
+            logger.exception("Error stopping cached actor.")
 
     def _train(self, trial):
         """Start one iteration of training and save remote id."""
@@ -57,6 +131,7 @@ class RayTrialExecutor(TrialExecutor):
         assert trial.status == Trial.RUNNING, trial.status
         remote = trial.runner.train.remote()
         self._running[remote] = trial
+        self._running_futures[trial] = remote
 
     def _start_trial(self, trial, checkpoint=None):
         prior_status = trial.status
@@ -70,6 +145,7 @@ class RayTrialExecutor(TrialExecutor):
             # If Trial was in flight when paused, self._paused stores result.
             self._paused.pop(previous_run[0])
             self._running[previous_run[0]] = trial
+            self._running_futures[trial] = previous_run[0]
         else:
             self._train(trial)
 
@@ -92,15 +168,26 @@ class RayTrialExecutor(TrialExecutor):
         else:
             trial.status = Trial.TERMINATED
 
+        # Checkpoints in flight must be complete for the trial to be
+        # restored later on
+        self._wait_for_checkpoints(trial)
+
         try:
             trial.write_error_log(error_msg)
             if hasattr(trial, 'runner') and trial.runner:
-                stop_tasks = []
-                stop_tasks.append(trial.runner.stop.remote())
-                stop_tasks.append(trial.runner.__ray_terminate__.remote())
-                # TODO(ekl)  seems like wait hangs when killing actors
-                _, unfinished = ray.wait(
-                    stop_tasks, num_returns=2, timeout=250)
+                # Runs before the actor stops, since actor tasks are ordered
+                get_syncer(trial.logdir, trial.upload_dir).release_worker()
+                if self._reuse_actors and not error and stop_logger:
+                    # Paused and restarted trials keep their logger, and
+                    # are not done with their actor
+                    self._cache_actor(trial)
+                else:
+                    stop_tasks = []
+                    stop_tasks.append(trial.runner.stop.remote())
+                    stop_tasks.append(trial.runner.__ray_terminate__.remote())
+                    # TODO(ekl)  seems like wait hangs when killing actors
+                    _, unfinished = ray.wait(
+                        stop_tasks, num_returns=2, timeout=250)
         except Exception:
             logger.exception("Error stopping runner.")
             trial.status = Trial.ERROR
@@ -141,8 +228,8 @@ class RayTrialExecutor(TrialExecutor):
             trial, error=error, error_msg=error_msg, stop_logger=stop_logger)
         if prior_status == Trial.RUNNING:
             self._return_resources(trial.resources)
-            out = self._find_item(self._running, trial)
-            for result_id in out:
+            result_id = self._running_futures.pop(trial, None)
+            if result_id is not None:
                 self._running.pop(result_id)
 
     def continue_training(self, trial):
@@ -157,9 +244,9 @@ class RayTrialExecutor(TrialExecutor):
         before pausing, which is restored when Trial is resumed.
         """
 
-        trial_future = self._find_item(self._running, trial)
-        if trial_future:
-            self._paused[trial_future[0]] = trial
+        trial_future = self._running_futures.get(trial)
+        if trial_future is not None:
+            self._paused[trial_future] = trial
         super(RayTrialExecutor, self).pause_trial(trial)
 
     def reset_trial(self, trial, new_config, new_experiment_tag):
@@ -190,16 +277,27 @@ class RayTrialExecutor(TrialExecutor):
         [result_id], _ = ray.wait(list(self._running))
         return self._running[result_id]
 
+    def get_next_available_trials(self, max_trials=1):
+        """Waits for one result, then returns all ready ones up to max_trials.
+        """
+        [result_id], remaining = ray.wait(list(self._running))
+        ready = [result_id]
+        if max_trials > 1 and remaining:
+            more, _ = ray.wait(
+                remaining, num_returns=len(remaining), timeout=0)
+            ready.extend(more[:max_trials - 1])
+        return [self._running[result_id] for result_id in ready]
+
     def fetch_result(self, trial):
         """Fetches one result of the running trials.
 
         Returns:
             Result of the most recent trial training run."""
-        trial_future = self._find_item(self._running, trial)
-        if not trial_future:
+        trial_future = self._running_futures.pop(trial, None)
+        if trial_future is None:
             raise ValueError("Trial was not running.")
-        self._running.pop(trial_future[0])
-        result = ray.get(trial_future[0])
+        self._running.pop(trial_future)
+        result = ray.get(trial_future)
         return result
 
     def _commit_resources(self, resources):
@@ -220,6 +318,7 @@ class RayTrialExecutor(TrialExecutor):
         num_gpus = resources["GPU"]
         self._avail_resources = Resources(int(num_cpus), int(num_gpus))
         self._resources_initialized = True
+        self._last_resource_refresh = time.time()
 
     def has_resources(self, resources):
         """Returns whether this runner has at least the specified resources."""
@@ -251,15 +350,35 @@ class RayTrialExecutor(TrialExecutor):
 
         return False
 
+    def num_free_slots(self, resources):
+        """Returns how many more trials with these resources can start."""
+
+        cpu_avail = self._avail_resources.cpu - self._committed_resources.cpu
+        gpu_avail = self._avail_resources.gpu - self._committed_resources.gpu
+        slots = []
+        if resources.cpu_total() > 0:
+            slots.append(int(cpu_avail // resources.cpu_total()))
+        if resources.gpu_total() > 0:
+            slots.append(int(gpu_avail // resources.gpu_total()))
+        if not slots:
+            return int(self.has_resources(resources))
+        return max(0, min(slots))
+
     def debug_string(self):
         """Returns a human readable message for printing to the console."""
 
         if self._resources_initialized:
-            return "Resources requested: {}/{} CPUs, {}/{} GPUs".format(
+            status = "Resources requested: {}/{} CPUs, {}/{} GPUs".format(
                 self._committed_resources.cpu, self._avail_resources.cpu,
                 self._committed_resources.gpu, self._avail_resources.gpu)
         else:
-            return "Resources requested: ?"
+            status = "Resources requested: ?"
+        if self._reuse_actors:
+            reuse_status = "Actors reused: {}, cached: {} ({} CPUs, {} GPUs)"
+            status += "\n" + reuse_status.format(
+                self._num_actors_reused, len(self._cached_actors),
+                self._cached_resources.cpu, self._cached_resources.gpu)
+        return status
 
     def resource_string(self):
         """Returns a string describing the total resources available."""
@@ -270,20 +389,92 @@ class RayTrialExecutor(TrialExecutor):
         else:
             return "? CPUs, ? GPUs"
 
+    def on_no_pending_trials(self):
+        """Stops the cached actors, since no trial is left to reuse them."""
+
+        for actor in self._cached_actors:
+            self._terminate_actor(actor)
+        self._cached_actors.clear()
+        self._cached_resources = Resources(cpu=0, gpu=0)
+
+    def on_step_end(self):
+        """After step() called, install the checkpoints written meanwhile."""
+
+        self._poll_checkpoints()
+
     def on_step_begin(self):
-        """Before step() called, update the available resources."""
+        """Before step() called, update the available resources.
 
-        self._update_avail_resources()
+        The resources are refreshed at most every RESOURCE_REFRESH_PERIOD
+        seconds, since querying the cluster state is slow.
+        """
+
+        if (time.time() - self._last_resource_refresh >
+                RESOURCE_REFRESH_PERIOD):
+            self._update_avail_resources()
 
-    def save(self, trial, storage=Checkpoint.DISK):
-        """Saves the trial's state to a checkpoint."""
-        trial._checkpoint.storage = storage
-        trial._checkpoint.last_result = trial.last_result
+    def save(self, trial, storage=Checkpoint.DISK, blocking=True):
+        """Saves the trial's state to a checkpoint.
+
+        Non-blocking disk checkpoints are tracked as pending until they have
+        been written, and the trial keeps training meanwhile. This is safe
+        since tasks of the trial runner execute in the order submitted.
+        """
         if storage == Checkpoint.MEMORY:
-            trial._checkpoint.value = trial.runner.save_to_object.remote()
-        else:
-            trial._checkpoint.value = ray.get(trial.runner.save.remote())
-        return trial._checkpoint.value
+            # A newer checkpoint supersedes the ones still being written
+            self._drop_pending_checkpoints(trial)
+            trial._checkpoint = Checkpoint(
+                storage, trial.runner.save_to_object.remote(),
+                trial.last_result)
+            return trial._checkpoint.value
+
+        checkpoint_id = trial.runner.save.remote()
+        self._pending_checkpoints[checkpoint_id] = (
+            trial, Checkpoint(storage, None, trial.last_result))
+        if blocking:
+            self._wait_for_checkpoints(trial)
+            return ray.get(checkpoint_id)
+        return checkpoint_id
+
+    def _poll_checkpoints(self):
+        """Installs the pending checkpoints that have been written."""
+
+        if not self._pending_checkpoints:
+            return
+        pending = list(self._pending_checkpoints)
+        ready, _ = ray.wait(pending, num_returns=len(pending), timeout=0)
+        ready = set(ready)
+        for checkpoint_id in pending:
+            if checkpoint_id in ready:
+                self._install_checkpoint(checkpoint_id)
+
+    def _wait_for_checkpoints(self, trial):
+        """Blocks until the pending checkpoints of a trial are installed."""
+
+        pending = [
+            checkpoint_id
+            for checkpoint_id, (t, _) in self._pending_checkpoints.items()
+            if t is trial
+        ]
+        if not pending:
+            return
+        ray.wait(pending, num_returns=len(pending))
+        for checkpoint_id in pending:
+            self._install_checkpoint(checkpoint_id)
+
+    def _install_checkpoint(self, checkpoint_id):
+        trial, checkpoint = self._pending_checkpoints.pop(checkpoint_id)
+        try:
+            checkpoint.value = ray.get(checkpoint_id)
+        except Exception:
+            logger.exception("Error checkpointing trial {}.".format(trial))
+            return
+        trial._checkpoint = checkpoint
+
+    def _drop_pending_checkpoints(self, trial):
+        for checkpoint_id, (t, _) in list(self._pending_checkpoints.items()):
+            if t is trial:
+                del self._pending_checkpoints[checkpoint_id]
 
     def restore(self, trial, checkpoint=None):
         """Restores training state from a given model checkpoint."""
@@ -309,3 +500,13 @@ class RayTrialExecutor(TrialExecutor):
             logger.exception("Error restoring runner.")
             trial.status = Trial.ERROR
             return False
+
+
+def _add(resources, other):
+    return Resources(resources.cpu + other.cpu_total(),
+                     resources.gpu + other.gpu_total())
+
+
+def _subtract(resources, other):
+    return Resources(resources.cpu - other.cpu_total(),
+                     resources.gpu - other.gpu_total())
@@ -0,0 +1,265 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import json
+import numbers
+import os
+
+import numpy as np
+
+# Name of the dir of the result columns in each trial logdir
+RESULT_COLUMNS_DIR = "result_columns"
+
+SCHEMA_FILE = "schema.json"
+
+# Stored in integer columns for missing values
+MISSING_INT = np.iinfo(np.int64).min
+
+INT_DTYPE = "<i8"
+FLOAT_DTYPE = "<f8"
+
+# Max rows buffered in memory by columns written to a path
+MAX_BUFFERED_ROWS = 100
+
+
+class ResultColumns(object):
+    """Append-only columnar storage of the numeric results of one trial.
+
+    The schema is inferred from the first result appended: each numeric
+    value becomes a typed column, with nested dicts flattened into names
+    such as "info/learner/loss". Values missing from later results are
+    stored as NaN, or as MISSING_INT in integer columns, and values not in
+    the schema are not stored. Integer columns are converted to floats
+    once a float value is appended to them.
+
+    Without a path, all rows are kept in memory. With a path, only the rows
+    not flushed yet are buffered (at most MAX_BUFFERED_ROWS), and flush()
+    appends them to one file of raw values per column, which can be
+    memory-mapped by load_columns() for analysis. Files are only open while
+    rows are written to them.
+
+    Examples:
+        >>> columns = ResultColumns(columns=["time_total_s", "reward"])
+        >>> columns.append({"time_total_s": 1.0, "reward": 5})
+        >>> columns.query("reward", "time_total_s", t_max=10)
+        array([5.])
+    """
+
+    def __init__(self, path=None, columns=None):
+        """Initializes an empty store.
+
+        Arguments:
+            path (str): Optional dir to write the columns to.
+            columns (list): Names of the columns to store. Defaults to all
+                numeric values of the first result.
+        """
+
+        self.path = path
+        self.schema = None
+        self.num_rows = 0
+        self._columns = columns
+        # All rows without a path, or the rows not flushed yet
+        self._data = {}
+        self._num_buffered = 0
+        self._file_names = {}
+
+    def append(self, result):
+        """Appends the numeric values of a result as a new row."""
+
+        values = dict(_flatten(result))
+        if self.schema is None:
+            self._init_schema(values)
+        if self._num_buffered == len(self._data[self._any_column()]):
+            self._grow()
+        row = self._num_buffered
+        for name in self.schema:
+            value = values.get(name)
+            if (self.schema[name] == INT_DTYPE
+                    and isinstance(value, numbers.Real)
+                    and not isinstance(value, numbers.Integral)):
+                self._promote(name)
+            self._data[name][row] = _to_dtype(value, self.schema[name])
+        self._num_buffered += 1
+        self.num_rows += 1
+        if self.path and self._num_buffered >= MAX_BUFFERED_ROWS:
+            self.flush()
+
+    def column(self, name):
+        """Returns all the values of a column, as a read-only array."""
+
+        if self.schema is None:
+            return np.empty(0)
+        if self.path:
+            self.flush()
+            return load_columns(self.path)[name]
+        values = self._data[name][:self.num_rows]
+        values.flags.writeable = False
+        return values
+
+    def query(self, metric, time_attr=None, t_min=None, t_max=None):
+        """Returns the values of a metric, optionally in a time range.
+
+        Arguments:
+            metric (str): Name of the column to return.
+            time_attr (str): Name of the column to filter by.
+            t_min (float): Only return rows with time_attr >= t_min.
+            t_max (float): Only return rows with time_attr <= t_max.
+        """
+
+        values = self.column(metric)
+        if time_attr is None or (t_min is None and t_max is None):
+            return values
+        times = self.column(time_attr)
+        mask = np.ones(len(times), dtype=bool)
+        if t_min is not None:
+            mask &= times >= t_min
+        if t_max is not None:
+            mask &= times <= t_max
+        return values[mask]
+
+    def flush(self, fsync=False):
+        """Appends the buffered rows to the column files.
+
+        Arguments:
+            fsync (bool): Whether to force the column files to disk.
+        """
+
+        if not self.path or self.schema is None:
+            return
+        if not self._num_buffered and not fsync:
+            return
+        for name in self.schema:
+            with open(self._file_names[name], "ab") as f:
+                f.write(self._data[name][:self._num_buffered].tobytes())
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+        self._num_buffered = 0
+
+    def close(self):
+        self.flush()
+
+    def _any_column(self):
+        return next(iter(self.schema))
+
+    def _init_schema(self, values):
+        self.schema = collections.OrderedDict()
+        names = self._columns or sorted(values)
+        for name in names:
+            value = values.get(name)
+            if isinstance(value, numbers.Integral):
+                self.schema[name] = INT_DTYPE
+            elif (isinstance(value, numbers.Real)
+                  or (value is None and self._columns)):
+                self.schema[name] = FLOAT_DTYPE
+        if not self.schema:
+            # Keeps the row count even for results without numeric values
+            self.schema["_row"] = INT_DTYPE
+        for name, dtype in self.schema.items():
+            self._data[name] = np.empty(16, dtype=dtype)
+        if self.path:
+            if not os.path.exists(self.path):
+                os.makedirs(self.path)
+            for i, name in enumerate(self.schema):
+                self._file_names[name] = os.path.join(
+                    self.path, "column_{}.bin".format(i))
+            self._write_schema()
+
+    def _write_schema(self):
+        columns = [{
+            "name": name,
+            "dtype": dtype,
+            "file": os.path.basename(self._file_names[name])
+        } for name, dtype in self.schema.items()]
+        with open(os.path.join(self.path, SCHEMA_FILE), "w") as f:
+            json.dump({"columns": columns}, f, indent=2)
+
+    def _promote(self, name):
+        """Converts an integer column to a float column."""
+
+        self._data[name] = _to_float(self._data[name])
+        self.schema[name] = FLOAT_DTYPE
+        if self.path:
+            # Rewrites the column, which only happens once per column
+            file_name = self._file_names[name]
+            if os.path.exists(file_name):
+                written = np.fromfile(file_name, dtype=INT_DTYPE)
+                with open(file_name, "wb") as f:
+                    f.write(_to_float(written).tobytes())
+            self._write_schema()
+
+    def _grow(self):
+        for name, values in self._data.items():
+            grown = np.empty(2 * len(values), dtype=values.dtype)
+            grown[:len(values)] = values
+            self._data[name] = grown
+
+
+def load_columns(path):
+    """Memory-maps the result columns written to a dir by ResultColumns.
+
+    Returns:
+        OrderedDict mapping column names to read-only arrays of equal length.
+    """
+
+    with open(os.path.join(path, SCHEMA_FILE)) as f:
+        schema = json.load(f)["columns"]
+    columns = collections.OrderedDict()
+    for column in schema:
+        file_path = os.path.join(path, column["file"])
+        dtype = np.dtype(str(column["dtype"]))
+        if (not os.path.exists(file_path)
+                or os.path.getsize(file_path) < dtype.itemsize):
+            columns[column["name"]] = np.empty(0, dtype=dtype)
+        else:
+            columns[column["name"]] = np.memmap(file_path, dtype, mode="r")
+    # A row may be partially written while the trial is running
+    num_rows = min(len(values) for values in columns.values())
+    for name in columns:
+        columns[name] = columns[name][:num_rows]
+    return columns
+
+
+def load_experiment_columns(experiment_dir):
+    """Memory-maps the result columns of all trials in an experiment dir.
+
+    Returns:
+        Dict mapping trial logdirs to their columns, see load_columns().
+    """
+
+    experiment = {}
+    for trial_dir in sorted(os.listdir(experiment_dir)):
+        path = os.path.join(experiment_dir, trial_dir, RESULT_COLUMNS_DIR)
+        if os.path.exists(os.path.join(path, SCHEMA_FILE)):
+            experiment[os.path.join(experiment_dir,
+                                    trial_dir)] = load_columns(path)
+    return experiment
+
+
+def _flatten(result, prefix=""):
+    for key, value in result.items():
+        name = prefix + str(key)
+        if isinstance(value, dict):
+            for item in _flatten(value, name + "/"):
+                yield item
+        elif value is None or (isinstance(value, numbers.Real)
+                               and not isinstance(value, np.ndarray)):
+            yield name, value
+
+
+def _to_float(values):
+    promoted = values.astype(FLOAT_DTYPE)
+    promoted[values == MISSING_INT] = np.nan
+    return promoted
+
+
+def _to_dtype(value, dtype):
+    if dtype == INT_DTYPE:
+        if isinstance(value, numbers.Integral):
+            return value
+        return MISSING_INT
+    if isinstance(value, numbers.Real):
+        return value
+    return np.nan
@@ -2,8 +2,10 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import bisect
 import collections
 import logging
+import math
 import numpy as np
 
 from ray.tune.trial import Trial
@@ -11,6 +13,13 @@ from ray.tune.schedulers.trial_scheduler import FIFOScheduler, TrialScheduler
 
 logger = logging.getLogger(__name__)
 
+# Max number of time buckets to keep the sorted running rewards for
+MAX_CACHED_TIMES = 100
+
+# Non-integer times are rounded down to this many significant digits, so
+# that results at nearby times share the sorted running rewards
+TIME_BUCKET_DIGITS = 2
+
 
 class MedianStoppingRule(FIFOScheduler):
     """Implements the median stopping rule as described in the Vizier paper:
@@ -45,7 +54,10 @@ class MedianStoppingRule(FIFOScheduler):
         FIFOScheduler.__init__(self)
         self._stopped_trials = set()
         self._completed_trials = set()
-        self._results = collections.defaultdict(list)
+        self._results = collections.defaultdict(_RunningRewards)
+        # Sorted running rewards of the completed trials by time bucket,
+        # which are updated as trials complete
+        self._sorted_results = collections.OrderedDict()
         self._grace_period = grace_period
         self._min_samples_required = min_samples_required
         self._reward_attr = reward_attr
@@ -66,7 +78,7 @@ class MedianStoppingRule(FIFOScheduler):
             return TrialScheduler.CONTINUE  # fall back to FIFO
 
         time = result[self._time_attr]
-        self._results[trial].append(result)
+        self._results[trial].add(time, result[self._reward_attr])
         median_result = self._get_median_result(time)
         best_result = self._best_result(trial)
         if self._verbose:
@@ -85,36 +97,114 @@ class MedianStoppingRule(FIFOScheduler):
             return TrialScheduler.CONTINUE
 
     def on_trial_complete(self, trial_runner, trial, result):
-        self._results[trial].append(result)
-        self._completed_trials.add(trial)
+        self._results[trial].add(result[self._time_attr],
+                                 result[self._reward_attr])
+        self._mark_completed(trial)
 
     def on_trial_remove(self, trial_runner, trial):
         """Marks trial as completed if it is paused and has previously ran."""
         if trial.status is Trial.PAUSED and trial in self._results:
-            self._completed_trials.add(trial)
+            self._mark_completed(trial)
 
     def debug_string(self):
         return "Using MedianStoppingRule: num_stopped={}.".format(
             len(self._stopped_trials))
 
+    def _mark_completed(self, trial):
+        if trial in self._completed_trials:
+            # The running rewards of the trial may have changed
+            self._sorted_results.clear()
+            return
+        self._completed_trials.add(trial)
+        for time, results in self._sorted_results.items():
+            results.add(self._running_result(trial, time))
+
     def _get_median_result(self, time):
-        scores = []
-        for trial in self._completed_trials:
-            scores.append(self._running_result(trial, time))
-        if len(scores) >= self._min_samples_required:
-            return np.median(scores)
-        else:
+        if len(self._completed_trials) < self._min_samples_required:
             return float('-inf')
+        # The completed trials are compared up to the start of the bucket
+        time = _time_bucket(time)
+        if time not in self._sorted_results:
+            if len(self._sorted_results) >= MAX_CACHED_TIMES:
+                self._sorted_results.popitem(last=False)
+            results = _SortedResults()
+            for trial in self._completed_trials:
+                results.add(self._running_result(trial, time))
+            self._sorted_results[time] = results
+        return self._sorted_results[time].median()
 
     def _running_result(self, trial, t_max=float('inf')):
-        results = self._results[trial]
         # TODO(ekl) we could do interpolation to be more precise, but for now
         # assume len(results) is large and the time diffs are roughly equal
-        return np.mean([
-            r[self._reward_attr] for r in results
-            if r[self._time_attr] <= t_max
-        ])
+        return self._results[trial].mean(t_max)
 
     def _best_result(self, trial):
-        results = self._results[trial]
-        return max(r[self._reward_attr] for r in results)
+        return self._results[trial].best
+
+
+def _time_bucket(time):
+    """Rounds a time down to TIME_BUCKET_DIGITS significant digits.
+
+    Integer times, such as training iterations, are reported at the same
+    values by all trials and are kept as is.
+    """
+
+    if (time <= 0 or math.isinf(time) or math.isnan(time)
+            or time == math.floor(time)):
+        return time
+    exponent = int(math.floor(math.log10(time))) - TIME_BUCKET_DIGITS + 1
+    if exponent >= 0:
+        step = 10**exponent
+        return math.floor(time / step) * step
+    # Rounding first keeps e.g. 0.29 * 100 = 28.999... in the right bucket
+    scale = 10**-exponent
+    return math.floor(round(time * scale, 6)) / scale
+
+
+class _RunningRewards(object):
+    """Prefix sums of the rewards of a trial, ordered by time.
+
+    Since time increases monotonically, the mean reward up to any time is
+    found by binary search, without scanning the results.
+    """
+
+    def __init__(self):
+        self.times = []
+        self.sums = []
+        self.best = float('-inf')
+
+    def add(self, time, reward):
+        self.times.append(time)
+        self.sums.append(reward + (self.sums[-1] if self.sums else 0))
+        self.best = max(self.best, reward)
+
+    def mean(self, t_max):
+        count = bisect.bisect_right(self.times, t_max)
+        if count == 0:
+            return float('nan')
+        return self.sums[count - 1] / count
+
+
+class _SortedResults(object):
+    """Sorted list of results, for which the median is a lookup.
+
+    NaN results are counted apart, since any NaN makes the median NaN.
+    """
+
+    def __init__(self):
+        self.results = []
+        self.num_nan = 0
+
+    def add(self, result):
+        if np.isnan(result):
+            self.num_nan += 1
+        else:
+            bisect.insort(self.results, result)
+
+    def median(self):
+        n = len(self.results)
+        if self.num_nan or n == 0:
+            return float('nan')
+        if n % 2:
+            return self.results[n // 2]
+        return (self.results[n // 2 - 1] + self.results[n // 2]) / 2
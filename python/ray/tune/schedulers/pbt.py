@@ -2,6 +2,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import bisect
+import heapq
 import random
 import math
 import copy
@@ -22,11 +24,16 @@ PBT_QUANTILE = 0.25
 class PBTTrialState(object):
     """Internal PBT state tracked per-trial."""
 
-    def __init__(self, trial):
+    def __init__(self, trial, index=0):
         self.orig_tag = trial.experiment_tag
         self.last_score = None
         self.last_checkpoint = None
         self.last_perturbation_time = 0
+        # Order in which the trial was added, used to break ties
+        self.index = index
+        # Entries of the trial in the score ranking and the run queue
+        self.score_entry = None
+        self.queue_entry = None
 
     def __repr__(self):
         return str((self.last_score, self.last_checkpoint,
@@ -169,13 +176,22 @@ class PopulationBasedTraining(FIFOScheduler):
         self._resample_probability = resample_probability
         self._trial_state = {}
         self._custom_explore_fn = custom_explore_fn
+        # Sorted (score, index, trial) entries of the unfinished trials
+        self._scores = []
+        # Heap of (last perturbation time, index, trial) entries, in which
+        # entries replaced by a newer one for the same trial are skipped
+        self._run_queue = []
+        self._resource_requests = set()
 
         # Metrics
         self._num_checkpoints = 0
         self._num_perturbations = 0
 
     def on_trial_add(self, trial_runner, trial):
-        self._trial_state[trial] = PBTTrialState(trial)
+        state = PBTTrialState(trial, len(self._trial_state))
+        self._trial_state[trial] = state
+        self._resource_requests.add(trial.resources)
+        self._set_perturbation_time(trial, state.last_perturbation_time)
 
     def on_trial_result(self, trial_runner, trial, result):
         time = result[self._time_attr]
@@ -184,29 +200,40 @@ class PopulationBasedTraining(FIFOScheduler):
         if time - state.last_perturbation_time < self._perturbation_interval:
             return TrialScheduler.CONTINUE  # avoid checkpoint overhead
 
-        score = result[self._reward_attr]
-        state.last_score = score
-        state.last_perturbation_time = time
-        lower_quantile, upper_quantile = self._quantiles()
+        self._set_score(trial, result[self._reward_attr])
+        self._set_perturbation_time(trial, time)
+        rank = self._score_rank(state.score_entry)
+        num_trials = len(self._scores)
+        quantile_size = self._quantile_size()
 
-        if trial in upper_quantile:
+        if rank >= num_trials - quantile_size:
             state.last_checkpoint = trial_runner.trial_executor.save(
                 trial, Checkpoint.MEMORY)
             self._num_checkpoints += 1
         else:
             state.last_checkpoint = None  # not a top trial
 
-        if trial in lower_quantile:
-            trial_to_clone = random.choice(upper_quantile)
+        if rank < quantile_size:
+            _, _, trial_to_clone = self._scores[random.randrange(
+                num_trials - quantile_size, num_trials)]
             assert trial is not trial_to_clone
             self._exploit(trial_runner.trial_executor, trial, trial_to_clone)
 
-        for trial in trial_runner.get_trials():
-            if trial.status in [Trial.PENDING, Trial.PAUSED]:
+        for status in [Trial.PENDING, Trial.PAUSED]:
+            if trial_runner.get_trials_with_status(status):
                 return TrialScheduler.PAUSE  # yield time to other trials
 
         return TrialScheduler.CONTINUE
 
+    def on_trial_complete(self, trial_runner, trial, result):
+        self._remove_trial(trial)
+
+    def on_trial_error(self, trial_runner, trial):
+        self._remove_trial(trial)
+
+    def on_trial_remove(self, trial_runner, trial):
+        self._remove_trial(trial)
+
     def _exploit(self, trial_executor, trial, trial_to_clone):
         """Transfers perturbed state from trial_to_clone -> trial."""
 
@@ -238,24 +265,46 @@ class PopulationBasedTraining(FIFOScheduler):
 
         self._num_perturbations += 1
         # Transfer over the last perturbation time as well
-        trial_state.last_perturbation_time = new_state.last_perturbation_time
+        self._set_perturbation_time(trial, new_state.last_perturbation_time)
 
-    def _quantiles(self):
-        """Returns trials in the lower and upper `quantile` of the population.
+    def _quantile_size(self):
+        """Returns the number of trials in the lower and upper `quantile`.
 
-        If there is not enough data to compute this, returns empty lists."""
+        If there is not enough data to compute this, returns 0."""
 
-        trials = []
-        for trial, state in self._trial_state.items():
-            if state.last_score is not None and not trial.is_finished():
-                trials.append(trial)
-        trials.sort(key=lambda t: self._trial_state[t].last_score)
+        if len(self._scores) <= 1:
+            return 0
+        return int(math.ceil(len(self._scores) * PBT_QUANTILE))
 
-        if len(trials) <= 1:
-            return [], []
-        else:
-            return (trials[:int(math.ceil(len(trials) * PBT_QUANTILE))],
-                    trials[int(math.floor(-len(trials) * PBT_QUANTILE)):])
+    def _score_rank(self, entry):
+        rank = bisect.bisect_left(self._scores, entry)
+        if rank < len(self._scores) and self._scores[rank] is entry:
+            return rank
+        # Scores such as NaN are not ordered, so the search may miss
+        return self._scores.index(entry)
+
+    def _set_score(self, trial, score):
+        state = self._trial_state[trial]
+        if state.score_entry is not None:
+            del self._scores[self._score_rank(state.score_entry)]
+        state.last_score = score
+        state.score_entry = (score, state.index, trial)
+        bisect.insort(self._scores, state.score_entry)
+
+    def _set_perturbation_time(self, trial, time):
+        state = self._trial_state[trial]
+        state.last_perturbation_time = time
+        state.queue_entry = (time, state.index, trial)
+        heapq.heappush(self._run_queue, state.queue_entry)
+
+    def _remove_trial(self, trial):
+        """Removes a finished trial from the score ranking and run queue."""
+
+        state = self._trial_state[trial]
+        if state.score_entry is not None:
+            del self._scores[self._score_rank(state.score_entry)]
+            state.score_entry = None
+        state.queue_entry = None
 
     def choose_trial_to_run(self, trial_runner):
         """Ensures all trials get fair share of time (as defined by time_attr).
@@ -264,14 +313,36 @@ class PopulationBasedTraining(FIFOScheduler):
         concurrent trials than can fit in the cluster at any given time.
         """
 
-        candidates = []
-        for trial in trial_runner.get_trials():
-            if trial.status in [Trial.PENDING, Trial.PAUSED] and \
-                    trial_runner.has_resources(trial.resources):
-                candidates.append(trial)
-        candidates.sort(
-            key=lambda trial: self._trial_state[trial].last_perturbation_time)
-        return candidates[0] if candidates else None
+        has_resources = {
+            resources: trial_runner.has_resources(resources)
+            for resources in self._resource_requests
+        }
+        if not any(has_resources.values()):
+            return None
+
+        # Pops the entries of the trials that cannot run, and pushes them
+        # back after, which only skips the running trials in practice
+        skipped = []
+        chosen = None
+        while self._run_queue:
+            entry = heapq.heappop(self._run_queue)
+            trial = entry[2]
+            if self._trial_state[trial].queue_entry is not entry:
+                continue  # replaced by a newer entry
+            if trial.is_finished():
+                self._trial_state[trial].queue_entry = None
+                continue
+            skipped.append(entry)
+            if trial.resources not in has_resources:
+                has_resources[trial.resources] = trial_runner.has_resources(
+                    trial.resources)
+            if (trial.status in [Trial.PENDING, Trial.PAUSED]
+                    and has_resources[trial.resources]):
+                chosen = trial
+                break
+        for entry in skipped:
+            heapq.heappush(self._run_queue, entry)
+        return chosen
 
     def reset_stats(self):
         self._num_perturbations = 0
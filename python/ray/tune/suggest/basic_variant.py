@@ -9,11 +9,18 @@ from ray.tune.experiment import convert_to_experiment_list
 from ray.tune.config_parser import make_parser, create_trial_from_spec
 from ray.tune.suggest.variant_generator import generate_variants
 from ray.tune.suggest.search import SearchAlgorithm
+from ray.tune.trial import Trial
+
+# Default max number of generated trials that have not started yet
+MAX_PENDING_TRIALS = 1000
 
 
 class BasicVariantGenerator(SearchAlgorithm):
     """Uses Tune's variant generation for resolving variables.
 
+    Trials are generated lazily, as earlier ones start running, so that
+    large grid searches do not create all their trials upfront.
+
     See also: `ray.tune.suggest.variant_generator`.
 
     Example:
@@ -23,11 +30,21 @@ class BasicVariantGenerator(SearchAlgorithm):
         >>> searcher.is_finished == True
     """
 
-    def __init__(self):
+    def __init__(self, max_pending_trials=MAX_PENDING_TRIALS):
+        """Initializes the generator.
+
+        Arguments:
+            max_pending_trials (int): Max number of trials returned by
+                next_trials() that are still pending at any time.
+        """
         self._parser = make_parser()
-        self._trial_generator = []
+        self._trial_generator = iter([])
         self._counter = 0
+        self._num_to_skip = 0
         self._finished = False
+        self._max_pending_trials = max_pending_trials
+        # Trials returned by next_trials() that may not have started yet
+        self._pending_trials = []
 
     def add_configurations(self, experiments):
         """Chains generator given experiment specifications.
@@ -45,17 +62,43 @@ class BasicVariantGenerator(SearchAlgorithm):
         """Provides Trial objects to be queued into the TrialRunner.
 
         Returns:
-            trials (list): Returns a list of trials.
+            trials (list): Returns a list of trials, which is empty if
+                max_pending_trials of the trials returned so far have not
+                started yet.
         """
-        trials = list(self._trial_generator)
-        self._finished = True
+        self._pending_trials = [
+            trial for trial in self._pending_trials
+            if trial.status == Trial.PENDING
+        ]
+        trials = []
+        while len(self._pending_trials) < self._max_pending_trials:
+            trial = next(self._trial_generator, None)
+            if trial is None:
+                self._finished = True
+                break
+            trials.append(trial)
+            self._pending_trials.append(trial)
         return trials
 
+    def get_state(self):
+        """Returns the state needed to resume generating trials."""
+
+        return {"counter": self._counter}
+
+    def set_state(self, state):
+        """Resumes generating trials after the ones generated before.
+
+        The same configurations must have been added as when the state was
+        saved with get_state(). The variants generated before are skipped
+        without creating their trials.
+        """
+
+        self._num_to_skip = state["counter"]
+
     def _generate_trials(self, unresolved_spec, output_path=""):
         """Generates Trial objects with the variant generation process.
 
-        Uses a fixed point iteration to resolve variants. All trials
-        should be able to be generated at once.
+        Uses a fixed point iteration to resolve variants.
 
         See also: `ray.tune.suggest.variant_generator`.
 
@@ -71,6 +114,8 @@ class BasicVariantGenerator(SearchAlgorithm):
                 if resolved_vars:
                     experiment_tag += "_{}".format(resolved_vars)
                 self._counter += 1
+                if self._counter <= self._num_to_skip:
+                    continue  # generated before resuming
                 yield create_trial_from_spec(
                     spec,
                     output_path,
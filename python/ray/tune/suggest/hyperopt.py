@@ -67,23 +67,59 @@ class HyperOptSearch(SuggestionAlgorithm):
         self._hpopt_trials = hpo.Trials()
         self._live_trial_mapping = {}
         self.rstate = np.random.RandomState()
+        # Whether self.algo suggests several trials in one call
+        self._algo_batches = True
 
         super(HyperOptSearch, self).__init__(**kwargs)
 
     def _suggest(self, trial_id):
-        if self._num_live_trials() >= self._max_concurrent:
-            return None
-        new_ids = self._hpopt_trials.new_trial_ids(1)
+        suggested_configs = self._suggest_batch([trial_id])
+        return suggested_configs[0] if suggested_configs else None
+
+    def _suggest_batch(self, trial_ids):
+        num_trials = min(
+            len(trial_ids), self._max_concurrent - self._num_live_trials())
+        if num_trials <= 0:
+            return []
+        new_ids = self._hpopt_trials.new_trial_ids(num_trials)
         self._hpopt_trials.refresh()
 
-        # Get new suggestion from Hyperopt
-        new_trials = self.algo(new_ids, self.domain, self._hpopt_trials,
-                               self.rstate.randint(2**31 - 1))
+        # Get new suggestions from Hyperopt
+        new_trials = self._run_algo(new_ids)
         self._hpopt_trials.insert_trial_docs(new_trials)
         self._hpopt_trials.refresh()
-        new_trial = new_trials[0]
-        self._live_trial_mapping[trial_id] = (new_trial["tid"], new_trial)
 
+        suggested_configs = []
+        for trial_id, new_trial in zip(trial_ids, new_trials):
+            self._live_trial_mapping[trial_id] = (new_trial["tid"], new_trial)
+            suggested_configs.append(self._get_config(new_trial))
+        return suggested_configs
+
+    def _run_algo(self, new_ids):
+        """Returns the docs of new trials with new_ids from self.algo.
+
+        The whole batch is suggested from the same trials, so that the
+        posterior is computed once if self.algo supports batches. Otherwise,
+        it is called once per trial, without refreshing the trials between
+        calls.
+        """
+        if len(new_ids) > 1 and self._algo_batches:
+            try:
+                new_trials = self.algo(new_ids, self.domain,
+                                       self._hpopt_trials,
+                                       self.rstate.randint(2**31 - 1))
+            except ValueError:
+                new_trials = []  # only accepts one id, as in some versions
+            if len(new_trials) == len(new_ids):
+                return new_trials
+            self._algo_batches = False
+        new_trials = []
+        for new_id in new_ids:
+            new_trials += self.algo([new_id], self.domain, self._hpopt_trials,
+                                    self.rstate.randint(2**31 - 1))
+        return new_trials
+
+    def _get_config(self, new_trial):
         # Taken from HyperOpt.base.evaluate
         config = hpo.base.spec_from_misc(new_trial["misc"])
         ctrl = hpo.base.Ctrl(self._hpopt_trials, current_trial=new_trial)
@@ -32,6 +32,17 @@ class SearchAlgorithm(object):
         """
         raise NotImplementedError
 
+    def set_num_free_slots(self, num_slots):
+        """Called by the TrialRunner before each call to next_trials().
+
+        Algorithms that can produce trials more cheaply in batches can use
+        this as the batch size.
+
+        Arguments:
+            num_slots (int): Number of new trials that could start right away.
+        """
+        pass
+
     def on_trial_result(self, trial_id, result):
         """Called on each intermediate result returned by a trial.
 
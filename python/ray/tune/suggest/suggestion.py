@@ -18,6 +18,9 @@ class SuggestionAlgorithm(SearchAlgorithm):
 
     Custom search algorithms can extend this class easily by overriding the
     `_suggest` method provide generated parameters for the trials.
+    Algorithms that can suggest several trials more cheaply than one at a
+    time can also override `_suggest_batch`, which is passed up to as many
+    trial ids as there are free slots in the cluster.
 
     To track suggestions and their corresponding evaluations, the method
     `_suggest` will be passed a trial_id, which will be used in
@@ -41,6 +44,7 @@ class SuggestionAlgorithm(SearchAlgorithm):
         self._trial_generator = []
         self._counter = 0
         self._finished = False
+        self._batch_size = 1
 
     def add_configurations(self, experiments):
         """Chains generator given experiment specifications.
@@ -72,35 +76,43 @@ class SuggestionAlgorithm(SearchAlgorithm):
         self._finished = True
         return trials
 
+    def set_num_free_slots(self, num_slots):
+        self._batch_size = max(1, num_slots)
+
     def _generate_trials(self, experiment_spec, output_path=""):
-        """Generates trials with configurations from `_suggest`.
+        """Generates trials with configurations from `_suggest_batch`.
 
-        Creates a trial_id that is passed into `_suggest`.
+        Creates the trial_ids that are passed into `_suggest_batch`.
 
         Yields:
             Trial objects constructed according to `spec`
         """
         if "run" not in experiment_spec:
             raise TuneError("Must specify `run` in {}".format(experiment_spec))
-        for _ in range(experiment_spec.get("num_samples", 1)):
-            trial_id = Trial.generate_id()
-            while True:
-                suggested_config = self._suggest(trial_id)
-                if suggested_config is None:
-                    yield None
-                else:
-                    break
-            spec = copy.deepcopy(experiment_spec)
-            spec["config"] = suggested_config
-            self._counter += 1
-            tag = "{0}_{1}".format(
-                str(self._counter), format_vars(spec["config"]))
-            yield create_trial_from_spec(
-                spec,
-                output_path,
-                self._parser,
-                experiment_tag=tag,
-                trial_id=trial_id)
+        num_remaining = experiment_spec.get("num_samples", 1)
+        while num_remaining > 0:
+            trial_ids = [
+                Trial.generate_id()
+                for _ in range(min(num_remaining, self._batch_size))
+            ]
+            suggested_configs = self._suggest_batch(trial_ids)
+            if not suggested_configs:
+                yield None
+                continue
+            num_remaining -= len(suggested_configs)
+            for trial_id, suggested_config in zip(trial_ids,
+                                                  suggested_configs):
+                spec = copy.deepcopy(experiment_spec)
+                spec["config"] = suggested_config
+                self._counter += 1
+                tag = "{0}_{1}".format(
+                    str(self._counter), format_vars(spec["config"]))
+                yield create_trial_from_spec(
+                    spec,
+                    output_path,
+                    self._parser,
+                    experiment_tag=tag,
+                    trial_id=trial_id)
 
     def is_finished(self):
         return self._finished
@@ -128,6 +140,28 @@ class SuggestionAlgorithm(SearchAlgorithm):
         """
         raise NotImplementedError
 
+    def _suggest_batch(self, trial_ids):
+        """Queries the algorithm to retrieve parameters for several trials.
+
+        By default, this calls `_suggest` for each trial until it returns
+        None.
+
+        Arguments:
+            trial_ids (list): Trial IDs used for subsequent notifications.
+
+        Returns:
+            list: Configurations for the first trials of trial_ids, which
+                may be fewer than requested. An empty list will temporarily
+                stop the TrialRunner from querying.
+        """
+        suggested_configs = []
+        for trial_id in trial_ids:
+            suggested_config = self._suggest(trial_id)
+            if suggested_config is None:
+                break
+            suggested_configs.append(suggested_config)
+        return suggested_configs
+
 
 class _MockSuggestionAlgorithm(SuggestionAlgorithm):
     def __init__(self, max_concurrent=2, **kwargs):
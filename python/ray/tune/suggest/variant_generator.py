@@ -39,9 +39,12 @@ def generate_variants(unresolved_spec):
 
         "activation": {"grid_search": ["relu", "tanh"]}
         "cpu": {"eval": "spec.config.num_workers"}
+
+    Variants are generated lazily, and share the dicts and lists that do
+    not contain resolved values with the spec and with each other, so they
+    should not be modified in place.
     """
     for resolved_vars, spec in _generate_variants(unresolved_spec):
-        assert not _unresolved_values(spec)
         yield format_vars(resolved_vars), spec
 
 
@@ -99,7 +102,6 @@ def _clean_value(value):
 
 
 def _generate_variants(spec):
-    spec = copy.deepcopy(spec)
     unresolved = _unresolved_values(spec)
     if not unresolved:
         yield {}, spec
@@ -116,7 +118,17 @@ def _generate_variants(spec):
 
     grid_search = _grid_search_generator(spec, grid_vars)
     for resolved_spec in grid_search:
-        resolved_vars = _resolve_lambda_vars(resolved_spec, lambda_vars)
+        resolved_spec, resolved_vars = _resolve_lambda_vars(
+            resolved_spec, lambda_vars)
+        # The rest of the spec is resolved, so only the values assigned can
+        # contain more unresolved values
+        if not any(
+                _unresolved_values({"value": _get_value(resolved_spec, path)})
+                for path in unresolved):
+            for path, value in grid_vars:
+                resolved_vars[path] = _get_value(resolved_spec, path)
+            yield resolved_vars, resolved_spec
+            continue
         for resolved, spec in _generate_variants(resolved_spec):
             for path, value in grid_vars:
                 resolved_vars[path] = _get_value(spec, path)
@@ -132,9 +144,17 @@ def _generate_variants(spec):
 
 
 def _assign_value(spec, path, value):
-    for k in path[:-1]:
-        spec = spec[k]
-    spec[path[-1]] = value
+    """Returns a copy of spec with the value at path replaced.
+
+    Only the dicts and lists along the path are copied, and the rest of the
+    spec is shared with the copy.
+    """
+
+    if not path:
+        return value
+    spec_copy = copy.copy(spec)
+    spec_copy[path[0]] = _assign_value(spec[path[0]], path[1:], value)
+    return spec_copy
 
 
 def _get_value(spec, path):
@@ -161,11 +181,11 @@ def _resolve_lambda_vars(spec, lambda_vars):
                     ". If you meant to pass this as a function literal, use "
                     "tune.function() to escape it.")
             else:
-                _assign_value(spec, path, value)
+                spec = _assign_value(spec, path, value)
                 resolved[path] = value
     if error:
         raise error
-    return resolved
+    return spec, resolved
 
 
 def _grid_search_generator(unresolved_spec, grid_vars):
@@ -186,9 +206,9 @@ def _grid_search_generator(unresolved_spec, grid_vars):
         return
 
     while value_indices[-1] < len(grid_vars[-1][1]):
-        spec = copy.deepcopy(unresolved_spec)
+        spec = unresolved_spec
         for i, (path, values) in enumerate(grid_vars):
-            _assign_value(spec, path, values[value_indices[i]])
+            spec = _assign_value(spec, path, values[value_indices[i]])
         yield spec
         if grid_vars:
             done = increment(0)
@@ -0,0 +1,202 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from ray.tune.log_sync import apply_changes, collect_changes
+from ray.tune.logger import UnifiedLogger, FSYNC_NEVER
+from ray.tune.result_store import (
+    ResultColumns, FLOAT_DTYPE, MAX_BUFFERED_ROWS, MISSING_INT,
+    RESULT_COLUMNS_DIR, load_columns, load_experiment_columns)
+
+
+def result(t):
+    return {
+        "training_iteration": t,
+        "time_total_s": t,
+        "timesteps_total": t,
+        "timestamp": t,
+        "pid": 0,
+        "config": {},
+        "mean_loss": -t,
+    }
+
+
+class UnifiedLoggerTest(unittest.TestCase):
+    def setUp(self):
+        self.logdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.logdir)
+
+    def read_results(self):
+        with open(os.path.join(self.logdir, "result.json")) as f:
+            return [json.loads(line) for line in f]
+
+    def testFlush(self):
+        logger = UnifiedLogger({}, self.logdir)
+        for t in range(3):
+            logger.on_result(result(t))
+        logger.flush()
+        self.assertEqual(
+            [r["training_iteration"] for r in self.read_results()], [0, 1, 2])
+        logger.on_result(result(3))
+        logger.close()
+        self.assertEqual(len(self.read_results()), 4)
+
+    def testManyLoggers(self):
+        loggers = []
+        for i in range(10):
+            logdir = os.path.join(self.logdir, str(i))
+            os.makedirs(logdir)
+            loggers.append(UnifiedLogger({}, logdir, fsync=FSYNC_NEVER))
+        for t in range(100):
+            for logger in loggers:
+                logger.on_result(result(t))
+        for i, logger in enumerate(loggers):
+            logger.close()
+            with open(os.path.join(self.logdir, str(i), "result.json")) as f:
+                self.assertEqual(len(f.readlines()), 100)
+
+    def testInvalidFsyncMode(self):
+        self.assertRaises(ValueError,
+                          lambda: UnifiedLogger({}, self.logdir, fsync="x"))
+
+    def testResultColumns(self):
+        logger = UnifiedLogger({}, self.logdir, result_columns=True)
+        for t in range(100):
+            logger.on_result(result(t))
+        logger.close()
+        experiment = load_experiment_columns(os.path.dirname(self.logdir))
+        columns = experiment[self.logdir]
+        self.assertEqual(
+            list(columns["training_iteration"]), list(range(100)))
+        self.assertEqual(columns["training_iteration"].dtype, np.int64)
+        self.assertEqual(list(columns["mean_loss"][:3]), [0, -1, -2])
+        self.assertNotIn("config", columns)
+
+    def testResultColumnsOptIn(self):
+        logger = UnifiedLogger({}, self.logdir)
+        logger.on_result(result(0))
+        logger.close()
+        self.assertFalse(
+            os.path.exists(os.path.join(self.logdir, RESULT_COLUMNS_DIR)))
+
+
+class ResultColumnsTest(unittest.TestCase):
+    def setUp(self):
+        self.logdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.logdir)
+
+    def testSchema(self):
+        path = os.path.join(self.logdir, RESULT_COLUMNS_DIR)
+        columns = ResultColumns(path)
+        columns.append({"a": 1, "b": 1.5, "c": "x", "d": {"e": 2}})
+        columns.append({"a": 2, "d": {"e": 3}, "f": 4})
+        columns.append({"b": 2.5, "d": {"e": 0.5}})
+        self.assertEqual(list(columns.schema), ["a", "b", "d/e"])
+        self.assertEqual(list(columns.column("a")), [1, 2, MISSING_INT])
+        self.assertEqual(list(columns.column("d/e")), [2, 3, 0.5])
+        self.assertTrue(np.isnan(columns.column("b")[1]))
+        columns.close()
+
+        loaded = load_columns(path)
+        self.assertEqual(list(loaded), ["a", "b", "d/e"])
+        for name in loaded:
+            np.testing.assert_array_equal(loaded[name], columns.column(name))
+
+    def testBufferedRows(self):
+        path = os.path.join(self.logdir, RESULT_COLUMNS_DIR)
+        columns = ResultColumns(path)
+        for t in range(MAX_BUFFERED_ROWS + 10):
+            columns.append({"t": t, "loss": t})
+        # Only the rows since the last write are kept in memory
+        self.assertEqual(columns._num_buffered, 10)
+        self.assertEqual(len(load_columns(path)["t"]), MAX_BUFFERED_ROWS)
+        columns.append({"t": 0.5, "loss": 0})
+        self.assertEqual(columns.schema["t"], FLOAT_DTYPE)
+        self.assertEqual(
+            list(columns.column("t")),
+            list(range(MAX_BUFFERED_ROWS + 10)) + [0.5])
+        self.assertEqual(columns._num_buffered, 0)
+        columns.close()
+
+    def testQuery(self):
+        columns = ResultColumns(columns=["t", "reward"])
+        self.assertEqual(len(columns.query("reward")), 0)
+        for t in range(10):
+            columns.append({"t": t, "reward": t * 10, "other": 0})
+        self.assertNotIn("other", columns.schema)
+        self.assertEqual(
+            list(columns.query("reward", "t", t_min=3, t_max=5)),
+            [30, 40, 50])
+        self.assertEqual(len(columns.query("reward")), 10)
+
+
+class LogSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.worker_dir = tempfile.mkdtemp()
+        self.local_dir = tempfile.mkdtemp()
+        self.synced = {}
+
+    def tearDown(self):
+        shutil.rmtree(self.worker_dir)
+        shutil.rmtree(self.local_dir)
+
+    def write(self, name, data, mode="ab"):
+        path = os.path.join(self.worker_dir, name)
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, mode) as f:
+            f.write(data)
+
+    def read(self, name):
+        with open(os.path.join(self.local_dir, name), "rb") as f:
+            return f.read()
+
+    def sync(self, max_bytes=1000):
+        changes = collect_changes(self.worker_dir, self.synced, max_bytes)
+        apply_changes(self.local_dir, self.synced, changes)
+        return changes
+
+    def testIncrementalSync(self):
+        self.write("log.txt", b"abc")
+        self.write("checkpoint_1/checkpoint", b"x" * 10)
+        self.sync()
+        self.assertEqual(self.read("log.txt"), b"abc")
+        self.assertEqual(self.read("checkpoint_1/checkpoint"), b"x" * 10)
+        self.assertEqual(self.sync(), [])
+
+        self.write("log.txt", b"def")
+        changes = self.sync()
+        self.assertEqual([(c[0], c[1], c[2]) for c in changes],
+                         [("log.txt", 3, b"def")])
+        self.assertEqual(self.read("log.txt"), b"abcdef")
+
+        self.write("log.txt", b"z", mode="wb")
+        self.sync()
+        self.assertEqual(self.read("log.txt"), b"z")
+
+    def testMaxBytes(self):
+        self.write("a", b"1" * 10)
+        self.write("b", b"2" * 10)
+        self.assertEqual(len(self.sync(max_bytes=4)), 1)
+        self.assertEqual(self.read("a"), b"1" * 4)
+        for _ in range(5):
+            self.sync(max_bytes=4)
+        self.assertEqual(self.read("a"), b"1" * 10)
+        self.assertEqual(self.read("b"), b"2" * 10)
+        self.assertEqual(self.sync(max_bytes=4), [])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -5,9 +5,11 @@ from __future__ import print_function
 import os
 import time
 import unittest
+import numpy as np
 
 import ray
 from ray.rllib import _register_all
+from ray.rllib.agents.agent import get_agent_class
 
 from ray.tune import Trainable, TuneError
 from ray.tune import register_env, register_trainable, run_experiments
@@ -15,7 +17,7 @@ from ray.tune.ray_trial_executor import RayTrialExecutor
 from ray.tune.schedulers import TrialScheduler, FIFOScheduler
 from ray.tune.registry import _global_registry, TRAINABLE_CLASS
 from ray.tune.result import (DEFAULT_RESULTS_DIR, TIMESTEPS_TOTAL, DONE,
-                             EPISODES_TOTAL)
+                             EPISODES_TOTAL, TRAINING_ITERATION)
 from ray.tune.util import pin_in_object_store, get_pinned_object
 from ray.tune.experiment import Experiment
 from ray.tune.trial import Trial, Resources
@@ -530,6 +532,64 @@ class TrainableFunctionApiTest(unittest.TestCase):
             self.assertEqual(trial.status, Trial.TERMINATED)
             self.assertTrue(trial.has_checkpoint())
 
+    def testSaveToObject(self):
+        class TestTrain(Trainable):
+            def _setup(self, config):
+                self.state = {"weights": np.zeros(4)}
+
+            def _train(self):
+                self.state["weights"] += 1
+                return {"timesteps_this_iter": 1, "done": True}
+
+            def _save(self, path):
+                return self.state
+
+            def _restore(self, state):
+                self.state = state
+
+        class TestInMemoryTrain(TestTrain):
+            def _save_state(self):
+                return self.state
+
+            def _restore_state(self, state):
+                self.state = {"weights": state["weights"].copy()}
+
+        for cls in [TestTrain, TestInMemoryTrain]:
+            for compression in [None, "lz4"]:
+                trainable_1 = cls()
+                trainable_1.train()
+                obj = trainable_1.save_to_object(compression=compression)
+                trainable_2 = cls()
+                trainable_2.restore_from_object(ray.get(ray.put(obj)))
+                self.assertEqual(list(trainable_2.state["weights"]), [1] * 4)
+                self.assertEqual(trainable_2._iteration, 1)
+
+        self.assertRaises(ValueError,
+                          lambda: TestTrain().save_to_object("gzip"))
+
+    def testAgentSaveToObject(self):
+        # Agents with their own _save() are checkpointed through it
+        mock_agent = get_agent_class("__fake")()
+        mock_agent.set_info(3)
+        obj = mock_agent.save_to_object()
+        self.assertNotIn("state", obj)
+        mock_agent_2 = get_agent_class("__fake")()
+        mock_agent_2.restore_from_object(ray.get(ray.put(obj)))
+        self.assertEqual(mock_agent_2.get_info(), 3)
+
+        # Other agents are checkpointed in memory
+        config = {"num_workers": 0}
+        agent = get_agent_class("PG")(env="CartPole-v0", config=config)
+        agent.train()
+        obj = agent.save_to_object()
+        self.assertIn("state", obj)
+        agent_2 = get_agent_class("PG")(env="CartPole-v0", config=config)
+        agent_2.restore_from_object(ray.get(ray.put(obj)))
+        self.assertTrue(
+            np.array_equal(agent.get_weights()["default"],
+                           agent_2.get_weights()["default"]))
+        self.assertEqual(agent_2.iteration, 1)
+
 
 class RunExperimentTest(unittest.TestCase):
     def setUp(self):
@@ -745,6 +805,54 @@ class VariantGeneratorTest(unittest.TestCase):
         self.assertEqual(trials[4].config, {"bar": True, "foo": 3})
         self.assertEqual(trials[5].config, {"bar": False, "foo": 3})
 
+    def testMaxPendingTrials(self):
+        suggester = BasicVariantGenerator(max_pending_trials=2)
+        suggester.add_configurations({
+            "grid_search": {
+                "run": "PPO",
+                "config": {
+                    "foo": grid_search([1, 2, 3, 4, 5])
+                },
+            }
+        })
+        trials = suggester.next_trials()
+        self.assertEqual([t.config["foo"] for t in trials], [1, 2])
+        self.assertEqual(suggester.next_trials(), [])
+        self.assertFalse(suggester.is_finished())
+
+        trials[0].status = Trial.RUNNING
+        trials = suggester.next_trials()
+        self.assertEqual([t.config["foo"] for t in trials], [3])
+
+        for trial in trials + suggester._pending_trials:
+            trial.status = Trial.TERMINATED
+        trials = suggester.next_trials()
+        self.assertEqual([t.config["foo"] for t in trials], [4, 5])
+        self.assertFalse(suggester.is_finished())
+
+        trials[0].status = Trial.RUNNING
+        self.assertEqual(suggester.next_trials(), [])
+        self.assertTrue(suggester.is_finished())
+
+    def testResumeVariants(self):
+        spec = {
+            "run": "PPO",
+            "config": {
+                "foo": grid_search([1, 2, 3])
+            },
+        }
+        suggester = BasicVariantGenerator(max_pending_trials=2)
+        suggester.add_configurations({"grid_search": spec})
+        self.assertEqual(len(suggester.next_trials()), 2)
+
+        resumed = BasicVariantGenerator()
+        resumed.add_configurations({"grid_search": spec})
+        resumed.set_state(suggester.get_state())
+        trials = resumed.next_trials()
+        self.assertEqual(len(trials), 1)
+        self.assertEqual(trials[0].config, {"foo": 3})
+        self.assertEqual(trials[0].experiment_tag, "2_foo=3")
+
     def testGridSearchAndEval(self):
         trials = self.generate_trials({
             "run": "PPO",
@@ -844,6 +952,39 @@ class VariantGeneratorTest(unittest.TestCase):
         self.assertEqual(len(searcher.next_trials()), 1)
         self.assertEqual(len(searcher.next_trials()), 0)
 
+    def testBatchedSuggestions(self):
+        """Checks that next_trials() suggests up to num free slots at once."""
+
+        class BatchedAlgorithm(_MockSuggestionAlgorithm):
+            def __init__(self, **kwargs):
+                self.batch_sizes = []
+                super(BatchedAlgorithm, self).__init__(**kwargs)
+
+            def _suggest_batch(self, trial_ids):
+                self.batch_sizes.append(len(trial_ids))
+                return super(BatchedAlgorithm,
+                             self)._suggest_batch(trial_ids)
+
+        experiment_spec = {
+            "run": "PPO",
+            "num_samples": 6,
+        }
+        experiments = [Experiment.from_json("test", experiment_spec)]
+
+        searcher = BatchedAlgorithm(max_concurrent=4)
+        searcher.add_configurations(experiments)
+        searcher.set_num_free_slots(3)
+        trials = searcher.next_trials()
+        self.assertEqual(len(trials), 4)
+        self.assertEqual(searcher.batch_sizes, [3, 3, 2])
+
+        for trial in trials:
+            searcher.on_trial_complete(trial.trial_id)
+        searcher.set_num_free_slots(0)
+        self.assertEqual(len(searcher.next_trials()), 2)
+        self.assertEqual(searcher.batch_sizes, [3, 3, 2, 1, 1])
+        self.assertTrue(searcher.is_finished())
+
 
 class TrialRunnerTest(unittest.TestCase):
     def tearDown(self):
@@ -920,6 +1061,39 @@ class TrialRunnerTest(unittest.TestCase):
         self.assertEqual(trials[0].status, Trial.TERMINATED)
         self.assertEqual(trials[1].status, Trial.PENDING)
 
+    def testReuseActors(self):
+        ray.init(num_cpus=1, num_gpus=0)
+
+        class B(Trainable):
+            def _setup(self, config):
+                self.num_resets = 0
+
+            def _train(self):
+                return {
+                    "num_resets": self.num_resets,
+                    "pid": os.getpid(),
+                    "done": True
+                }
+
+            def reset_config(self, new_config):
+                self.num_resets += 1
+                return True
+
+        register_trainable("B", B)
+        runner = TrialRunner(BasicVariantGenerator(), reuse_actors=True)
+        trials = [Trial("B", config={"i": i}) for i in range(3)]
+        for t in trials:
+            runner.add_trial(t)
+        while not runner.is_finished():
+            runner.step()
+
+        self.assertEqual([t.last_result["num_resets"] for t in trials],
+                         [0, 1, 2])
+        self.assertEqual(len({t.last_result["pid"] for t in trials}), 1)
+        self.assertEqual(trials[2].last_result[TRAINING_ITERATION], 1)
+        self.assertIn("Actors reused: 2, cached: 0",
+                      runner.trial_executor.debug_string())
+
     def testFractionalGpus(self):
         ray.init(num_cpus=4, num_gpus=1)
         runner = TrialRunner(BasicVariantGenerator())
@@ -1001,6 +1175,52 @@ class TrialRunnerTest(unittest.TestCase):
         self.assertEqual(trials[0].status, Trial.RUNNING)
         self.assertEqual(trials[1].status, Trial.RUNNING)
 
+    def testMultipleEventsPerStep(self):
+        ray.init(num_cpus=4, num_gpus=2)
+        runner = TrialRunner(BasicVariantGenerator(), max_events_per_step=2)
+        kwargs = {
+            "stopping_criterion": {
+                "training_iteration": 1
+            },
+            "resources": Resources(cpu=1, gpu=1),
+        }
+        trials = [Trial("__fake", **kwargs), Trial("__fake", **kwargs)]
+        for t in trials:
+            runner.add_trial(t)
+
+        runner.step()
+        self.assertEqual(trials[0].status, Trial.RUNNING)
+        self.assertEqual(trials[1].status, Trial.RUNNING)
+        self.assertEqual(
+            list(runner.get_trials_with_status(Trial.RUNNING)), trials)
+
+        while not runner.is_finished():
+            runner.step()
+        self.assertEqual(trials[0].status, Trial.TERMINATED)
+        self.assertEqual(trials[1].status, Trial.TERMINATED)
+        self.assertFalse(runner.get_trials_with_status(Trial.RUNNING))
+        self.assertEqual(
+            set(runner.get_trials_with_status(Trial.TERMINATED)), set(trials))
+
+    def testTrialsWithStatusOrder(self):
+        ray.init(num_cpus=1)
+        runner = TrialRunner(BasicVariantGenerator())
+        trials = [Trial("__fake"), Trial("__fake")]
+        for t in trials:
+            runner.add_trial(t)
+        self.assertEqual(
+            list(runner.get_trials_with_status(Trial.PENDING)), trials)
+
+        trials[0].status = Trial.PAUSED
+        self.assertEqual(
+            list(runner.get_trials_with_status(Trial.PENDING)), [trials[1]])
+        self.assertEqual(
+            list(runner.get_trials_with_status(Trial.PAUSED)), [trials[0]])
+        trials[0].status = Trial.PENDING
+        self.assertEqual(
+            list(runner.get_trials_with_status(Trial.PENDING)),
+            [trials[1], trials[0]])
+
     def testMultiStepRun2(self):
         """Checks that runner.step throws when overstepping."""
         ray.init(num_cpus=1)
@@ -1211,6 +1431,32 @@ class TrialRunnerTest(unittest.TestCase):
         self.assertEqual(trials[0].last_result[DONE], True)
         self.assertEqual(trials[0].has_checkpoint(), True)
 
+    def testAsyncCheckpointing(self):
+        ray.init(num_cpus=1, num_gpus=1)
+        runner = TrialRunner(BasicVariantGenerator())
+        kwargs = {
+            "stopping_criterion": {
+                "training_iteration": 2
+            },
+            "resources": Resources(cpu=1, gpu=1),
+        }
+        runner.add_trial(Trial("__fake", **kwargs))
+        trials = runner.get_trials()
+
+        runner.step()
+        runner.step()
+        self.assertEqual(trials[0].status, Trial.RUNNING)
+        checkpoint_id = runner.trial_executor.save(
+            trials[0], blocking=False)
+        self.assertIsInstance(checkpoint_id, ray.ObjectID)
+        while not runner.is_finished():
+            runner.step()
+        self.assertEqual(trials[0].status, Trial.TERMINATED)
+        self.assertTrue(trials[0].has_checkpoint())
+        self.assertEqual(trials[0]._checkpoint.value, ray.get(checkpoint_id))
+        self.assertEqual(trials[0]._checkpoint.last_result[
+            TRAINING_ITERATION], 1)
+
     def testResultDone(self):
         """Tests that last_result is marked `done` after trial is complete."""
         ray.init(num_cpus=1, num_gpus=1)
@@ -1262,6 +1508,40 @@ class TrialRunnerTest(unittest.TestCase):
         runner.step()
         self.assertEqual(trials[0].status, Trial.TERMINATED)
 
+    def testPauseThenResumeAgent(self):
+        ray.init(num_cpus=1)
+        runner = TrialRunner(BasicVariantGenerator())
+        kwargs = {
+            "stopping_criterion": {
+                "training_iteration": 2
+            },
+            "config": {
+                "env": "CartPole-v0",
+                "num_workers": 0
+            },
+        }
+        runner.add_trial(Trial("PG", **kwargs))
+        trials = runner.get_trials()
+
+        runner.step()
+        runner.step()
+        self.assertEqual(trials[0].status, Trial.RUNNING)
+        weights = ray.get(trials[0].runner.get_weights.remote())
+
+        # Pausing checkpoints the agent in memory and stops its actor
+        runner.trial_executor.pause_trial(trials[0])
+        self.assertEqual(trials[0].status, Trial.PAUSED)
+        self.assertIn("state", ray.get(trials[0]._checkpoint.value))
+
+        runner.trial_executor.resume_trial(trials[0])
+        self.assertEqual(trials[0].status, Trial.RUNNING)
+        restored = ray.get(trials[0].runner.get_weights.remote())
+        self.assertTrue(
+            np.array_equal(weights["default"], restored["default"]))
+
+        runner.step()
+        self.assertEqual(trials[0].status, Trial.TERMINATED)
+
     def testStepHook(self):
         ray.init(num_cpus=4, num_gpus=2)
         runner = TrialRunner(BasicVariantGenerator())
@@ -123,6 +123,23 @@ class EarlyStoppingSuite(unittest.TestCase):
             rule.on_trial_result(None, t3, result(2, 260)),
             TrialScheduler.PAUSE)
 
+    def testMedianStoppingFloatTimes(self):
+        rule = MedianStoppingRule(grace_period=0, min_samples_required=1)
+        t1 = Trial("PPO")  # mean is 50 up to t=1.5
+        for i in range(10):
+            rule.on_trial_result(None, t1, result(i + 0.5, i * 100))
+        rule.on_trial_complete(None, t1, result(10.5, 1000))
+        t2 = Trial("PPO")
+        t3 = Trial("PPO")
+        self.assertEqual(
+            rule.on_trial_result(None, t2, result(1.53, 60)),
+            TrialScheduler.CONTINUE)
+        self.assertEqual(
+            rule.on_trial_result(None, t3, result(1.57, 40)),
+            TrialScheduler.STOP)
+        # Nearby times share the sorted running rewards
+        self.assertEqual(list(rule._sorted_results), [1.5])
+
     def testAlternateMetrics(self):
         def result2(t, rew):
             return dict(training_iteration=t, neg_mean_loss=rew)
@@ -201,6 +218,9 @@ class _MockTrialRunner():
     def get_trials(self):
         return self.trials
 
+    def get_trials_with_status(self, status):
+        return [t for t in self.trials if t.status == status]
+
     def has_resources(self, resources):
         return True
 
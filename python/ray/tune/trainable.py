@@ -5,8 +5,6 @@ from __future__ import print_function
 from datetime import datetime
 
 import copy
-import gzip
-import io
 import logging
 import os
 import pickle
@@ -16,6 +14,7 @@ import time
 import uuid
 
 import ray
+from ray.tune.log_sync import collect_changes
 from ray.tune.logger import UnifiedLogger
 from ray.tune.result import (DEFAULT_RESULTS_DIR, TIME_THIS_ITER_S,
                              TIMESTEPS_THIS_ITER, DONE, TIMESTEPS_TOTAL,
@@ -24,6 +23,12 @@ from ray.tune.trial import Resources
 
 logger = logging.getLogger(__name__)
 
+try:
+    import lz4.frame
+    LZ4_ENABLED = True
+except ImportError:
+    LZ4_ENABLED = False
+
 
 class Trainable(object):
     """Abstract class for trainable models, functions, etc.
@@ -238,47 +243,66 @@ class Trainable(object):
                 pickle.dump(checkpoint, f)
         else:
             raise ValueError("Return value from `_save` must be dict or str.")
-        pickle.dump({
-            "experiment_id": self._experiment_id,
-            "iteration": self._iteration,
-            "timesteps_total": self._timesteps_total,
-            "time_total": self._time_total,
-            "episodes_total": self._episodes_total,
-            "saved_as_dict": saved_as_dict
-        }, open(checkpoint_path + ".tune_metadata", "wb"))
+        metadata = self._get_metadata()
+        metadata["saved_as_dict"] = saved_as_dict
+        pickle.dump(metadata, open(checkpoint_path + ".tune_metadata", "wb"))
         return checkpoint_path
 
-    def save_to_object(self):
-        """Saves the current model state to a Python object. It also
-        saves to disk but does not return the checkpoint path.
+    def save_to_object(self, compression=None):
+        """Saves the current model state to a Python object.
+
+        If the trainable implements ``_save_state()``, the returned state is
+        placed in the object as is, without writing to disk. Numpy arrays in
+        it are then stored in the object store without copies, and trainables
+        on the same node restore from them in shared memory. Otherwise, the
+        checkpoint is saved to a temporary dir and its files are read back.
+
+        Args:
+            compression (str): Either None or "lz4". LZ4 reduces the size of
+                the object at the cost of serializing the state.
 
         Returns:
             Object holding checkpoint data.
         """
 
+        if compression not in [None, "lz4"]:
+            raise ValueError(
+                "Unknown checkpoint compression: {}".format(compression))
+        if compression == "lz4" and not LZ4_ENABLED:
+            logger.warning("lz4 not available, not compressing checkpoint. "
+                           "To install lz4, run `pip install lz4`.")
+            compression = None
+
+        obj = {"compression": compression}
+        state = self._save_state()
+        if state is not None:
+            obj["metadata"] = self._get_metadata()
+            if compression:
+                state = _compress(
+                    pickle.dumps(state, pickle.HIGHEST_PROTOCOL), compression)
+            obj["state"] = state
+            return obj
+
         tmpdir = tempfile.mkdtemp("save_to_object", dir=self.logdir)
         checkpoint_prefix = self.save(tmpdir)
 
         data = {}
+        size = 0
         base_dir = os.path.dirname(checkpoint_prefix)
         for path in os.listdir(base_dir):
             path = os.path.join(base_dir, path)
             if path.startswith(checkpoint_prefix):
-                data[os.path.basename(path)] = open(path, "rb").read()
-
-        out = io.BytesIO()
-        with gzip.GzipFile(fileobj=out, mode="wb") as f:
-            compressed = pickle.dumps({
-                "checkpoint_name": os.path.basename(checkpoint_prefix),
-                "data": data,
-            })
-            if len(compressed) > 10e6:  # getting pretty large
-                logger.info("Checkpoint size is {} bytes".format(
-                    len(compressed)))
-            f.write(compressed)
+                with open(path, "rb") as f:
+                    contents = _compress(f.read(), compression)
+                data[os.path.basename(path)] = contents
+                size += len(contents)
+        if size > 10e6:  # getting pretty large
+            logger.info("Checkpoint size is {} bytes".format(size))
 
         shutil.rmtree(tmpdir)
-        return out.getvalue()
+        obj["checkpoint_name"] = os.path.basename(checkpoint_prefix)
+        obj["data"] = data
+        return obj
 
     def restore(self, checkpoint_path):
         """Restores training state from a given model checkpoint.
@@ -290,11 +314,7 @@ class Trainable(object):
         """
 
         metadata = pickle.load(open(checkpoint_path + ".tune_metadata", "rb"))
-        self._experiment_id = metadata["experiment_id"]
-        self._iteration = metadata["iteration"]
-        self._timesteps_total = metadata["timesteps_total"]
-        self._time_total = metadata["time_total"]
-        self._episodes_total = metadata["episodes_total"]
+        self._set_metadata(metadata)
         saved_as_dict = metadata["saved_as_dict"]
         if saved_as_dict:
             with open(checkpoint_path, "rb") as loaded_state:
@@ -310,19 +330,42 @@ class Trainable(object):
         These checkpoints are returned from calls to save_to_object().
         """
 
-        out = io.BytesIO(obj)
-        info = pickle.loads(gzip.GzipFile(fileobj=out, mode="rb").read())
-        data = info["data"]
+        compression = obj["compression"]
+        if "state" in obj:
+            state = obj["state"]
+            if compression:
+                state = pickle.loads(_decompress(state, compression))
+            self._set_metadata(obj["metadata"])
+            self._restore_state(state)
+            self._restored = True
+            return
+
         tmpdir = tempfile.mkdtemp("restore_from_object", dir=self.logdir)
-        checkpoint_path = os.path.join(tmpdir, info["checkpoint_name"])
+        checkpoint_path = os.path.join(tmpdir, obj["checkpoint_name"])
 
-        for file_name, file_contents in data.items():
+        for file_name, file_contents in obj["data"].items():
             with open(os.path.join(tmpdir, file_name), "wb") as f:
-                f.write(file_contents)
+                f.write(_decompress(file_contents, compression))
 
         self.restore(checkpoint_path)
         shutil.rmtree(tmpdir)
 
+    def _get_metadata(self):
+        return {
+            "experiment_id": self._experiment_id,
+            "iteration": self._iteration,
+            "timesteps_total": self._timesteps_total,
+            "time_total": self._time_total,
+            "episodes_total": self._episodes_total,
+        }
+
+    def _set_metadata(self, metadata):
+        self._experiment_id = metadata["experiment_id"]
+        self._iteration = metadata["iteration"]
+        self._timesteps_total = metadata["timesteps_total"]
+        self._time_total = metadata["time_total"]
+        self._episodes_total = metadata["episodes_total"]
+
     def reset_config(self, new_config):
         """Resets configuration without restarting the trial.
 
@@ -335,6 +378,47 @@ class Trainable(object):
         """
         return False
 
+    def reset(self, new_config, logger_creator):
+        """Resets this trainable to run a new trial, without restarting it.
+
+        This calls ``reset_config()``, and on success starts logging to the
+        new logdir and resets the training progress.
+
+        Args:
+            new_config (dict): Configuration of the new trial.
+            logger_creator (func): Function that creates the logger of the
+                new trial, as passed to ``__init__()``.
+
+        Returns:
+            True if the trainable was reset successfully else False.
+        """
+
+        if not self.reset_config(new_config):
+            return False
+        self.config = new_config
+        self._result_logger.close()
+        self._result_logger = logger_creator(self.config)
+        self.logdir = self._result_logger.logdir
+        self._experiment_id = uuid.uuid4().hex
+        self._iteration = 0
+        self._time_total = 0.0
+        self._timesteps_total = None
+        self._episodes_total = None
+        self._time_since_restore = 0.0
+        self._timesteps_since_restore = 0
+        self._iterations_since_restore = 0
+        self._restored = False
+        return True
+
+    def export_logdir(self, synced, max_bytes):
+        """Returns the changes to the files in the logdir since last synced.
+
+        This is called by Tune to sync the logdir of a remote trainable to
+        the driver through the object store, see log_sync.collect_changes().
+        """
+
+        return collect_changes(self.logdir, synced, max_bytes)
+
     def stop(self):
         """Releases all resources used by this trainable."""
 
@@ -381,6 +465,30 @@ class Trainable(object):
 
         raise NotImplementedError
 
+    def _save_state(self):
+        """Subclasses can override this to support in-memory checkpoints.
+
+        This is used by save_to_object() instead of writing a checkpoint to
+        disk, e.g., when PBT clones a trial.
+
+        Returns:
+            state (dict): State to be passed to `_restore_state()`, or None
+                if not supported. The state is not copied, so it must not
+                be modified in place until it has been serialized.
+        """
+
+        return None
+
+    def _restore_state(self, state):
+        """Subclasses should override this if implementing `_save_state()`.
+
+        Args:
+            state (dict): Value as returned by `_save_state`. Numpy arrays
+                in it may be read-only views of the object store.
+        """
+
+        raise NotImplementedError
+
     def _setup(self, config):
         """Subclasses should override this for custom initialization.
 
@@ -395,6 +503,18 @@ class Trainable(object):
         pass
 
 
+def _compress(data, compression):
+    if compression == "lz4":
+        return lz4.frame.compress(data)
+    return data
+
+
+def _decompress(data, compression):
+    if compression == "lz4":
+        return lz4.frame.decompress(data)
+    return data
+
+
 def wrap_function(train_func):
     from ray.tune.function_runner import FunctionRunner
 
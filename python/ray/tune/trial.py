@@ -155,6 +155,7 @@ class Trial(object):
         self.checkpoint_at_end = checkpoint_at_end
         self._checkpoint = Checkpoint(
             storage=Checkpoint.DISK, value=restore_path)
+        self._status_listener = None
         self.status = Trial.PENDING
         self.location = None
         self.logdir = None
@@ -167,6 +168,22 @@ class Trial(object):
         self.error_file = None
         self.num_failures = 0
 
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, status):
+        prior_status = getattr(self, "_status", None)
+        self._status = status
+        listener = getattr(self, "_status_listener", None)
+        if listener is not None and status != prior_status:
+            listener(self, prior_status)
+
+    def set_status_listener(self, listener):
+        """Sets a function to call with (trial, prior_status) on changes."""
+        self._status_listener = listener
+
     @classmethod
     def generate_id(cls):
         return binary_to_hex(random_string())[:8]
@@ -31,6 +31,10 @@ class TrialExecutor(object):
         raise NotImplementedError("Subclasses of TrialExecutor must provide "
                                   "has_resources() method")
 
+    def num_free_slots(self, resources):
+        """Returns how many more trials with these resources can start."""
+        return int(self.has_resources(resources))
+
     def start_trial(self, trial, checkpoint=None):
         """Starts the trial restoring from checkpoint if checkpoint != None.
 
@@ -137,6 +141,10 @@ class TrialExecutor(object):
         """A hook called after running one step of the trial event loop."""
         pass
 
+    def on_no_pending_trials(self):
+        """A hook called when no trials are left to be started."""
+        pass
+
     def get_next_available_trial(self):
         """Blocking call that waits until one result is ready.
 
@@ -145,6 +153,17 @@ class TrialExecutor(object):
         """
         raise NotImplementedError
 
+    def get_next_available_trials(self, max_trials=1):
+        """Blocking call that waits until at least one result is ready.
+
+        Args:
+            max_trials (int): Max number of trials to return.
+
+        Returns:
+            List of trial objects that are ready for intermediate processing.
+        """
+        return [self.get_next_available_trial()]
+
     def fetch_result(self, trial):
         """Fetches one result for the trial.
 
@@ -179,16 +198,20 @@ class TrialExecutor(object):
         raise NotImplementedError("Subclasses of TrialExecutor must provide "
                                   "restore() method")
 
-    def save(self, trial, storage=Checkpoint.DISK):
+    def save(self, trial, storage=Checkpoint.DISK, blocking=True):
         """Saves training state of this trial to a checkpoint.
 
         Args:
             trial (Trial): The state of this trial to be saved.
             storage (str): Where to store the checkpoint. Defaults to DISK.
+            blocking (bool): Whether to wait for a DISK checkpoint to be
+                written. Otherwise, the checkpoint becomes the latest
+                checkpoint of the trial only once it has been written.
 
         Return:
             A Python object if storage==Checkpoint.MEMORY otherwise
-            a path to the checkpoint.
+            a path to the checkpoint, or a future of the path if not
+            blocking.
         """
         raise NotImplementedError("Subclasses of TrialExecutor must provide "
                                   "save() method")
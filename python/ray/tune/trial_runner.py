@@ -9,10 +9,12 @@ import re
 import time
 import traceback
 
+import six
+
 from ray.tune import TuneError
 from ray.tune.ray_trial_executor import RayTrialExecutor
 from ray.tune.result import TIME_THIS_ITER_S
-from ray.tune.trial import Trial
+from ray.tune.trial import Trial, Resources
 from ray.tune.schedulers import FIFOScheduler, TrialScheduler
 from ray.tune.web_server import TuneServer
 
@@ -56,7 +58,9 @@ class TrialRunner(object):
                  server_port=TuneServer.DEFAULT_PORT,
                  verbose=True,
                  queue_trials=False,
-                 trial_executor=None):
+                 trial_executor=None,
+                 max_events_per_step=1,
+                 reuse_actors=False):
         """Initializes a new TrialRunner.
 
         Args:
@@ -72,12 +76,25 @@ class TrialRunner(object):
                 be set to True when running on an autoscaling cluster to enable
                 automatic scale-up.
             trial_executor (TrialExecutor): Defaults to RayTrialExecutor.
+            max_events_per_step (int): Max number of trials to start, or of
+                ready trial results to process, in one call to step(). With
+                the default of 1, callers can inspect the state after every
+                single event.
+            reuse_actors (bool): Whether to reuse the actors of terminated
+                trials for new trials of the same trainable and resources,
+                see Trainable.reset(). Ignored if trial_executor is given.
         """
         self._search_alg = search_alg
         self._scheduler_alg = scheduler or FIFOScheduler()
         self._trials = []
+        self._trials_by_id = {}
+        # Trials in each status, in the order they entered it
+        self._trials_by_status = collections.defaultdict(
+            collections.OrderedDict)
+        self._max_events_per_step = max_events_per_step
         self.trial_executor = trial_executor or \
-            RayTrialExecutor(queue_trials=queue_trials)
+            RayTrialExecutor(queue_trials=queue_trials,
+                             reuse_actors=reuse_actors)
 
         # For debugging, it may be useful to halt trials after some time has
         # elapsed. TODO(ekl) consider exposing this in the API.
@@ -99,8 +116,7 @@ class TrialRunner(object):
                 self._total_time, self._global_time_limit))
             return True
 
-        trials_done = all(trial.is_finished() for trial in self._trials)
-        return trials_done and self._search_alg.is_finished()
+        return self._all_trials_done() and self._search_alg.is_finished()
 
     def step(self):
         """Runs one step of the trial event loop.
@@ -111,41 +127,41 @@ class TrialRunner(object):
         if self.is_finished():
             raise TuneError("Called step when all trials finished?")
         self.trial_executor.on_step_begin()
-        next_trial = self._get_next_trial()
-        if next_trial is not None:
-            self.trial_executor.start_trial(next_trial)
-        elif self.trial_executor.get_running_trials():
+        num_started = self._start_trials()
+        if num_started == 0 and self.trial_executor.get_running_trials():
             self._process_events()
-        else:
-            for trial in self._trials:
-                if trial.status == Trial.PENDING:
-                    if not self.has_resources(trial.resources):
-                        raise TuneError(
-                            ("Insufficient cluster resources to launch trial: "
-                             "trial requested {} but the cluster has only {}. "
-                             "Pass `queue_trials=True` in "
-                             "ray.tune.run_experiments() or on the command "
-                             "line to queue trials until the cluster scales "
-                             "up. {}").format(
-                                 trial.resources.summary_string(),
-                                 self.trial_executor.resource_string(),
-                                 trial._get_trainable_cls().resource_help(
-                                     trial.config)))
-                elif trial.status == Trial.PAUSED:
+        elif num_started == 0:
+            for trial in self.get_trials_with_status(Trial.PENDING):
+                if not self.has_resources(trial.resources):
                     raise TuneError(
-                        "There are paused trials, but no more pending "
-                        "trials with sufficient resources.")
+                        ("Insufficient cluster resources to launch trial: "
+                         "trial requested {} but the cluster has only {}. "
+                         "Pass `queue_trials=True` in "
+                         "ray.tune.run_experiments() or on the command "
+                         "line to queue trials until the cluster scales "
+                         "up. {}").format(
+                             trial.resources.summary_string(),
+                             self.trial_executor.resource_string(),
+                             trial._get_trainable_cls().resource_help(
+                                 trial.config)))
+            if self.get_trials_with_status(Trial.PAUSED):
+                raise TuneError(
+                    "There are paused trials, but no more pending "
+                    "trials with sufficient resources.")
 
         if self._server:
             self._process_requests()
 
             if self.is_finished():
                 self._server.shutdown()
+        if (self._search_alg.is_finished()
+                and not self.get_trials_with_status(Trial.PENDING)
+                and not self.get_trials_with_status(Trial.PAUSED)):
+            self.trial_executor.on_no_pending_trials()
         self.trial_executor.on_step_end()
 
     def get_trial(self, tid):
-        trial = [t for t in self._trials if t.trial_id == tid]
-        return trial[0] if trial else None
+        return self._trials_by_id.get(tid)
 
     def get_trials(self):
         """Returns the list of trials managed by this TrialRunner.
@@ -155,6 +171,19 @@ class TrialRunner(object):
 
         return self._trials
 
+    def get_trials_with_status(self, status):
+        """Returns the trials in the given status.
+
+        Trials are ordered by when they entered the status, so for example
+        a trial that is requeued after a failure comes after the trials that
+        were pending already.
+
+        This is a live view rather than a copy. Callers that change trial
+        statuses while iterating over it should copy it into a list first.
+        """
+
+        return six.viewkeys(self._trials_by_status[status])
+
     def add_trial(self, trial):
         """Adds a new trial to this TrialRunner.
 
@@ -165,7 +194,19 @@ class TrialRunner(object):
         """
         trial.set_verbose(self._verbose)
         self._scheduler_alg.on_trial_add(self, trial)
+        self._trials_by_id[trial.trial_id] = trial
+        self._trials_by_status[trial.status][trial] = None
         self._trials.append(trial)
+        trial.set_status_listener(self._on_trial_status_change)
+
+    def _on_trial_status_change(self, trial, prior_status):
+        del self._trials_by_status[prior_status][trial]
+        self._trials_by_status[trial.status][trial] = None
+
+    def _all_trials_done(self):
+        num_done = (len(self._trials_by_status[Trial.TERMINATED]) +
+                    len(self._trials_by_status[Trial.ERROR]))
+        return num_done == len(self._trials)
 
     def debug_string(self, max_debug=MAX_DEBUG_TRIALS):
         """Returns a human readable message for printing to the console."""
@@ -243,20 +284,42 @@ class TrialRunner(object):
         """Returns whether this runner has at least the specified resources."""
         return self.trial_executor.has_resources(resources)
 
+    def _start_trials(self):
+        """Starts up to max_events_per_step trials that can run.
+
+        Returns:
+            The number of trials started.
+        """
+        num_started = 0
+        while num_started < self._max_events_per_step:
+            next_trial = self._get_next_trial()
+            if next_trial is None:
+                break
+            self.trial_executor.start_trial(next_trial)
+            num_started += 1
+        return num_started
+
     def _get_next_trial(self):
         """Replenishes queue.
 
         Blocks if all trials queued have finished, but search algorithm is
         still not finished.
         """
-        trials_done = all(trial.is_finished() for trial in self._trials)
-        wait_for_trial = trials_done and not self._search_alg.is_finished()
+        wait_for_trial = (self._all_trials_done()
+                          and not self._search_alg.is_finished())
         self._update_trial_queue(blocking=wait_for_trial)
         trial = self._scheduler_alg.choose_trial_to_run(self)
         return trial
 
     def _process_events(self):
-        trial = self.trial_executor.get_next_available_trial()
+        trials = self.trial_executor.get_next_available_trials(
+            self._max_events_per_step)
+        for trial in trials:
+            # Handling an earlier result may have paused or stopped the trial
+            if trial.status == Trial.RUNNING:
+                self._process_trial(trial)
+
+    def _process_trial(self, trial):
         try:
             result = self.trial_executor.fetch_result(trial)
             self._total_time += result[TIME_THIS_ITER_S]
@@ -280,8 +343,7 @@ class TrialRunner(object):
 
             if decision == TrialScheduler.CONTINUE:
                 if trial.should_checkpoint(result):
-                    # TODO(rliaw): This is a blocking call
-                    self.trial_executor.save(trial)
+                    self.trial_executor.save(trial, blocking=False)
                 self.trial_executor.continue_training(trial)
             elif decision == TrialScheduler.PAUSE:
                 self.trial_executor.pause_trial(trial)
@@ -289,7 +351,7 @@ class TrialRunner(object):
                 # Checkpoint before ending the trial
                 # if checkpoint_at_end experiment option is set to True
                 if trial.should_checkpoint(result):
-                    self.trial_executor.save(trial)
+                    self.trial_executor.save(trial, blocking=False)
                 self.trial_executor.stop_trial(trial)
             else:
                 assert False, "Invalid scheduling decision: {}".format(
@@ -317,6 +379,20 @@ class TrialRunner(object):
             logger.warning("Error recovering trial from checkpoint, abort.")
             self.trial_executor.stop_trial(trial, True, error_msg=error_msg)
 
+    def _num_free_slots(self):
+        """Returns how many new trials could start besides the pending ones.
+
+        New trials are assumed to need the resources of the last trial added.
+        """
+        if self._trials:
+            resources = self._trials[-1].resources
+        else:
+            resources = Resources(cpu=1, gpu=0)
+        num_pending = len(self._trials_by_status[Trial.PENDING])
+        return max(
+            0,
+            self.trial_executor.num_free_slots(resources) - num_pending)
+
     def _update_trial_queue(self, blocking=False, timeout=600):
         """Adds next trials to queue if possible.
 
@@ -327,6 +403,7 @@ class TrialRunner(object):
                 or is_finished (timeout or search algorithm finishes).
             timeout (int): Seconds before blocking times out.
         """
+        self._search_alg.set_num_free_slots(self._num_free_slots())
         trials = self._search_alg.next_trials()
         if blocking and not trials:
             start = time.time()
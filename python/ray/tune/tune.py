@@ -16,6 +16,9 @@ from ray.tune.web_server import TuneServer
 
 logger = logging.getLogger(__name__)
 
+# Max number of trials started or results processed per runner step
+MAX_EVENTS_PER_STEP = 100
+
 _SCHEDULERS = {
     "FIFO": FIFOScheduler,
     "MedianStopping": MedianStoppingRule,
@@ -40,7 +43,8 @@ def run_experiments(experiments=None,
                     verbose=True,
                     queue_trials=False,
                     trial_executor=None,
-                    raise_on_failed_trial=True):
+                    raise_on_failed_trial=True,
+                    reuse_actors=False):
     """Runs and blocks until all trials finish.
 
     Args:
@@ -62,6 +66,9 @@ def run_experiments(experiments=None,
         trial_executor (TrialExecutor): Manage the execution of trials.
         raise_on_failed_trial (bool): Raise TuneError if there exists failed
             trial (of ERROR state) when the experiments complete.
+        reuse_actors (bool): Whether to reuse the actors of terminated trials
+            for new trials, which saves the actor startup time of short
+            trials. Requires the trainable to implement `reset_config`.
 
     Examples:
         >>> experiment_spec = Experiment("experiment", my_func)
@@ -99,7 +106,9 @@ def run_experiments(experiments=None,
         server_port=server_port,
         verbose=verbose,
         queue_trials=queue_trials,
-        trial_executor=trial_executor)
+        trial_executor=trial_executor,
+        max_events_per_step=MAX_EVENTS_PER_STEP,
+        reuse_actors=reuse_actors)
 
     logger.info(runner.debug_string(max_debug=99999))
 